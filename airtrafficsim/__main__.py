@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import argparse
 from pathlib import Path
 from importlib import import_module
@@ -25,6 +26,27 @@ def main():
     parser.add_argument('--headless',
                         type=str,
                         help='Run user defined environment without UI: airtrafficsim --headless <env name>.')
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='Print the time spent in each stage of the simulation timestep after a headless run.')
+    parser.add_argument('--replay',
+                        type=str,
+                        nargs=2,
+                        metavar=('ENV', 'COMMANDS'),
+                        help='Replay a recorded real-time session in fast time: airtrafficsim --replay <env name> <path to commands.csv or result folder>.')
+    parser.add_argument('--batch',
+                        type=str,
+                        help='Run user defined environment for a parameter grid or seeds in parallel: airtrafficsim --batch <env name> --grid \'{"param": [1, 2]}\' --seeds 1 2 3.')
+    parser.add_argument('--grid',
+                        type=json.loads,
+                        help='JSON dictionary of environment parameters to sweep in batch mode, applied with Environment.configure().')
+    parser.add_argument('--seeds',
+                        type=int,
+                        nargs='+',
+                        help='Random seeds to run for each parameter combination in batch mode.')
+    parser.add_argument('--workers',
+                        type=int,
+                        help='Number of worker processes in batch mode (default: number of CPUs).')
 
     args = parser.parse_args()
 
@@ -45,7 +67,19 @@ def main():
             Env = getattr(import_module('airtrafficsim.data.environment.' +
                         sys.argv[2], '...'), sys.argv[2])
             env = Env()
+            env.profiler.enabled = args.profile
             env.run()
+        elif args.replay:
+            # Replay the command log of a real-time environment without UI
+            Env = getattr(import_module('airtrafficsim.data.environment.' +
+                        args.replay[0], '...'), args.replay[0])
+            env = Env()
+            env.profiler.enabled = args.profile
+            env.replay(Path(args.replay[1]))
+        elif args.batch:
+            # Run user defined environment in parallel without UI
+            from airtrafficsim.core.batch import run_batch
+            print(run_batch(args.batch, args.grid, args.seeds, args.workers).to_string(index=False))
         else:
             # Run AirTrafficSim with UI
             server.run_server()
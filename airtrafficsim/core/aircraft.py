@@ -1,10 +1,9 @@
+import inspect
 import numpy as np
 
 from airtrafficsim.core.traffic import Traffic
-from airtrafficsim.core.navigation import Nav
 from airtrafficsim.utils.unit_conversion import Unit
 from airtrafficsim.utils.calculation import Cal
-from airtrafficsim.utils.enums import APLateralMode, APThrottleMode
 
 
 class Aircraft:
@@ -69,6 +68,62 @@ class Aircraft:
                                                cruise_alt, initial_frequency, control_type)        # Add aircraft. Obtain aircraft index
         self.vectoring = ""
 
+    @staticmethod
+    def add_bulk(traffic: Traffic, aircraft):
+        """
+        Initialize many aircraft and add them to traffic array at once.
+
+        Parameters
+        ----------
+        traffic : Traffic
+            Points to the traffic array class. (The value must be self.traffic)
+        aircraft : {}[]
+            Keyword arguments of Aircraft() of each aircraft, excluding traffic
+
+        Returns
+        -------
+        Aircraft[]
+            The added aircraft
+        """
+        # Check the keyword arguments of all aircraft at once instead of binding them to the signature one by one
+        parameters = list(inspect.signature(Aircraft.__init__).parameters.values())[2:]
+        defaults = {parameter.name: parameter.default for parameter in parameters if parameter.default is not inspect.Parameter.empty}
+        unknown = set().union(*aircraft) - {parameter.name for parameter in parameters}
+        if unknown:
+            raise TypeError(f"Aircraft() got unexpected keyword arguments {sorted(unknown)}")
+        missing = [parameter.name for parameter in parameters if parameter.name not in defaults and any(parameter.name not in ac for ac in aircraft)]
+        if missing:
+            raise TypeError(f"Aircraft() missing required arguments {missing}")
+
+        kwargs = [{**defaults, **ac} for ac in aircraft]
+        for arguments in kwargs:
+            arguments['call_sign'] = arguments.pop('callsign')
+
+        return [Aircraft.from_index(traffic, index) for index in traffic.add_aircraft_bulk(kwargs)]
+
+    @staticmethod
+    def from_index(traffic: Traffic, index):
+        """
+        Get an Aircraft object of an aircraft already in traffic array.
+
+        Parameters
+        ----------
+        traffic : Traffic
+            Points to the traffic array class. (The value must be self.traffic)
+        index : int
+            Index of the aircraft (an element of Traffic.index)
+
+        Returns
+        -------
+        Aircraft
+            The aircraft
+        """
+        aircraft = Aircraft.__new__(Aircraft)
+        aircraft.traffic = traffic
+        aircraft.index = index
+        aircraft.vectoring = ""
+        return aircraft
+
     def set_heading(self, heading):
         """
         Set the heading of the aircraft.
@@ -79,8 +134,7 @@ class Aircraft:
             Heading [deg]
         """
         index = np.where(self.traffic.index == self.index)[0][0]
-        self.traffic.ap.heading[index] = heading
-        self.traffic.ap.lateral_mode[index] = APLateralMode.HEADING
+        self.traffic.ap.set_heading(index, heading)
 
     def set_speed(self, speed):
         """
@@ -92,8 +146,7 @@ class Aircraft:
             Speed [kt]
         """
         index = np.where(self.traffic.index == self.index)[0][0]
-        self.traffic.ap.cas[index] = speed
-        self.traffic.ap.auto_throttle_mode[index] = APThrottleMode.SPEED
+        self.traffic.ap.set_speed(index, speed)
 
     # def set_mach(self, mach):
     #     """Set Mach [dimensionless]"""
@@ -109,7 +162,7 @@ class Aircraft:
             Vertical speed [ft/min]
         """
         index = np.where(self.traffic.index == self.index)[0][0]
-        self.traffic.ap.vs[index] = vs
+        self.traffic.ap.set_vs(index, vs)
 
     def set_alt(self, alt):
         """
@@ -121,9 +174,7 @@ class Aircraft:
             Altitude [ft]
         """
         index = np.where(self.traffic.index == self.index)[0][0]
-        flight_plan_index = self.traffic.ap.flight_plan_index[index]
-        self.traffic.ap.flight_plan_target_alt[index][flight_plan_index] = alt
-        self.traffic.ap.alt[index] = alt
+        self.traffic.ap.set_alt(index, alt)
 
     def set_direct(self, waypoint):
         """
@@ -135,7 +186,7 @@ class Aircraft:
             ICAO code of the waypoint
         """
         index = np.where(self.traffic.index == self.index)[0][0]
-        self.traffic.ap.lateral_mode[index] = APLateralMode.LNAV
+        self.traffic.ap.set_direct(index, waypoint)
 
     def set_holding(self, holding_time, holding_fix, region):
         """
@@ -151,9 +202,7 @@ class Aircraft:
             ICAO code of the region that the aircraft should hold
         """
         index = np.where(self.traffic.index == self.index)[0][0]
-        self.traffic.ap.holding_round[index] = holding_time
-        self.traffic.ap.holding_info[index] = Nav.get_holding_procedure(
-            holding_fix, region)
+        self.traffic.ap.set_holding(index, holding_time, holding_fix, region)
 
     def set_vectoring(self, vectoring_time, v_2, fix):
         """
@@ -189,10 +238,11 @@ class Aircraft:
             self.traffic.ap.flight_plan_target_speed[index][i] = v_2
             self.traffic.ap.flight_plan_target_speed[index].insert(
                 i, self.traffic.ap.flight_plan_target_speed[index][i])
+            self.traffic.ap.flight_plan_version[index] += 1
 
     def set_altimeter(self, altimeter):
         index = np.where(self.traffic.index == self.index)[0][0]
-        self.traffic.altimeter[index] = altimeter
+        self.traffic.set_altimeter(index, altimeter)
 
     def set_flight_plan(self, arrival_airport=None, arrival_runway=None, star=None, approach=None, flight_plan=None, flight_plan_index=None, cruise_alt=None):
         """
@@ -225,15 +275,14 @@ class Aircraft:
         Set flight phase.
         """
         index = np.where(self.traffic.index == self.index)[0][0]
-        self.traffic.flight_phase[index] = flight_phase
+        self.traffic.set_flight_phase(index, flight_phase)
 
     def resume_own_navigation(self):
         """
         Resume own navigation to use autopilot instead of user commanded target.
         """
         index = np.where(self.traffic.index == self.index)[0][0]
-        self.traffic.ap.lateral_mode[index] = APLateralMode.LNAV
-        self.traffic.ap.auto_throttle_mode[index] = APThrottleMode.AUTO
+        self.traffic.ap.resume_own_navigation(index)
 
     def get_heading(self):
         """
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import functools
+
 import numpy as np
 
 from airtrafficsim.core.navigation import Nav
@@ -103,6 +105,8 @@ class Autopilot:
         self.cruise_alt = []
 
         self.flight_plan_updated = np.zeros([0], dtype=bool)
+        self.flight_plan_version = np.zeros([0], dtype=int)
+        """Version of the flight plan, incremented every time the flight plan changes [int]"""
 
         # Holding
         self.holding = np.zeros([0], dtype=bool)
@@ -133,56 +137,87 @@ class Autopilot:
             Flight plan of an aircraft
         """
 
+        self.add_aircraft_bulk([lat], [long], [alt], [heading], [cas], [departure_airport], [departure_runway], [sid], [arrival_airport], [arrival_runway],
+                               [star], [approach], [flight_plan], [flight_plan_index], [cruise_alt])
+
+    def add_aircraft_bulk(self, lat, long, alt, heading, cas, departure_airport, departure_runway, sid, arrival_airport, arrival_runway, star, approach, flight_plan, flight_plan_index, cruise_alt):
+        """
+        Add many aircraft at once and init their flight plans. The autopilot arrays are extended once for all aircraft.
+
+        Parameters
+        ----------
+        lat, long, alt, heading, cas : float[]
+            Starting latitude, longitude, altitude, heading, and calibrated air speed of each aircraft
+        departure_airport, departure_runway, sid, arrival_airport, arrival_runway, star, approach : string[]
+            Procedures of each aircraft
+        flight_plan : String[][]
+            Flight plan of each aircraft
+        flight_plan_index : int[]
+            Starting flight plan index of each aircraft
+        cruise_alt : float[]
+            Cruise altitude of each aircraft [ft]
+        """
+        k = len(lat)
+        start = len(self.lat)
+
+        def full(value=0.0):
+            return np.full(k, value)
+
         self.alt = np.append(self.alt, alt)
         self.heading = np.append(self.heading, heading)
         self.track_angle = np.append(self.track_angle, heading)
-        self.ap_rate_of_turn = np.append(self.ap_rate_of_turn, 0.0)
+        self.ap_rate_of_turn = np.append(self.ap_rate_of_turn, full())
         self.cas = np.append(self.cas, cas)
-        self.mach = np.append(self.mach, 0.0)
-        self.vs = np.append(self.vs, 0.0)
-        self.fpa = np.append(self.fpa, 0.0)
+        self.mach = np.append(self.mach, full())
+        self.vs = np.append(self.vs, full())
+        self.fpa = np.append(self.fpa, full())
         self.lat = np.append(self.lat, lat)
         self.long = np.append(self.long, long)
-        self.lat_next = np.append(self.lat_next, 0.0)
-        self.long_next = np.append(self.long_next, 0.0)
-        self.lat_prev = np.append(self.lat_prev, 0.0)
-        self.long_prev = np.append(self.long_prev, 0.0)
-        self.hv_next_wp = np.append(self.hv_next_wp, False)
-        self.dist = np.append(self.dist, 0.0)
-        self.flight_plan_index = np.append(self.flight_plan_index, 0)
-        self.flight_plan_enroute.append([])
-        self.flight_plan_name.append([])
-        self.flight_plan_lat.append([])
-        self.flight_plan_long.append([])
-        self.flight_plan_target_alt.append([])
-        self.flight_plan_target_speed.append([])
-        self.procedure_speed = np.append(self.procedure_speed, 0.0)
-        self.speed_mode = np.append(self.speed_mode, 0.0)
-        self.auto_throttle_mode = np.append(self.auto_throttle_mode, APThrottleMode.SPEED)
-        self.vertical_mode = np.append(self.vertical_mode, 0.0)
-        self.lateral_mode = np.append(self.lateral_mode, APLateralMode.HEADING)
-        self.expedite_descent = np.append(self.expedite_descent, False)
-        self.holding = np.append(self.holding, False)
-        self.holding_round = np.append(self.holding_round, 0.0)
-        self.holding_info.append([])
-
-        self.departure_airport.append(departure_airport)
-        self.departure_runway.append(departure_runway)
-        self.sid.append(sid)
-        self.arrival_airport.append(arrival_airport)
-        self.arrival_runway.append(arrival_runway)
-        self.star.append(star)
-        self.approach.append(approach)
-        self.cruise_alt.append(cruise_alt)
-        self.flight_plan_updated = np.append(self.flight_plan_updated, True)
-
-        self.set_flight_plan(-1, departure_airport, departure_runway, sid, arrival_airport, arrival_runway, star, approach, flight_plan, flight_plan_index, cruise_alt)
-
-
-    def set_flight_plan(self, index, departure_airport, departure_runway, sid, arrival_airport, arrival_runway, star, approach, flight_plan, flight_plan_index, cruise_alt):
+        self.lat_next = np.append(self.lat_next, full())
+        self.long_next = np.append(self.long_next, full())
+        self.lat_prev = np.append(self.lat_prev, full())
+        self.long_prev = np.append(self.long_prev, full())
+        self.hv_next_wp = np.append(self.hv_next_wp, full(False))
+        self.dist = np.append(self.dist, full())
+        self.flight_plan_index = np.append(self.flight_plan_index, full(0))
+        self.flight_plan_enroute.extend([] for _ in range(k))
+        self.flight_plan_name.extend([] for _ in range(k))
+        self.flight_plan_lat.extend([] for _ in range(k))
+        self.flight_plan_long.extend([] for _ in range(k))
+        self.flight_plan_target_alt.extend([] for _ in range(k))
+        self.flight_plan_target_speed.extend([] for _ in range(k))
+        self.procedure_speed = np.append(self.procedure_speed, full())
+        self.speed_mode = np.append(self.speed_mode, full())
+        self.auto_throttle_mode = np.append(self.auto_throttle_mode, full(APThrottleMode.SPEED))
+        self.vertical_mode = np.append(self.vertical_mode, full())
+        self.lateral_mode = np.append(self.lateral_mode, full(APLateralMode.HEADING))
+        self.expedite_descent = np.append(self.expedite_descent, full(False))
+        self.holding = np.append(self.holding, full(False))
+        self.holding_round = np.append(self.holding_round, full())
+        self.holding_info.extend([] for _ in range(k))
+
+        self.departure_airport.extend(departure_airport)
+        self.departure_runway.extend(departure_runway)
+        self.sid.extend(sid)
+        self.arrival_airport.extend(arrival_airport)
+        self.arrival_runway.extend(arrival_runway)
+        self.star.extend(star)
+        self.approach.extend(approach)
+        self.cruise_alt.extend(cruise_alt)
+        self.flight_plan_updated = np.append(self.flight_plan_updated, full(True))
+        self.flight_plan_version = np.append(self.flight_plan_version, full(-1))
+
+        # Flight plans have different lengths and are set one by one, but the navigation data lookups are shared as many aircraft fly the same procedures
+        nav = _NavCache()
+        for j in range(k):
+            self.set_flight_plan(start + j, departure_airport[j], departure_runway[j], sid[j], arrival_airport[j], arrival_runway[j], star[j], approach[j],
+                                 flight_plan[j], flight_plan_index[j], cruise_alt[j], nav)
+
+
+    def set_flight_plan(self, index, departure_airport, departure_runway, sid, arrival_airport, arrival_runway, star, approach, flight_plan, flight_plan_index, cruise_alt, nav=Nav):
         print("Set flight plan original:", self.flight_plan_name[index])
 
-        lat_dep, long_dep, alt_dep = Nav.get_runway_coord(departure_airport, departure_runway[2:])
+        lat_dep, long_dep, alt_dep = nav.get_runway_coord(departure_airport, departure_runway[2:])
 
         self.departure_airport[index] = departure_airport
         self.departure_runway[index] = departure_runway
@@ -203,11 +238,12 @@ class Autopilot:
         # Add 1 to account for origin
         self.flight_plan_index[index] = flight_plan_index + 1
         self.flight_plan_updated[index] = True
+        self.flight_plan_version[index] += 1
 
         # if not flight_plan == []:
         # Add SID to flight plan
         if not sid == "":
-            waypoint, alt_restriction_type, alt_restriction, speed_resctriction_type, speed_restriction = Nav.get_procedure(departure_airport, departure_runway, sid)
+            waypoint, alt_restriction_type, alt_restriction, speed_resctriction_type, speed_restriction = nav.get_procedure(departure_airport, departure_runway, sid)
             if len(waypoint) > 0:
                 # TODO: Ignored alt restriction 2, alt restriction type, and speed restriction type
                 self.flight_plan_name[index].extend(waypoint)
@@ -231,7 +267,7 @@ class Autopilot:
 
         # Add STAR to flight plan
         if not star == "":
-            waypoint, alt_restriction_type, alt_restriction, speed_resctriction_type, speed_restriction = Nav.get_procedure(arrival_airport, arrival_runway[2:], star)
+            waypoint, alt_restriction_type, alt_restriction, speed_resctriction_type, speed_restriction = nav.get_procedure(arrival_airport, arrival_runway[2:], star)
             if len(waypoint) > 0:
                 self.flight_plan_name[index].extend(waypoint)
                 self.flight_plan_target_alt[index].extend(alt_restriction)
@@ -243,7 +279,7 @@ class Autopilot:
 
         if not approach == "":
             # Add Initial Approach to flight plan
-            waypoint, alt_restriction_type, alt_restriction, speed_resctriction_type, speed_restriction = Nav.get_procedure(arrival_airport, arrival_runway[2:], approach, appch="A", iaf=self.flight_plan_name[index][-1])
+            waypoint, alt_restriction_type, alt_restriction, speed_resctriction_type, speed_restriction = nav.get_procedure(arrival_airport, arrival_runway[2:], approach, appch="A", iaf=self.flight_plan_name[index][-1])
             if len(waypoint) > 0:
                 # All waypoints are the same (can happen for IAPs where IAF is also a procedure turn)
                 if len(set(waypoint)) == 1:
@@ -265,7 +301,7 @@ class Autopilot:
                     self.flight_plan_target_speed[index].extend(speed_restriction)
 
             # Add Final Approach to flight plan
-            waypoint, alt_restriction_type, alt_restriction, speed_resctriction_type, speed_restriction = Nav.get_procedure(arrival_airport, arrival_runway[2:], approach, appch=approach[0])
+            waypoint, alt_restriction_type, alt_restriction, speed_resctriction_type, speed_restriction = nav.get_procedure(arrival_airport, arrival_runway[2:], approach, appch=approach[0])
             if len(waypoint) > 0:
                 # Remove last element of flight plan which should be equal to iaf
                 self.flight_plan_name[index].pop()
@@ -288,17 +324,17 @@ class Autopilot:
         # Get Lat Long of flight plan waypoints
         for i, val in enumerate(self.flight_plan_name[index]):
             if i == 0:
-                lat_tmp, long_tmp = Nav.get_wp_coord(val, self.lat[index], self.long[index])
+                lat_tmp, long_tmp = nav.get_wp_coord(val, self.lat[index], self.long[index])
                 self.flight_plan_lat[index].append(lat_tmp)
                 self.flight_plan_long[index].append(long_tmp)
             else:
-                lat_tmp, long_tmp = Nav.get_wp_coord(val, self.flight_plan_lat[index][i - 1], self.flight_plan_long[index][i - 1])
+                lat_tmp, long_tmp = nav.get_wp_coord(val, self.flight_plan_lat[index][i - 1], self.flight_plan_long[index][i - 1])
                 self.flight_plan_lat[index].append(lat_tmp)
                 self.flight_plan_long[index].append(long_tmp)
 
         # TODO: Add runway lat long alt
         if not arrival_runway == "":
-            lat_tmp, long_tmp, alt_tmp = Nav.get_runway_coord(arrival_airport, arrival_runway[2:])
+            lat_tmp, long_tmp, alt_tmp = nav.get_runway_coord(arrival_airport, arrival_runway[2:])
             if self.flight_plan_name[index][-1] == arrival_runway:
                 self.flight_plan_lat[index][-1] = lat_tmp
                 self.flight_plan_long[index][-1] = long_tmp
@@ -322,7 +358,7 @@ class Autopilot:
                 elif rwy_letter == 'C':
                     opp_runway = opp_runway + 'C'
 
-                lat_tmp, long_tmp, alt_tmp = Nav.get_runway_coord(arrival_airport, opp_runway)
+                lat_tmp, long_tmp, alt_tmp = nav.get_runway_coord(arrival_airport, opp_runway)
                 self.flight_plan_name[index].append(f'{arrival_airport}_{arrival_runway}_END')
                 self.flight_plan_lat[index].append(lat_tmp)
                 self.flight_plan_long[index].append(long_tmp)
@@ -352,13 +388,117 @@ class Autopilot:
 
 
 
+    def set_heading(self, index, heading):
+        """
+        Set the target heading of one or many aircraft.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Position of the aircraft in the traffic array
+        heading : float or float[]
+            Heading [deg]
+        """
+        self.heading[index] = heading
+        self.lateral_mode[index] = APLateralMode.HEADING
+
+    def set_speed(self, index, cas):
+        """
+        Set the target calibrated air speed of one or many aircraft.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Position of the aircraft in the traffic array
+        cas : float or float[]
+            Calibrated air speed [kt]
+        """
+        self.cas[index] = cas
+        self.auto_throttle_mode[index] = APThrottleMode.SPEED
+
+    def set_vs(self, index, vs):
+        """
+        Set the target vertical speed of one or many aircraft.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Position of the aircraft in the traffic array
+        vs : float or float[]
+            Vertical speed [ft/min]
+        """
+        self.vs[index] = vs
+
+    def set_alt(self, index, alt):
+        """
+        Set the target altitude of one or many aircraft, including the altitude of their current flight plan leg.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Position of the aircraft in the traffic array
+        alt : float or float[]
+            Altitude [ft]
+        """
+        self.alt[index] = alt
+        for i, value in zip(*np.broadcast_arrays(np.atleast_1d(index), alt)):
+            if self.flight_plan_index[i] < len(self.flight_plan_target_alt[i]):
+                self.flight_plan_target_alt[i][self.flight_plan_index[i]] = value
+
+    def set_direct(self, index, waypoint=None):
+        """
+        Set one or many aircraft direct to a waypoint of their flight plan.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Position of the aircraft in the traffic array
+        waypoint : str or str[], optional
+            ICAO code of the waypoint, by default None
+        """
+        self.lateral_mode[index] = APLateralMode.LNAV
+
+    def set_holding(self, index, holding_time, holding_fix, region):
+        """
+        Set the holding procedure of one or many aircraft.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Position of the aircraft in the traffic array
+        holding_time : float or float[]
+            How long should the aircraft hold [second]
+        holding_fix : str or str[]
+            ICAO code of the fix that the aircraft should hold
+        region : str or str[]
+            ICAO code of the region that the aircraft should hold
+        """
+        self.holding_round[index] = holding_time
+        procedures = {}
+        for i, fix, fix_region in zip(*np.broadcast_arrays(np.atleast_1d(index), holding_fix, region)):
+            if (fix, fix_region) not in procedures:
+                procedures[(fix, fix_region)] = Nav.get_holding_procedure(str(fix), str(fix_region))
+            self.holding_info[i] = list(procedures[(fix, fix_region)])
+
+    def resume_own_navigation(self, index):
+        """
+        Resume own navigation of one or many aircraft to use the flight plan and procedures instead of user commanded targets.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Position of the aircraft in the traffic array
+        """
+        self.lateral_mode[index] = APLateralMode.LNAV
+        self.auto_throttle_mode[index] = APThrottleMode.AUTO
+
     def del_aircraft(self, index):
         """
         Delete aircraft
 
         Parameters
         ----------
-        index : float
+        index : int or int[]
             The index of the aircraft to be deleted
         """
         self.alt = np.delete(self.alt, index)
@@ -378,12 +518,6 @@ class Autopilot:
         self.hv_next_wp = np.delete(self.hv_next_wp, index)
         self.dist = np.delete(self.dist, index)
         self.flight_plan_index = np.delete(self.flight_plan_index, index)
-        del self.flight_plan_enroute[index]
-        del self.flight_plan_name[index]
-        del self.flight_plan_lat[index]
-        del self.flight_plan_long[index]
-        del self.flight_plan_target_alt[index]
-        del self.flight_plan_target_speed[index]
         self.procedure_speed = np.delete(self.procedure_speed, index)
         self.speed_mode = np.delete(self.speed_mode, index)
         self.auto_throttle_mode = np.delete(self.auto_throttle_mode, index)
@@ -392,16 +526,24 @@ class Autopilot:
         self.expedite_descent =np.delete(self.expedite_descent, index)
         self.holding = np.delete(self.holding, index)
         self.holding_round = np.delete(self.holding_round, index)
-        del self.holding_info[index]
-
-        del self.departure_airport[index]
-        del self.departure_runway[index]
-        del self.sid[index]
-        del self.arrival_airport[index]
-        del self.arrival_runway[index]
-        del self.star[index]
-        del self.approach[index]
         self.flight_plan_updated = np.delete(self.flight_plan_updated, index)
+        self.flight_plan_version = np.delete(self.flight_plan_version, index)
+
+        for i in np.sort(np.atleast_1d(index))[::-1]:
+            del self.flight_plan_enroute[i]
+            del self.flight_plan_name[i]
+            del self.flight_plan_lat[i]
+            del self.flight_plan_long[i]
+            del self.flight_plan_target_alt[i]
+            del self.flight_plan_target_speed[i]
+            del self.holding_info[i]
+            del self.departure_airport[i]
+            del self.departure_runway[i]
+            del self.sid[i]
+            del self.arrival_airport[i]
+            del self.arrival_runway[i]
+            del self.star[i]
+            del self.approach[i]
 
 
     def update(self, traffic: Traffic):
@@ -414,40 +556,41 @@ class Autopilot:
             Traffic class
         """
         # Update target based on flight plan
-        for i, val in enumerate(self.flight_plan_index):    #TODO: optimization
-            if val < len(self.flight_plan_name[i]):
-                # Target Flight Plan Lat/Long
-                # print(f"Target waypoint: {self.flight_plan_name[i][val]} @ {self.flight_plan_lat[i][val]}, {self.flight_plan_long[i][val]}")
-
-                self.lat_prev[i] = self.flight_plan_lat[i][val-1]
-                self.long_prev[i] = self.flight_plan_long[i][val-1]
-
-                self.lat[i] = self.flight_plan_lat[i][val]
-                self.long[i] = self.flight_plan_long[i][val]
-
-                # print('prev waypoint (we just passed):', self.flight_plan_name[i][val-1])
-                # print('curr waypoint (we are going to):', self.flight_plan_name[i][val])
-                # print('next waypoint (we will be going to):', self.flight_plan_name[i][val+1])
-
-                if val == len(self.flight_plan_name[i]) - 1:
-                    self.hv_next_wp[i] = False
+        with traffic.profiler.measure('autopilot.flight_plan'):
+            for i, val in enumerate(self.flight_plan_index):    #TODO: optimization
+                if val < len(self.flight_plan_name[i]):
+                    # Target Flight Plan Lat/Long
+                    # print(f"Target waypoint: {self.flight_plan_name[i][val]} @ {self.flight_plan_lat[i][val]}, {self.flight_plan_long[i][val]}")
+
+                    self.lat_prev[i] = self.flight_plan_lat[i][val-1]
+                    self.long_prev[i] = self.flight_plan_long[i][val-1]
+
+                    self.lat[i] = self.flight_plan_lat[i][val]
+                    self.long[i] = self.flight_plan_long[i][val]
+
+                    # print('prev waypoint (we just passed):', self.flight_plan_name[i][val-1])
+                    # print('curr waypoint (we are going to):', self.flight_plan_name[i][val])
+                    # print('next waypoint (we will be going to):', self.flight_plan_name[i][val+1])
+
+                    if val == len(self.flight_plan_name[i]) - 1:
+                        self.hv_next_wp[i] = False
+                    else:
+                        # print(f"Next waypoint: {self.flight_plan_name[i][val+1]} @ {self.flight_plan_lat[i][val+1]}, {self.flight_plan_long[i][val+1]}")
+                        self.lat_next[i] = self.flight_plan_lat[i][val+1]
+                        self.long_next[i] = self.flight_plan_long[i][val+1]
+                        self.hv_next_wp[i] = True
+
+                    # Target Flight Plan Altitude
+                    if len(self.flight_plan_target_alt[i]) > 1:
+                        self.alt[i] = self.flight_plan_target_alt[i][val]
+                    # Target Flight Plan Speed
+                    # if len(self.flight_plan_target_speed[i]) > 1:
+                    #     if (self.flight_plan_target_speed[i][val] < 1.0):
+                    #         self.mach[i] = self.flight_plan_target_speed[i][val]
+                    #     else:
+                    #         self.cas[i] = self.flight_plan_target_speed[i][val]
                 else:
-                    # print(f"Next waypoint: {self.flight_plan_name[i][val+1]} @ {self.flight_plan_lat[i][val+1]}, {self.flight_plan_long[i][val+1]}")
-                    self.lat_next[i] = self.flight_plan_lat[i][val+1]
-                    self.long_next[i] = self.flight_plan_long[i][val+1]
-                    self.hv_next_wp[i] = True
-
-                # Target Flight Plan Altitude
-                if len(self.flight_plan_target_alt[i]) > 1:
-                    self.alt[i] = self.flight_plan_target_alt[i][val]
-                # Target Flight Plan Speed
-                # if len(self.flight_plan_target_speed[i]) > 1:
-                #     if (self.flight_plan_target_speed[i][val] < 1.0):
-                #         self.mach[i] = self.flight_plan_target_speed[i][val]
-                #     else:
-                #         self.cas[i] = self.flight_plan_target_speed[i][val]
-            else:
-                self.lateral_mode[i] = APLateralMode.HEADING
+                    self.lateral_mode[i] = APLateralMode.HEADING
 
         # self.alt = np.minimum(self.alt, traffic.max_alt)   #Altitude
 
@@ -462,8 +605,10 @@ class Autopilot:
         self.mach = np.minimum(self.mach, traffic.max_mach)
 
         # Handle change in speed mode.
-        self.mach = np.where(traffic.speed_mode == SpeedMode.CAS, traffic.perf.tas_to_mach(traffic.perf.cas_to_tas(Unit.kts2mps(self.cas), traffic.weather.p, traffic.weather.rho), traffic.weather.T), self.mach)
-        self.cas = np.where(traffic.speed_mode == SpeedMode.MACH, Unit.mps2kts(traffic.perf.tas_to_cas(traffic.perf.mach_to_tas(self.mach, traffic.weather.T), traffic.weather.p, traffic.weather.rho)), self.cas)
+        cas_mode = np.flatnonzero(traffic.speed_mode == SpeedMode.CAS)
+        mach_mode = np.flatnonzero(traffic.speed_mode == SpeedMode.MACH)
+        self.mach[cas_mode] = traffic.perf.tas_to_mach_at(traffic.perf.cas_to_tas_at(Unit.kts2mps(self.cas[cas_mode]), cas_mode), cas_mode)
+        self.cas[mach_mode] = Unit.mps2kts(traffic.perf.tas_to_cas_at(traffic.perf.mach_to_tas_at(self.mach[mach_mode], mach_mode), mach_mode))
 
         # Speed mode
         self.speed_mode = np.where(traffic.speed_mode == SpeedMode.CAS,
@@ -485,43 +630,44 @@ class Autopilot:
                                             ])
 
         # Waypoint, track angle, and heading
-        # dist = np.where(self.lateral_mode == AP_lateral_mode.HEADING, 0.0, Calculation.cal_great_circle_distance(traffic.lat, traffic.long, self.lat, self.long))   #km
-        dist = Cal.cal_great_circle_dist(traffic.lat, traffic.long, self.lat, self.long)   #km
+        with traffic.profiler.measure('autopilot.lnav'):
+            # dist = np.where(self.lateral_mode == AP_lateral_mode.HEADING, 0.0, Calculation.cal_great_circle_distance(traffic.lat, traffic.long, self.lat, self.long))   #km
+            dist = Cal.cal_great_circle_dist(traffic.lat, traffic.long, self.lat, self.long)   #km
 
-        self.dist = np.where(self.flight_plan_updated, dist, self.dist)
-        self.flight_plan_updated = np.where(self.flight_plan_updated, False, self.flight_plan_updated)
+            self.dist = np.where(self.flight_plan_updated, dist, self.dist)
+            self.flight_plan_updated = np.where(self.flight_plan_updated, False, self.flight_plan_updated)
 
-        # cross_track = Cal.cal_cross_track_dist(self.lat_prev, self.long_prev, self.lat, self.long, traffic.lat, traffic.long)
-        # cross_track2 = Cal.cal_dist_off_path(self.lat_prev, self.long_prev, self.lat, self.long, traffic.lat, traffic.long)
-        # print(cross_track, cross_track2)
+            # cross_track = Cal.cal_cross_track_dist(self.lat_prev, self.long_prev, self.lat, self.long, traffic.lat, traffic.long)
+            # cross_track2 = Cal.cal_dist_off_path(self.lat_prev, self.long_prev, self.lat, self.long, traffic.lat, traffic.long)
+            # print(cross_track, cross_track2)
 
-        # Fly by turn
-        turn_radius = traffic.perf.cal_turn_radius(traffic.perf.get_bank_angles(traffic.configuration), Unit.kts2mps(traffic.tas)) / 1000.0     #km
-        next_track_angle = np.where(self.hv_next_wp, Cal.cal_great_circle_bearing(self.lat, self.long, self.lat_next, self.long_next), self.track_angle)    # Next track angle to next next waypoint
-        curr_track_angle = Cal.cal_great_circle_bearing(traffic.lat, traffic.long, self.lat, self.long) # Current track angle to next waypoint #!TODO consider current heading
-        turn_dist = turn_radius * np.tan(np.deg2rad(np.abs(Cal.cal_angle_diff(next_track_angle, curr_track_angle)) / 2.0)) * 0.8    # Distance to turn
+            # Fly by turn
+            turn_radius = traffic.perf.cal_turn_radius(traffic.perf.get_bank_angles(traffic.configuration), Unit.kts2mps(traffic.tas)) / 1000.0     #km
+            next_track_angle = np.where(self.hv_next_wp, Cal.cal_great_circle_bearing(self.lat, self.long, self.lat_next, self.long_next), self.track_angle)    # Next track angle to next next waypoint
+            curr_track_angle = Cal.cal_great_circle_bearing(traffic.lat, traffic.long, self.lat, self.long) # Current track angle to next waypoint #!TODO consider current heading
+            turn_dist = turn_radius * np.tan(np.deg2rad(np.abs(Cal.cal_angle_diff(next_track_angle, curr_track_angle)) / 2.0)) * 0.8    # Distance to turn
 
-        # Adjust track angle for cross track
-        cross_track = Cal.cal_dist_off_path(self.lat_prev, self.long_prev, self.lat, self.long, traffic.lat, traffic.long)
-        # Apply 20 degree correction angle when cross track is greater than 200m, otherwise scale down to 0
-        correction = np.where(np.abs(cross_track) > 200, np.sign(cross_track) * 20, 20 * (1 - np.exp(-cross_track / 40)))
-        curr_track_angle = curr_track_angle + correction
+            # Adjust track angle for cross track
+            cross_track = Cal.cal_dist_off_path(self.lat_prev, self.long_prev, self.lat, self.long, traffic.lat, traffic.long)
+            # Apply 20 degree correction angle when cross track is greater than 200m, otherwise scale down to 0
+            correction = np.where(np.abs(cross_track) > 200, np.sign(cross_track) * 20, 20 * (1 - np.exp(-cross_track / 40)))
+            curr_track_angle = curr_track_angle + correction
 
-        # print(cross_track, correction, curr_track_angle)
+            # print(cross_track, correction, curr_track_angle)
 
-        lnav_track_angle = np.where(
-            dist < turn_dist,
-            np.where(self.hv_next_wp, next_track_angle, self.track_angle),
-            np.where(dist < 1.0, self.track_angle, curr_track_angle)
-        )
+            lnav_track_angle = np.where(
+                dist < turn_dist,
+                np.where(self.hv_next_wp, next_track_angle, self.track_angle),
+                np.where(dist < 1.0, self.track_angle, curr_track_angle)
+            )
 
-        self.track_angle =  np.where(self.lateral_mode == APLateralMode.HEADING, 0.0, lnav_track_angle)
-        self.heading = np.where(self.lateral_mode == APLateralMode.HEADING, self.heading, self.track_angle + np.arcsin(traffic.weather.wind_speed / traffic.tas * np.sin(self.track_angle - traffic.weather.wind_direction))) #https://www.omnicalculator.com/physics/wind-correction-angle
+            self.track_angle =  np.where(self.lateral_mode == APLateralMode.HEADING, 0.0, lnav_track_angle)
+            self.heading = np.where(self.lateral_mode == APLateralMode.HEADING, self.heading, self.track_angle + np.arcsin(traffic.weather.wind_speed / traffic.tas * np.sin(self.track_angle - traffic.weather.wind_direction))) #https://www.omnicalculator.com/physics/wind-correction-angle
 
-        update_next_wp = (self.lateral_mode == APLateralMode.LNAV) & (dist > self.dist) & (np.abs(Cal.cal_angle_diff(traffic.heading, next_track_angle)) < 1.0)
-        # print(f"Update next waypoint: {update_next_wp}")
-        self.flight_plan_index = np.where(update_next_wp, self.flight_plan_index+1, self.flight_plan_index)
-        self.dist = np.where(update_next_wp, Cal.cal_great_circle_dist(traffic.lat, traffic.long, self.lat_next, self.long_next), dist)
+            update_next_wp = (self.lateral_mode == APLateralMode.LNAV) & (dist > self.dist) & (np.abs(Cal.cal_angle_diff(traffic.heading, next_track_angle)) < 1.0)
+            # print(f"Update next waypoint: {update_next_wp}")
+            self.flight_plan_index = np.where(update_next_wp, self.flight_plan_index+1, self.flight_plan_index)
+            self.dist = np.where(update_next_wp, Cal.cal_great_circle_dist(traffic.lat, traffic.long, self.lat_next, self.long_next), dist)
 
         # Fly over turn
         # self.track_angle =  np.where(self.lateral_mode == AP_lateral_mode.HEADING, 0.0, np.where(dist<1.0, self.track_angle, Calculation.cal_great_circle_bearing(traffic.lat, traffic.long, self.lat, self.long)))
@@ -530,24 +676,38 @@ class Autopilot:
         # self.dist = dist
 
         # Holding
-        for i, val in enumerate(self.holding):
-            if self.holding[i] == False:
-                if self.holding_info[i] and np.abs(Cal.cal_angle_diff(self.heading[i], self.holding_info[i][4])) < 90.0 and self.flight_plan_index[i] > self.flight_plan_name[i].index(self.holding_info[i][0]):   # Turn outbound
-                    self.heading[i] = np.mod(self.holding_info[i][4] + 180, 360)
-                    self.holding_round[i] -= 1
-                    self.flight_plan_index[i] -= 1
-                    self.lateral_mode[i] = APLateralMode.HEADING
-                    self.holding[i] = True
-            else:
-                if np.abs(Cal.cal_angle_diff(self.heading[i], self.holding_info[i][4])) < 90.0 and dist[i] < 1:   # Turn outbound
-                    self.heading[i] = np.mod(self.holding_info[i][4] + 180, 360)
-                    self.holding_round[i] -= 1
-
-                if np.abs(Cal.cal_angle_diff(self.heading[i], self.holding_info[i][4] + 180.0)) < 90.0 and dist[i] > Unit.nm2m(self.holding_info[i][6])/1000.0: # Turn inbound
-                    self.heading[i] = self.holding_info[i][4]
-                    if self.holding_round[i] <= 0:
-                        self.lateral_mode[i] = APLateralMode.LNAV
-                        self.holding[i] = False
-                        self.holding_info[i] = []
-
-                    # update_next_wp[i] = False
+        with traffic.profiler.measure('autopilot.holding'):
+            for i, val in enumerate(self.holding):
+                if self.holding[i] == False:
+                    if self.holding_info[i] and np.abs(Cal.cal_angle_diff(self.heading[i], self.holding_info[i][4])) < 90.0 and self.flight_plan_index[i] > self.flight_plan_name[i].index(self.holding_info[i][0]):   # Turn outbound
+                        self.heading[i] = np.mod(self.holding_info[i][4] + 180, 360)
+                        self.holding_round[i] -= 1
+                        self.flight_plan_index[i] -= 1
+                        self.lateral_mode[i] = APLateralMode.HEADING
+                        self.holding[i] = True
+                else:
+                    if np.abs(Cal.cal_angle_diff(self.heading[i], self.holding_info[i][4])) < 90.0 and dist[i] < 1:   # Turn outbound
+                        self.heading[i] = np.mod(self.holding_info[i][4] + 180, 360)
+                        self.holding_round[i] -= 1
+
+                    if np.abs(Cal.cal_angle_diff(self.heading[i], self.holding_info[i][4] + 180.0)) < 90.0 and dist[i] > Unit.nm2m(self.holding_info[i][6])/1000.0: # Turn inbound
+                        self.heading[i] = self.holding_info[i][4]
+                        if self.holding_round[i] <= 0:
+                            self.lateral_mode[i] = APLateralMode.LNAV
+                            self.holding[i] = False
+                            self.holding_info[i] = []
+
+                        # update_next_wp[i] = False
+
+
+class _NavCache:
+    """
+    Navigation data lookups of the flight plans of many aircraft added at once.
+
+    The procedure and coordinate lookups of Nav are pure functions of their arguments, so each distinct lookup is done once.
+    """
+
+    def __init__(self):
+        self.get_wp_coord = functools.lru_cache(maxsize=None)(Nav.get_wp_coord)
+        self.get_runway_coord = functools.lru_cache(maxsize=None)(Nav.get_runway_coord)
+        self.get_procedure = functools.lru_cache(maxsize=None)(Nav.get_procedure)
@@ -0,0 +1,123 @@
+"""Run a user defined environment many times in parallel for parameter sweeps and Monte Carlo studies."""
+import time
+import random
+import itertools
+from datetime import datetime
+from importlib import import_module
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+from airtrafficsim.core.environment import Environment, UnknownParameterError
+
+
+def expand_runs(grid=None, seeds=None):
+    """
+    Expand a parameter grid and a list of random seeds into a list of runs.
+
+    Parameters
+    ----------
+    grid : {str: []}, optional
+        Parameter name to the list of values to sweep, by default None
+    seeds : int[], optional
+        Random seeds to run for every parameter combination, by default None
+
+    Returns
+    -------
+    [({}, int)]
+        List of (parameters, seed) of each run
+    """
+    grid = grid if grid else {}
+    seeds = seeds if seeds else [None]
+    combinations = [dict(zip(grid.keys(), values)) for values in itertools.product(*grid.values())]
+    return [(params, seed) for params in combinations for seed in seeds]
+
+
+def run_environment(env_name, params, seed, output_path):
+    """
+    Run one environment and return its summary metrics. This function is executed in a worker process.
+
+    Parameters
+    ----------
+    env_name : str
+        Environment file name in data/environment/
+    params : {}
+        Parameters applied with Environment.configure() before running
+    seed : int
+        Random seed of numpy and random module
+    output_path : Path
+        Isolated folder to store the result of this run
+
+    Returns
+    -------
+    {}
+        Summary metrics of the run including the wall clock runtime [s]
+    """
+    Environment.result_path = output_path
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+
+    Env = getattr(import_module('airtrafficsim.data.environment.' + env_name, '...'), env_name)
+    start_time = time.time()
+    env = Env()
+    env.configure(**params)
+    env.run()
+
+    summary = env.get_summary()
+    summary['runtime'] = time.time() - start_time
+    return summary
+
+
+def run_batch(env_name, grid=None, seeds=None, workers=None, output_path=None):
+    """
+    Run an environment for all combinations of a parameter grid and random seeds over a process pool.
+
+    Parameters
+    ----------
+    env_name : str
+        Environment file name in data/environment/
+    grid : {str: []}, optional
+        Parameter name to the list of values to sweep, by default None.
+        The parameters are applied with Environment.configure() after constructing the environment.
+        A parameter that the environment does not have stops the batch with an UnknownParameterError. Other errors
+        are recorded in the error column of the run.
+    seeds : int[], optional
+        Random seeds to run for every parameter combination, by default None
+    workers : int, optional
+        Number of worker processes, by default the number of CPUs
+    output_path : Path, optional
+        Folder to store the results, by default data/result/<time>-<env_name>-batch
+
+    Returns
+    -------
+    pandas.DataFrame
+        Summary table of all runs (also saved to summary.csv in the output folder)
+    """
+    if output_path is None:
+        output_path = Environment.result_path.joinpath(datetime.now().isoformat(timespec='seconds') + '-' + env_name + '-batch')
+    output_path.mkdir(parents=True)
+
+    runs = expand_runs(grid, seeds)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_environment, env_name, params, seed, output_path.joinpath(f'run_{i:04d}')): i
+                   for i, (params, seed) in enumerate(runs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            params, seed = runs[i]
+            try:
+                summary = future.result()
+            except UnknownParameterError:
+                # Unknown parameters fail every run, so stop the batch instead of recording an error per run
+                for pending in futures:
+                    pending.cancel()
+                raise
+            except Exception as e:
+                summary = {'error': repr(e)}
+            print("Batch - run", i, params, "seed", seed, "finished", summary)
+            results.append({'run': i, **params, 'seed': seed, **summary})
+
+    df = pd.DataFrame(results).sort_values('run')
+    df.to_csv(output_path.joinpath('summary.csv'), index=False)
+    return df
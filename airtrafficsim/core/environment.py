@@ -1,13 +1,66 @@
 import time
-from datetime import datetime, timedelta, timezone
+import copy
+import heapq
+import pickle
+import struct
+import multiprocessing
+from collections import deque
+from datetime import datetime, timezone
 import numpy as np
 import pandas as pd
 import csv
 from pathlib import Path
 
-from airtrafficsim.utils.unit_conversion import Unit
 from airtrafficsim.utils.enums import FlightPhase, Config, SpeedMode, VerticalMode, APSpeedMode, APThrottleMode, APVerticalMode, APLateralMode
 from airtrafficsim.core.traffic import Traffic
+from airtrafficsim.core.aircraft import Aircraft
+from airtrafficsim.core.telemetry import Telemetry
+
+
+SNAPSHOT_MAGIC = b'ATSSNAP'
+"""File signature of simulation snapshots"""
+SNAPSHOT_VERSION = 7
+"""Version of simulation snapshots. Snapshots pickle the environment object, so increase it whenever an attribute of the
+environment, traffic, autopilot, performance, or weather classes is added, removed, or changes meaning."""
+
+class UnknownParameterError(TypeError):
+    """Raised by Environment.configure() for a parameter that the environment does not have"""
+
+
+_fork_parent = None
+"""(environment, branches, metrics) inherited by forked branch worker processes"""
+
+
+def _run_fork_branch(i, duration, state=None):
+    """
+    Run one branch of Environment.fork() in a worker process.
+
+    Parameters
+    ----------
+    i : int
+        Index of the branch
+    duration : int
+        Number of timesteps to run [s]
+    state : bytes, optional
+        Pickled (environment, branches, metrics) when the worker is not forked from the parent, by default None
+
+    Returns
+    -------
+    {}
+        Metrics of the branch
+    """
+    env, branches, metrics = _fork_parent if state is None else pickle.loads(state)
+    # Branches must not write to the log files or socket of the original session
+    for key in ('sim_file', 'sim_writer', 'cmd_file', 'cmd_writer', 'socketio'):
+        env.__dict__.pop(key, None)
+
+    if branches[i] is not None:
+        branches[i](env)
+    for _ in range(duration):
+        if env.should_end():
+            break
+        env.step()
+    return env.get_summary() if metrics is None else metrics(env)
 
 
 class Environment:
@@ -16,7 +69,10 @@ class Environment:
 
     """
 
-    def __init__(self, file_name, start_time, end_time, weather_mode="ISA", performance_mode="BADA", create_log_file=True):
+    result_path = Path(__file__).parent.parent.resolve().joinpath('data/result')
+    """Directory to store the result folders [Path]"""
+
+    def __init__(self, file_name, start_time, end_time, weather_mode="ISA", performance_mode="BADA", create_log_file=True, profile=False, atmosphere_mode="FORMULA"):
         # User setting
         self.start_time = start_time
         """The simulation start time [datetime object]"""
@@ -25,15 +81,18 @@ class Environment:
 
         # Simulation variable
         self.traffic = Traffic(file_name, start_time,
-                               end_time, weather_mode, performance_mode)
+                               end_time, weather_mode, performance_mode, atmosphere_mode)
+        self.profiler = self.traffic.profiler
+        """Profiler of the simulation timestep stages"""
+        self.profiler.enabled = profile
         self.global_time = 0                    # [s]
+        self.total_flight_time = 0              # [s] Sum of the time all aircraft spent in the simulation
 
         # Handle io
         self.datetime = datetime.now(timezone.utc)
         self.last_sent_time = time.time()
         self.graph_type = 'None'
         self.packet_id = 0
-        self.buffer_data = []
 
         self.paused = False
         self.stopped = False
@@ -42,14 +101,44 @@ class Environment:
 
         self.traffic_order = None
 
+        self.telemetry = Telemetry()
+        """Telemetry streams of the connected clients"""
+        self.room = None
+        """Socket.IO room of the clients of this simulation (None to broadcast to all clients)"""
+        self.cpu_time = 0.0
+        """CPU time spent in the simulation timesteps [s]"""
+        self.command_queue = deque()
+        """Commands from clients waiting to be applied at the next timestep [(receive time, sid, aircraft, command, payload, response, callback)]"""
+        self.spawn_queue = []
+        """Heap of aircraft waiting to enter the simulation [(spawn time [s], order, {Aircraft keyword arguments})]"""
+        self.spawn_count = 0
+        """Number of aircraft ever scheduled, used to keep the spawn order of aircraft with the same spawn time"""
+        self.retire_queue = []
+        """Index of aircraft to be deleted at the end of the timestep [int[]]"""
+        self.aircraft = {}
+        """Aircraft spawned by the scheduler [{callsign: Aircraft}]"""
+        self.command_schedule = []
+        """Heap of scheduled commands waiting for their time [(global time [s], order, (aircraft, command, args))]"""
+        self.command_count = 0
+        """Number of commands ever scheduled by time, used to keep the order of commands with the same time"""
+        self.conditional_commands = []
+        """Scheduled commands waiting for their condition [(condition, (aircraft, command, args))]"""
+
         if create_log_file:
             self.create_log_files(file_name)
 
 
     def create_log_files(self, directory_name):
-        self.file_name = datetime.now().isoformat(timespec='seconds') + '-' + directory_name
-        self.folder_path = Path(__file__).parent.parent.resolve().joinpath('data/result/' + self.file_name)
-        self.folder_path.mkdir()
+        self.log_name = directory_name
+        file_name = datetime.now().isoformat(timespec='seconds') + '-' + directory_name
+        self.file_name = file_name
+        # Environments created within the same second get a numbered folder instead of overwriting each other
+        count = 1
+        while self.result_path.joinpath(self.file_name).exists():
+            self.file_name = file_name + '-' + str(count)
+            count += 1
+        self.folder_path = self.result_path.joinpath(self.file_name)
+        self.folder_path.mkdir(parents=True)
 
         if 'sim_file' in self.__dict__:
             self.sim_file.close()
@@ -61,10 +150,27 @@ class Environment:
         self.sim_header = ['timestamp', 'id', 'callsign', 'frequency', 'lat', 'long', 'alt', 'altimeter',
                        'cas', 'tas', 'vs', 'heading', 'bank_angle', 'path_angle',
                        'ap_track_angle', 'ap_heading', 'ap_alt', 'ap_cas', 'ap_procedural_speed',
-                       'ap_wp_index', 'ap_next_wp', 'ap_dist_to_next_fix',
+                       'ap_wp_index', 'ap_next_wp', 'ap_dist_to_next_fix', 'ap_holding_round',
                        'flight_phase', 'configuration', 'speed_mode', 'vertical_mode', 'ap_speed_mode', 'ap_lateral_mode', 'ap_throttle_mode']
         self.sim_writer.writerow(self.sim_header)
 
+    def configure(self, **params):
+        """
+        Set parameters of the environment after construction and before running, e.g. for batch parameter sweeps.
+
+        Each parameter is set to the existing attribute of the same name (e.g. end_time). Override this method to apply
+        parameters that need more than an attribute, e.g. to change the traffic.
+
+        Parameters
+        ----------
+        **params
+            Parameter name to value. An unknown name raises UnknownParameterError.
+        """
+        for name, value in params.items():
+            if name not in self.__dict__:
+                raise UnknownParameterError(type(self).__name__ + " has no parameter '" + name + "'")
+            setattr(self, name, value)
+
     def atc_command(self):
         """
         Virtual method to execute user command each timestep.
@@ -77,51 +183,319 @@ class Environment:
         """
         return self.stopped
 
+    def handle_command(self, aircraft, command, payload):
+        """
+        Virtual method to apply a command from a client.
+
+        Parameters
+        ----------
+        aircraft : str
+            Callsign of the aircraft
+        command : str
+            Command type
+        payload : any
+            Command payload
+
+        Returns
+        -------
+        any
+            Result returned to the client in the acknowledgement of its 'command' event
+        """
+        pass
+
+    def record_command(self, receive_time, aircraft, command, payload):
+        """
+        Virtual method to log an applied command.
+        """
+        pass
+
+    def queue_command(self, aircraft, command, payload=None, sid=None, callback=None):
+        """
+        Queue a command from a client to be applied at the start of the next timestep.
+
+        Parameters
+        ----------
+        aircraft : str
+            Callsign of the aircraft
+        command : str
+            Command type
+        payload : any, optional
+            Command payload, by default None
+        sid : str, optional
+            Session id of the client to send errors to, by default None
+        callback : function({}), optional
+            Function called with the response once the command is applied, by default None
+
+        Returns
+        -------
+        {}
+            Response of the command, filled with 'result' or 'error' when the command is applied
+        """
+        response = {}
+        self.command_queue.append((datetime.now(), sid, aircraft, command, payload, response, callback))
+        return response
+
+    def apply_commands(self, socketio=None):
+        """
+        Apply all queued commands in one batch at the timestep boundary.
+
+        Parameters
+        ----------
+        socketio : socketio object, optional
+            Socketio object to send the command errors, by default None
+        """
+        while self.command_queue:
+            receive_time, sid, aircraft, command, payload, response, callback = self.command_queue.popleft()
+            try:
+                response['result'] = self.apply_command(receive_time, aircraft, command, payload)
+            except Exception as e:
+                # A failing command (e.g. an unknown callsign) is reported to its sender and must not end the session
+                response['error'] = repr(e)
+                if socketio is not None and sid is not None:
+                    socketio.emit('commandResult', {'aircraft': aircraft, 'command': command, 'error': repr(e)}, to=sid)
+            if callback is not None:
+                callback(response)
+
+    def apply_command(self, receive_time, aircraft, command, payload):
+        """
+        Apply one command with handle_command() and log it with record_command().
+
+        Parameters
+        ----------
+        receive_time : datetime
+            Wall clock time the command is received
+        aircraft : str
+            Callsign of the aircraft
+        command : str
+            Command type
+        payload : any
+            Command payload
+
+        Returns
+        -------
+        any
+            Result of handle_command(). Errors of handle_command() are raised after the command is logged.
+        """
+        # handle_command() may modify the payload in place (e.g. init), so the payload is logged as received for replay
+        received = copy.deepcopy(payload)
+        try:
+            return self.handle_command(aircraft, command, payload)
+        finally:
+            # A failing command may have been partly applied, so it is logged as well for replay to reproduce it
+            self.record_command(receive_time, aircraft, command, received)
+
+    def schedule_aircraft(self, spawn_time, **kwargs):
+        """
+        Schedule an aircraft to enter the simulation.
+
+        Parameters
+        ----------
+        spawn_time : float
+            Global time at which the aircraft is added [s]. An aircraft scheduled in the past is added at the next timestep.
+        **kwargs
+            Keyword arguments of Aircraft(), excluding traffic
+        """
+        heapq.heappush(self.spawn_queue, (spawn_time, self.spawn_count, kwargs))
+        self.spawn_count += 1
+
+    def spawn_aircraft(self):
+        """
+        Add all scheduled aircraft that are due at the current global time to the traffic array in one batch.
+
+        Returns
+        -------
+        Aircraft[]
+            The added aircraft, also available in self.aircraft by callsign
+        """
+        due = []
+        while self.spawn_queue and self.spawn_queue[0][0] <= self.global_time:
+            due.append(heapq.heappop(self.spawn_queue)[2])
+        added = Aircraft.add_bulk(self.traffic, due)
+        for kwargs, aircraft in zip(due, added):
+            self.aircraft[kwargs['callsign']] = aircraft
+        return added
+
+    def retire_aircraft(self, index):
+        """
+        Queue aircraft to be deleted at the end of the current timestep.
+
+        The traffic arrays keep their layout until the end of the timestep, so that positions computed earlier in the
+        timestep stay valid, and all aircraft are deleted in one batch.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Index of the aircraft (Aircraft.index or an element of Traffic.index)
+        """
+        self.retire_queue.extend(np.atleast_1d(index).tolist())
+
+    def delete_retired_aircraft(self):
+        """
+        Delete all aircraft queued by retire_aircraft() in one batch.
+        """
+        retired = set(self.retire_queue)
+        self.retire_queue = []
+        self.traffic.del_aircraft(np.fromiter(retired, dtype=int))
+        self.aircraft = {callsign: aircraft for callsign, aircraft in self.aircraft.items() if aircraft.index not in retired}
+
+    def schedule_command(self, trigger, aircraft, command, *args):
+        """
+        Schedule a command to an aircraft at a given time or when a condition is met.
+
+        Commands scheduled by time are kept in a priority queue, so they cost nothing until they are due. Conditions are
+        evaluated at the start of each timestep until they are met. Each command is applied once.
+
+        Parameters
+        ----------
+        trigger : float or function(Environment) -> bool
+            Global time to apply the command [s], or a condition to apply the command.
+            Use a module level function as condition if the environment is saved by snapshot() or fork().
+        aircraft : Aircraft or str
+            The aircraft, or its callsign which is resolved when the command is applied (e.g. an aircraft scheduled by
+            schedule_aircraft()). The command is dropped if the aircraft is not in the simulation at that time.
+        command : str
+            Name of the Aircraft method, e.g. set_heading, set_speed, set_alt, set_holding
+        *args
+            Arguments of the Aircraft method
+        """
+        entry = (aircraft.index if isinstance(aircraft, Aircraft) else aircraft, command, args)
+        if callable(trigger):
+            self.conditional_commands.append((trigger, entry))
+        else:
+            heapq.heappush(self.command_schedule, (trigger, self.command_count, entry))
+            self.command_count += 1
+
+    def apply_scheduled_commands(self):
+        """
+        Apply all scheduled commands that are due at the current global time.
+
+        The due commands are grouped by command type and each group is applied to all its aircraft at once. Commands of
+        the same type are applied in the order they are scheduled.
+        """
+        due = []
+        while self.command_schedule and self.command_schedule[0][0] <= self.global_time:
+            due.append(heapq.heappop(self.command_schedule)[2])
+        if self.conditional_commands:
+            waiting = []
+            for condition, entry in self.conditional_commands:
+                if condition(self):
+                    due.append(entry)
+                else:
+                    waiting.append((condition, entry))
+            self.conditional_commands = waiting
+        if not due:
+            return
+
+        # Resolve callsigns and indices to positions in the traffic array
+        callsigns = {}
+        if any(isinstance(aircraft, str) for aircraft, _, _ in due):
+            callsigns = dict(zip(self.traffic.call_sign, self.traffic.index))
+        index = np.array([callsigns.get(aircraft, -1) if isinstance(aircraft, str) else aircraft for aircraft, _, _ in due], dtype=float)
+        position = np.minimum(np.searchsorted(self.traffic.index, index), max(len(self.traffic.index)-1, 0))
+        found = (self.traffic.index[position] == index) if len(self.traffic.index) > 0 else np.zeros(len(due), dtype=bool)
+
+        groups = {}
+        for i, (_, command, args) in enumerate(due):
+            if found[i]:
+                groups.setdefault(command, []).append(i)
+        for command, rows in groups.items():
+            self.apply_command_batch(command, position[rows], [due[i][2] for i in rows])
+
+    def apply_command_batch(self, command, position, args):
+        """
+        Apply one command type to many aircraft at once.
+
+        The setters of autopilot targets and modes are applied to all aircraft at once by the vectorized setters of
+        Autopilot and Traffic, which the Aircraft setters also use. Other commands fall back to the
+        Aircraft method of each aircraft.
+
+        Parameters
+        ----------
+        command : str
+            Name of the Aircraft method
+        position : int[]
+            Position of each aircraft in the traffic array
+        args : tuple[]
+            Arguments of the Aircraft method of each aircraft
+        """
+        traffic = self.traffic
+        setters = {
+            'set_heading': traffic.ap.set_heading,
+            'set_speed': traffic.ap.set_speed,
+            'set_vs': traffic.ap.set_vs,
+            'set_alt': traffic.ap.set_alt,
+            'set_direct': traffic.ap.set_direct,
+            'set_holding': traffic.ap.set_holding,
+            'resume_own_navigation': traffic.ap.resume_own_navigation,
+            'set_altimeter': traffic.set_altimeter,
+            'set_flight_phase': traffic.set_flight_phase,
+        }
+        if command in setters:
+            setters[command](np.asarray(position), *[list(column) for column in zip(*args)])
+        else:
+            for i, arg in zip(position, args):
+                getattr(Aircraft.from_index(traffic, traffic.index[i]), command)(*arg)
+
     def is_paused(self):
         return self.paused
 
-    def step(self, socketio=None):
+    def step(self, socketio=None, catch_up=False):
         """
         Conduct one simulation timestep.
+
+        Parameters
+        ----------
+        socketio : socketio object, optional
+            Socketio object to handle communciation when running simulation, by default None
+        catch_up : bool, optional
+            Skip saving to file and sending telemetry for a timestep run to catch up with wall time, by default False.
+            Command errors are still sent to the clients.
         """
-        start_time = time.time()
-
-        if not self.is_paused():
-            # Run atc command
-            self.atc_command()
-            # Run update loop
-            self.traffic.update(self.global_time)
-            # Save to file
-            self.save()
-
-        # print("Environment - step() for global time", self.global_time,
-        #       "/", self.end_time, "finished at", time.time() - start_time)
-
-        if socketio != None:
-            # Save to buffer
-            data = np.column_stack((self.traffic.index,
-                                    self.traffic.call_sign,
-                                    np.full(len(self.traffic.index), (self.start_time + timedelta(
-                                        seconds=self.global_time)).isoformat(timespec='seconds')),
-                                    self.traffic.long,
-                                    self.traffic.lat,
-                                    Unit.ft2m(self.traffic.alt),
-                                    self.traffic.cas))
-            self.buffer_data.extend(data)
-
-            @socketio.on('setSimulationGraphType')
-            def set_simulation_graph_type(graph_type):
-                self.graph_type = graph_type
-
-            now = time.time()
-            if ((now - self.last_sent_time) > 0.5) or (self.global_time == self.end_time):
-                self.send_to_client(socketio)
-                socketio.sleep(0)
-                self.last_sent_time = now
-                self.buffer_data = []
-
-        if not self.is_paused():
-            self.global_time += 1
+        cpu_start = time.process_time()
+        with self.profiler.measure('step'):
+            # Apply commands received since the last timestep (including while paused)
+            if self.command_queue:
+                self.apply_commands(socketio)
+
+            if not self.is_paused():
+                # Add scheduled aircraft
+                if self.spawn_queue and self.spawn_queue[0][0] <= self.global_time:
+                    with self.profiler.measure('spawn'):
+                        self.spawn_aircraft()
+                # Apply scheduled commands
+                if (self.command_schedule and self.command_schedule[0][0] <= self.global_time) or self.conditional_commands:
+                    with self.profiler.measure('scheduled_commands'):
+                        self.apply_scheduled_commands()
+                # Run atc command
+                with self.profiler.measure('atc_command'):
+                    self.atc_command()
+                # Run update loop
+                self.traffic.update(self.global_time)
+                self.total_flight_time += len(self.traffic.index)
+                # Save to file
+                if not catch_up:
+                    with self.profiler.measure('save'):
+                        self.save()
+
+            # Delete retired aircraft
+            if self.retire_queue:
+                with self.profiler.measure('retire'):
+                    self.delete_retired_aircraft()
+
+            if socketio != None and not catch_up:
+                now = time.time()
+                if ((now - self.last_sent_time) > 0.5) or (self.global_time == self.end_time):
+                    with self.profiler.measure('send_to_client'):
+                        self.send_to_client(socketio)
+                    # Other sessions may run while yielding, so it is excluded from the CPU time of this simulation
+                    self.cpu_time += time.process_time() - cpu_start
+                    socketio.sleep(0)
+                    cpu_start = time.process_time()
+                    self.last_sent_time = now
+
+            if not self.is_paused():
+                self.global_time += 1
+        self.cpu_time += time.process_time() - cpu_start
 
     def run(self, socketio=None):
         """
@@ -148,9 +522,150 @@ class Environment:
         print("")
         print("Simulation finished")
 
+        if self.profiler.enabled:
+            self.profiler.print_summary()
+
     def stop(self):
         self.stopped = True
 
+    def __getstate__(self):
+        # File handles and socket objects cannot be serialized. Telemetry streams and queued commands belong to the
+        # connected clients.
+        state = self.__dict__.copy()
+        for key in ('sim_file', 'sim_writer', 'cmd_file', 'cmd_writer', 'socketio', 'telemetry', 'command_queue'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.telemetry = Telemetry()
+        self.command_queue = deque()
+
+    def snapshot(self, file_path=None):
+        """
+        Save the full simulation state to a binary file.
+
+        The snapshot is a pickle checkpoint of the environment object, including its traffic, autopilot, performance,
+        and weather arrays, flight plans, queues, and global time. File handles, sockets, and telemetry streams are
+        excluded, and ERA5 datasets are reopened from their files. Snapshots are therefore only compatible with the
+        AirTrafficSim version and environment class that saved them, not an archival format.
+
+        Parameters
+        ----------
+        file_path : Path, optional
+            Path of the snapshot file, by default snapshot-<global time>.atss in the result folder
+
+        Returns
+        -------
+        Path
+            Path of the snapshot file
+        """
+        if file_path is None:
+            file_path = self.folder_path.joinpath('snapshot-' + str(self.global_time) + '.atss')
+        file_path = Path(file_path)
+
+        with open(file_path, 'wb') as file:
+            file.write(SNAPSHOT_MAGIC + struct.pack('<H', SNAPSHOT_VERSION))
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+        return file_path
+
+    @staticmethod
+    def restore(file_path, create_log_file=True):
+        """
+        Restore a simulation from a snapshot file created by snapshot().
+
+        Parameters
+        ----------
+        file_path : Path
+            Path of the snapshot file. Snapshots are pickles, only load snapshots from trusted sources.
+        create_log_file : bool, optional
+            Whether to create a new result folder for the resumed simulation, by default True
+
+        Returns
+        -------
+        Environment
+            The restored environment, ready to continue from the saved global time
+        """
+        with open(file_path, 'rb') as file:
+            header = file.read(len(SNAPSHOT_MAGIC) + 2)
+            if header[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+                raise ValueError(str(file_path) + " is not an AirTrafficSim snapshot.")
+            version = struct.unpack('<H', header[len(SNAPSHOT_MAGIC):])[0]
+            if version != SNAPSHOT_VERSION:
+                raise ValueError("Snapshot version " + str(version) + " is not supported (expected " + str(SNAPSHOT_VERSION) + ").")
+            env = pickle.load(file)
+
+        env.last_sent_time = time.time()
+        if create_log_file and 'log_name' in env.__dict__:
+            env.create_log_files(env.log_name)
+        return env
+
+    def fork(self, branches, duration, metrics=None, workers=None):
+        """
+        Run alternative futures of the simulation from the current time in worker processes.
+
+        Each branch runs on its own copy of the environment and the original simulation is not changed.
+        Where the platform supports fork, the copies share the memory of the original until they modify it (copy-on-write).
+        Otherwise the state is pickled once and sent to each worker, so the branches, metrics, and conditions of scheduled
+        commands must be picklable (module level functions rather than lambdas).
+
+        Parameters
+        ----------
+        branches : [function(Environment)]
+            Functions applied to the copy of the environment before running, e.g. to issue vectors, holds, or speeds.
+            Use None for a branch without changes.
+        duration : int
+            Number of timesteps to run each branch [s]
+        metrics : function(Environment) -> {}, optional
+            Function to compute the metrics of a branch after running, by default get_summary()
+        workers : int, optional
+            Number of worker processes, by default the number of CPUs
+
+        Returns
+        -------
+        [{}]
+            Metrics of each branch in the order of branches
+        """
+        global _fork_parent
+        if 'sim_file' in self.__dict__:
+            self.sim_file.flush()
+
+        if 'fork' in multiprocessing.get_all_start_methods():
+            _fork_parent = (self, branches, metrics)
+            try:
+                # One task per child so that every branch starts from an untouched copy
+                with multiprocessing.get_context('fork').Pool(workers, maxtasksperchild=1) as pool:
+                    return pool.starmap(_run_fork_branch, [(i, duration) for i in range(len(branches))])
+            finally:
+                _fork_parent = None
+        else:
+            # Without fork every branch, metric, and scheduled condition must be sent to the workers by pickle
+            for name, value in (('branches', branches), ('metrics', metrics), ('conditional commands', [condition for condition, _ in self.conditional_commands])):
+                try:
+                    pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                except (pickle.PicklingError, AttributeError, TypeError) as e:
+                    raise ValueError("Environment.fork() on a platform without fork requires picklable " + name +
+                                     " (use module level functions instead of lambdas or local functions): " + repr(e)) from e
+            state = pickle.dumps((self, branches, metrics), protocol=pickle.HIGHEST_PROTOCOL)
+            with multiprocessing.get_context('spawn').Pool(workers, maxtasksperchild=1) as pool:
+                return pool.starmap(_run_fork_branch, [(i, duration, state) for i in range(len(branches))])
+
+    def get_summary(self):
+        """
+        Get the summary metrics of the simulation.
+
+        Returns
+        -------
+        {}
+            Simulation time [s], number of aircraft, total fuel consumed [kg], and mean flight time per aircraft [s]
+        """
+        return {
+            'sim_time': self.global_time,
+            'aircraft': self.traffic.n,
+            'fuel_consumed': float(np.sum(self.traffic.fuel_consumed) + self.traffic.retired_fuel_consumed),
+            'flight_time': self.total_flight_time / self.traffic.n if self.traffic.n > 0 else 0.0
+        }
+
     def save(self):
         """
         Save all states variable of one timestemp to csv file.
@@ -173,14 +688,51 @@ class Environment:
         self.sim_writer.writerows(data)
         self.sim_file.flush()
 
-    def export_to_csv(self):
+    def export_to_csv(self, chunksize=100000, file_format='csv'):
         """
-        Export the simulation result to a csv file.
+        Export the simulation result to one file per aircraft.
+
+        The simulation log is read in chunks and each chunk is split by aircraft id in a single pass,
+        so the memory usage is bounded by the chunk size instead of the length of the simulation.
+
+        Parameters
+        ----------
+        chunksize : int, optional
+            Number of rows of the simulation log to read at a time, by default 100000
+        file_format : str, optional
+            Output format [csv, parquet], by default 'csv'.
+            Parquet output is written to <id>.parquet with one row group per chunk and requires pyarrow (extra 'parquet').
         """
-        df = pd.read_csv(self.sim_file_path)
-        for id in df['id'].unique():
-            df[df['id'] == id].to_csv(
-                self.folder_path.joinpath(str(id)+'.csv'), index=False)
+        if 'sim_file' in self.__dict__:
+            self.sim_file.flush()
+
+        if file_format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            # Fix the column types up front so that every chunk of every aircraft is written with the same schema
+            text = ['timestamp', 'callsign', 'frequency', 'ap_next_wp', 'flight_phase', 'configuration', 'speed_mode',
+                    'vertical_mode', 'ap_speed_mode', 'ap_lateral_mode', 'ap_throttle_mode']
+            dtype = {name: str if name in text else np.float64 for name in self.sim_header}
+            schema = pa.schema([(name, pa.string() if name in text else pa.float64()) for name in self.sim_header])
+
+            writers = {}
+            try:
+                for chunk in pd.read_csv(self.sim_file_path, chunksize=chunksize, dtype=dtype, keep_default_na=False, na_values=['nan']):
+                    for id, content in chunk.groupby('id', sort=False):
+                        if id not in writers:
+                            writers[id] = pq.ParquetWriter(self.folder_path.joinpath(str(id)+'.parquet'), schema)
+                        writers[id].write_table(pa.Table.from_pandas(content, schema=schema, preserve_index=False))
+            finally:
+                for writer in writers.values():
+                    writer.close()
+        else:
+            written = set()
+            for chunk in pd.read_csv(self.sim_file_path, chunksize=chunksize):
+                for id, content in chunk.groupby('id', sort=False):
+                    content.to_csv(self.folder_path.joinpath(str(id)+'.csv'), mode='a' if id in written else 'w',
+                                   header=id not in written, index=False)
+                    written.add(id)
         # self.file_path.unlink()
 
     def send_to_client(self, socketio):
@@ -192,49 +744,6 @@ class Environment:
         socketio : socketio object
             socketio object to handle communciation when running simulation
         """
-
-        # Additional aircraft telemetry
-        # TODO: emit at a slower rate? probably not necessary for now
-        aircraft_data = [
-            {
-                'callsign': self.traffic.call_sign[i].item(),
-                'aircraftType': self.traffic.aircraft_type[i].item(),
-                'flightPhase': self.traffic.flight_phase[i].item(),
-                'configuration': self.traffic.configuration[i].item(),
-                'lateralMode': self.traffic.ap.lateral_mode[i].item(),
-                'verticalMode': self.traffic.vertical_mode[i].item(),
-                'position': [self.traffic.lat[i].item(), self.traffic.long[i].item()],
-                'altitude': self.traffic.alt[i].item(),
-                'altimeter': self.traffic.altimeter[i].item(),
-                'heading': self.traffic.heading[i].item(),
-                'track': self.traffic.track_angle[i].item(),
-                'tas': 0 if self.traffic.flight_phase[i].item() == FlightPhase.TAXI_ORIGIN or self.traffic.flight_phase[i].item() == FlightPhase.TAXI_DEST else self.traffic.tas[i].item(),
-                'vs': 0 if self.traffic.flight_phase[i].item() == FlightPhase.TAXI_ORIGIN or self.traffic.flight_phase[i].item() == FlightPhase.TAXI_DEST else self.traffic.vs[i].item(),
-                'flightPlan': self.traffic.ap.flight_plan_name[i],
-                'flightPlanEnroute': self.traffic.ap.flight_plan_enroute[i],
-                'flightPlanPos': list(zip(self.traffic.ap.flight_plan_lat[i], self.traffic.ap.flight_plan_long[i])),
-                'flightPlanTargetSpeed': self.traffic.ap.flight_plan_target_speed[i],
-                'flightPlanIndex': self.traffic.ap.flight_plan_index[i].item(),
-                'dist': self.traffic.ap.dist[i],
-                'departureAirport': self.traffic.ap.departure_airport[i],
-                'departureRunway': self.traffic.ap.departure_runway[i],
-                'sid': self.traffic.ap.sid[i],
-                'arrivalAirport': self.traffic.ap.arrival_airport[i],
-                'arrivalRunway': self.traffic.ap.arrival_runway[i],
-                'star': self.traffic.ap.star[i],
-                'approach': self.traffic.ap.approach[i],
-                'frequency': self.traffic.frequency[i],
-                'controlType': self.traffic.control_type[i],
-            }
-            for i in (range(len(self.traffic.index)) if self.traffic_order is None else self.traffic_order)
-        ]
-
-        socketio.emit('simulationData', {
-            'packet_id': self.packet_id,
-            'global_time': self.global_time - 1,
-            'aircraft': aircraft_data,
-            'weather': self.weather,
-            'paused': self.paused
-        })
+        self.telemetry.send(self, socketio)
 
         self.packet_id = self.packet_id + 1
@@ -317,6 +317,8 @@ class Bada:
         # | 'CD' | SUPPORT TYPE (-/*) | AIRCRAFT Code | MANUFACTURER | NAME OR MODEL | FILE NAME | ICAO (Y/N) |
         self.__SYNONYM = np.genfromtxt(Path(__file__).parent.parent.parent.resolve().joinpath('./data/performance/BADA/SYNONYM.NEW'), delimiter=[3, 2, 7, 20, 25, 8, 5], names=[
                                        'CD', 'ST', 'ACCODE', 'MANUFACTURER', 'MODEL', 'FILENAME', 'ICAO'], dtype="U2,U1,U4,U18,U25,U6,U1", comments="CC", autostrip=True, skip_footer=1, encoding='unicode_escape')
+        self.__performance_files = {}
+        """OPF aircraft type block, OPF, and APF of each aircraft type read so far {ICAO: (OPF_Actype, OPF, APF)}"""
 
     def add_aircraft(self, icao, mass_class=2):
         """
@@ -340,6 +342,114 @@ class Bada:
         -------
         TODO:
         """
+        self.add_aircraft_bulk([icao], mass_class)
+
+    def add_aircraft_bulk(self, icao, mass_class=2):
+        """
+        Add the performance data of many aircraft to the performance array at once.
+
+        The files of each aircraft type are read once and every performance array is extended once for all aircraft.
+
+        Parameters
+        ----------
+        icao: string[]
+            ICAO code of each aircraft.
+
+        mass_class: int
+            Aircraft mass for specific flight. To be used for APF. 1 = LO, 2 = AV, 3 = HI
+        """
+        k = len(icao)
+        if k == 0:
+            return
+        OPF_Actype, OPF, APF = zip(*[self.__read_performance_files(i) for i in icao])
+
+        def actype(column):
+            return [x.item()[column] for x in OPF_Actype]
+
+        def opf(row, column):
+            return [x[row][column] for x in OPF]
+
+        def apf(column):
+            return [x[mass_class][column] for x in APF]
+
+        self.__n_eng = np.append(self.__n_eng, actype(2))
+        self.__engine_type = np.append(self.__engine_type, [{'Jet': 1, 'Turboprop': 2, 'Piston': 3}.get(engine) for engine in actype(4)])
+        self.__wake_category = np.append(self.__wake_category, actype(5))
+        self.__m_ref = np.append(self.__m_ref, opf(0, 3))
+        self.m_min = np.append(self.m_min, opf(0, 4))
+        self.__m_max = np.append(self.__m_max, opf(0, 5))
+        self.__m_pyld = np.append(self.__m_pyld, opf(0, 6))
+        self.v_mo = np.append(self.v_mo, opf(1, 3))
+        self.m_mo = np.append(self.m_mo, opf(1, 4))
+        self.__h_mo = np.append(self.__h_mo, opf(1, 5))
+        self.__h_max = np.append(self.__h_max, opf(1, 6))
+        self.__g_w = np.append(self.__g_w, opf(0, 7))
+        self.__g_t = np.append(self.__g_t, opf(1, 7))
+        self.__S = np.append(self.__S, opf(2, 3))
+        self.__c_d0_cr = np.append(self.__c_d0_cr, opf(3, 5))
+        self.__c_d2_cr = np.append(self.__c_d2_cr, opf(3, 6))
+        self.__c_d0_ap = np.append(self.__c_d0_ap, opf(6, 5))
+        self.__c_d2_ap = np.append(self.__c_d2_ap, opf(6, 6))
+        self.__c_d0_ld = np.append(self.__c_d0_ld, opf(7, 5))
+        self.__c_d2_ld = np.append(self.__c_d2_ld, opf(7, 6))
+        self.__c_d0_ldg = np.append(self.__c_d0_ldg, opf(11, 5))
+        self.__v_stall_to = np.append(self.__v_stall_to, opf(5, 4))
+        self.__v_stall_ic = np.append(self.__v_stall_ic, opf(4, 4))
+        self.__v_stall_cr = np.append(self.__v_stall_cr, opf(3, 4))
+        self.__v_stall_ap = np.append(self.__v_stall_ap, opf(6, 4))
+        self.__v_stall_ld = np.append(self.__v_stall_ld, opf(7, 4))
+        self.__c_lbo = np.append(self.__c_lbo, opf(2, 4))
+        self.__k = np.append(self.__k, opf(2, 5))
+        self.__c_tc_1 = np.append(self.__c_tc_1, opf(14, 3))
+        self.__c_tc_2 = np.append(self.__c_tc_2, opf(14, 4))
+        self.__c_tc_3 = np.append(self.__c_tc_3, opf(14, 5))
+        self.__c_tc_4 = np.append(self.__c_tc_4, opf(14, 6))
+        self.__c_tc_5 = np.append(self.__c_tc_5, opf(14, 7))
+        self.__c_tdes_low = np.append(self.__c_tdes_low, opf(15, 3))
+        self.__c_tdes_high = np.append(self.__c_tdes_high, opf(15, 4))
+        self.__h_p_des = np.append(self.__h_p_des, opf(15, 5))
+        self.__c_tdes_app = np.append(self.__c_tdes_app, opf(15, 6))
+        self.__c_tdes_ld = np.append(self.__c_tdes_ld, opf(15, 7))
+        self.__v_des_ref = np.append(self.__v_des_ref, opf(16, 3))
+        self.__m_des_ref = np.append(self.__m_des_ref, opf(16, 4))
+        self.__c_f1 = np.append(self.__c_f1, opf(17, 3))
+        self.__c_f2 = np.append(self.__c_f2, opf(17, 4))
+        self.__c_f3 = np.append(self.__c_f3, opf(18, 3))
+        self.__c_f4 = np.append(self.__c_f4, opf(18, 4))
+        self.__c_fcr = np.append(self.__c_fcr, opf(19, 3))
+        self.__tol = np.append(self.__tol, opf(20, 3))
+        self.__ldl = np.append(self.__ldl, opf(20, 4))
+        self.__span = np.append(self.__span, opf(20, 5))
+        self.__length = np.append(self.__length, opf(20, 6))
+        self.__v_cl_1 = np.append(self.__v_cl_1, apf(4))
+        self.__v_cl_2 = np.append(self.__v_cl_2, apf(5))
+        self.__m_cl = np.append(self.__m_cl, np.divide(apf(6), 100))
+        self.__v_cr_1 = np.append(self.__v_cr_1, apf(9))
+        self.__v_cr_2 = np.append(self.__v_cr_2, apf(10))
+        self.__m_cr = np.append(self.__m_cr, np.divide(apf(11), 100))
+        self.__v_des_1 = np.append(self.__v_des_1, apf(14))
+        self.__v_des_2 = np.append(self.__v_des_2, apf(13))
+        self.__m_des = np.append(self.__m_des, np.divide(apf(12), 100))
+        self.climb_schedule = np.append(self.climb_schedule, np.zeros([k, 8]), axis=0)
+        self.cruise_schedule = np.append(self.cruise_schedule, np.zeros([k, 5]), axis=0)
+        self.descent_schedule = np.append(self.descent_schedule, np.zeros([k, 8]), axis=0)
+
+    def __read_performance_files(self, icao):
+        """
+        Read the Operations Performance File and Airlines Procedures File of an aircraft type.
+
+        Parameters
+        ----------
+        icao: string
+            ICAO code of the specific aircraft.
+
+        Returns
+        -------
+        (np.ndarray, np.ndarray, np.ndarray)
+            Aircraft type block of the OPF, OPF, and APF. The files of each aircraft type are only read once.
+        """
+        if icao in self.__performance_files:
+            return self.__performance_files[icao]
 
         # Get file name by searching in SYNONYM.NEW
         row = np.where(self.__SYNONYM['ACCODE'] == icao)[
@@ -363,77 +473,8 @@ class Bada:
         APF = np.genfromtxt(Path(__file__).parent.parent.parent.resolve().joinpath('./data/performance/BADA/', file_name+'.APF'), delimiter=[
                             6, 8, 9, 4, 4, 4, 3, 5, 4, 4, 4, 4, 3, 4, 4, 5, 4, 4, 4, 5, 7], dtype="U2,U7,U7,U2,i2,i2,i2,i2,i2,i2,i2,i2,i2,i2,i2,i2,i2,i2,i2,i2,U6", comments="CC", autostrip=True)
 
-        self.__n_eng = np.append(self.__n_eng, OPF_Actype.item()[2])
-        self.__engine_type = np.append(self.__engine_type, {
-                                       'Jet': 1, 'Turboprop': 2, 'Piston': 3}.get(OPF_Actype.item()[4]))
-        self.__wake_category = np.append(
-            self.__wake_category, OPF_Actype.item()[5])
-        self.__m_ref = np.append(self.__m_ref, OPF[0][3])
-        self.m_min = np.append(self.m_min, OPF[0][4])
-        self.__m_max = np.append(self.__m_max, OPF[0][5])
-        self.__m_pyld = np.append(self.__m_pyld, OPF[0][6])
-        self.v_mo = np.append(self.v_mo, OPF[1][3])
-        self.m_mo = np.append(self.m_mo, OPF[1][4])
-        self.__h_mo = np.append(self.__h_mo, OPF[1][5])
-        self.__h_max = np.append(self.__h_max, OPF[1][6])
-        self.__g_w = np.append(self.__g_w, OPF[0][7])
-        self.__g_t = np.append(self.__g_t, OPF[1][7])
-        self.__S = np.append(self.__S, OPF[2][3])
-        self.__c_d0_cr = np.append(self.__c_d0_cr, OPF[3][5])
-        self.__c_d2_cr = np.append(self.__c_d2_cr, OPF[3][6])
-        self.__c_d0_ap = np.append(self.__c_d0_ap, OPF[6][5])
-        self.__c_d2_ap = np.append(self.__c_d2_ap, OPF[6][6])
-        self.__c_d0_ld = np.append(self.__c_d0_ld, OPF[7][5])
-        self.__c_d2_ld = np.append(self.__c_d2_ld, OPF[7][6])
-        self.__c_d0_ldg = np.append(self.__c_d0_ldg, OPF[11][5])
-        self.__v_stall_to = np.append(self.__v_stall_to, OPF[5][4])
-        self.__v_stall_ic = np.append(self.__v_stall_ic, OPF[4][4])
-        self.__v_stall_cr = np.append(self.__v_stall_cr, OPF[3][4])
-        self.__v_stall_ap = np.append(self.__v_stall_ap, OPF[6][4])
-        self.__v_stall_ld = np.append(self.__v_stall_ld, OPF[7][4])
-        self.__c_lbo = np.append(self.__c_lbo, OPF[2][4])
-        self.__k = np.append(self.__k, OPF[2][5])
-        self.__c_tc_1 = np.append(self.__c_tc_1, OPF[14][3])
-        self.__c_tc_2 = np.append(self.__c_tc_2, OPF[14][4])
-        self.__c_tc_3 = np.append(self.__c_tc_3, OPF[14][5])
-        self.__c_tc_4 = np.append(self.__c_tc_4, OPF[14][6])
-        self.__c_tc_5 = np.append(self.__c_tc_5, OPF[14][7])
-        self.__c_tdes_low = np.append(self.__c_tdes_low, OPF[15][3])
-        self.__c_tdes_high = np.append(self.__c_tdes_high, OPF[15][4])
-        self.__h_p_des = np.append(self.__h_p_des, OPF[15][5])
-        self.__c_tdes_app = np.append(self.__c_tdes_app, OPF[15][6])
-        self.__c_tdes_ld = np.append(self.__c_tdes_ld, OPF[15][7])
-        self.__v_des_ref = np.append(self.__v_des_ref, OPF[16][3])
-        self.__m_des_ref = np.append(self.__m_des_ref, OPF[16][4])
-        self.__c_f1 = np.append(self.__c_f1, OPF[17][3])
-        self.__c_f2 = np.append(self.__c_f2, OPF[17][4])
-        self.__c_f3 = np.append(self.__c_f3, OPF[18][3])
-        self.__c_f4 = np.append(self.__c_f4, OPF[18][4])
-        self.__c_fcr = np.append(self.__c_fcr, OPF[19][3])
-        self.__tol = np.append(self.__tol, OPF[20][3])
-        self.__ldl = np.append(self.__ldl, OPF[20][4])
-        self.__span = np.append(self.__span, OPF[20][5])
-        self.__length = np.append(self.__length, OPF[20][6])
-        self.__v_cl_1 = np.append(self.__v_cl_1, APF[mass_class][4])
-        self.__v_cl_2 = np.append(self.__v_cl_2, APF[mass_class][5])
-        self.__m_cl = np.append(self.__m_cl, APF[mass_class][6]/100)
-        self.__v_cr_1 = np.append(self.__v_cr_1, APF[mass_class][9])
-        self.__v_cr_2 = np.append(self.__v_cr_2, APF[mass_class][10])
-        self.__m_cr = np.append(self.__m_cr, APF[mass_class][11]/100)
-        self.__v_des_1 = np.append(self.__v_des_1, APF[mass_class][14])
-        self.__v_des_2 = np.append(self.__v_des_2, APF[mass_class][13])
-        self.__m_des = np.append(self.__m_des, APF[mass_class][12]/100)
-        self.climb_schedule = np.append(
-            self.climb_schedule, [[0., 0., 0., 0., 0., 0., 0., 0.]], axis=0)
-        self.cruise_schedule = np.append(
-            self.cruise_schedule, [[0., 0., 0., 0., 0.]], axis=0)
-        self.descent_schedule = np.append(
-            self.descent_schedule, [[0., 0., 0., 0., 0., 0., 0., 0.]], axis=0)
-
-        # Delete variable to free memory
-        del APF
-        del OPF_Actype
-        del OPF
+        self.__performance_files[icao] = (OPF_Actype, OPF, APF)
+        return self.__performance_files[icao]
 
     def del_aircraft(self, index):
         """
@@ -605,7 +646,7 @@ class Bada:
 
     # ----------------------------  Mass section 3.4 -----------------------------------------
 
-    def __cal_operating_speed(self, m, V_ref):
+    def __cal_operating_speed(self, m, V_ref, index=slice(None)):
         """
         Calculate operating speed given mass (Equation 3.4-1)
 
@@ -617,12 +658,15 @@ class Bada:
         v_ref: float[]
             Velocity reference (e.g. v_stall) [m/s]
 
+        index: int or int[] or slice, optional
+            Index of the aircraft of m and V_ref, by default all aircraft
+
         Returns
         -------
         V: float[]
             Operating velocity [m/s]
         """
-        return V_ref * np.sqrt(m/(self.__m_ref*1000.0))
+        return V_ref * np.sqrt(m/(self.__m_ref[index]*1000.0))
 
     # ----------------------------  Flight envelope section 3.5 -----------------------------------------
 
@@ -1016,53 +1060,38 @@ class Bada:
 
         Parameters
         ----------
-        m: float[]
+        m: float or float[]
             Aircraft mass [kg]
 
-        n: int
-            Index of performance array.
+        n: int or int[] or slice
+            Index of performance array. The schedules of many aircraft are initialized at once if n selects many aircraft.
         """
+        jet = self.__engine_type[n] == EngineType.JET
+
         # Actual stall speed for takeoff
         v_stall_to_act = Unit.mps2kts(self.__cal_operating_speed(
-            m, Unit.kts2mps(self.__v_stall_to))[n])
+            m, Unit.kts2mps(self.__v_stall_to[n]), n))
         # Standard climb schedule
-        if (self.__engine_type[n] == EngineType.JET):
-            # If Jet (Equation 4.1-1~5)
-            self.climb_schedule[n] = [self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_1, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_2, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_3,
-                                      self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_4, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_5, np.minimum(self.__v_cl_1[n], 250), self.__v_cl_2[n], self.__m_cl[n]]
-        else:
-            # Else if turboprop and piston (Equation 4.1-6~8)
-            # self.climb_schedule[n] = [self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_6, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_7, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_8,
-            #                           np.minimum(self.__v_cl_1[n], 250), self.__v_cl_2[n], self.__m_cl[n], self.__v_cl_2[n], self.__m_cl[n]]
-            self.climb_schedule[n] = [self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_1, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_2, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_3,
-                                      self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_4, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_5, np.minimum(self.__v_cl_1[n], 250), self.__v_cl_2[n], self.__m_cl[n]]
-
+        # Jet (Equation 4.1-1~5), turboprop and piston (Equation 4.1-6~8) use the same schedule
+        # [self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_6, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_7, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_8,
+        #  np.minimum(self.__v_cl_1[n], 250), self.__v_cl_2[n], self.__m_cl[n], self.__v_cl_2[n], self.__m_cl[n]]
+        self.climb_schedule[n] = np.stack([self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_1, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_2, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_3,
+                                           self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_4, self.__C_V_MIN * v_stall_to_act + self.__V_D_CL_5, np.minimum(self.__v_cl_1[n], 250), self.__v_cl_2[n], self.__m_cl[n]], axis=-1)
 
         # Standard cruise schedule
-        if (self.__engine_type[n] == EngineType.JET):
-            # If Jet
-            self.cruise_schedule[n] = [np.minimum(self.__v_cr_1[n], 170), np.minimum(
-                self.__v_cr_1[n], 220), np.minimum(self.__v_cr_1[n], 250), self.__v_cr_2[n], self.__m_cr[n]]
-        else:
-            # Else if turboprop and piston
-            self.cruise_schedule[n] = [np.minimum(self.__v_cr_1[n], 150), np.minimum(
-                self.__v_cr_1[n], 180), np.minimum(self.__v_cr_1[n], 250), self.__v_cr_2[n], self.__m_cr[n]]
+        # If Jet 170, 220, else if turboprop and piston 150, 180
+        self.cruise_schedule[n] = np.stack([np.minimum(self.__v_cr_1[n], np.where(jet, 170, 150)), np.minimum(self.__v_cr_1[n], np.where(jet, 220, 180)),
+                                            np.minimum(self.__v_cr_1[n], 250), self.__v_cr_2[n], self.__m_cr[n]], axis=-1)
 
         # Actual stall speed for landing TODO: consider fuel mass?
         v_stall_ld_act = Unit.mps2kts(self.__cal_operating_speed(
-            m, Unit.kts2mps(self.__v_stall_ld))[n])
+            m, Unit.kts2mps(self.__v_stall_ld[n]), n))
         # Standard descent schedule
-        if (self.__engine_type[n] != EngineType.PISTON):
-            # If Jet and Turboprop (Equation 4.3-1~4)
-            self.descent_schedule[n] = [self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_1, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_2, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_3,
-                                        self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_4, np.minimum(self.__v_des_1[n], 220), np.minimum(self.__v_des_1[n], 250), self.__v_des_2[n], self.__m_des[n]]
-        else:
-            # Else if Piston (Equation 4.3-5~7)
-            # self.descent_schedule[n] = [self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_5, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_6, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_7,
-            #                             self.__v_des_1[n], self.__v_des_2[n], self.__m_des[n], 0.0, 0.0]
-            self.descent_schedule[n] = [self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_1, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_2, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_3,
-                                        self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_4, np.minimum(self.__v_des_1[n], 220), np.minimum(self.__v_des_1[n], 250), self.__v_des_2[n], self.__m_des[n]]
-
+        # Jet and turboprop (Equation 4.3-1~4) and piston (Equation 4.3-5~7) use the same schedule
+        # [self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_5, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_6, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_7,
+        #  self.__v_des_1[n], self.__v_des_2[n], self.__m_des[n], 0.0, 0.0]
+        self.descent_schedule[n] = np.stack([self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_1, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_2, self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_3,
+                                             self.__C_V_MIN * v_stall_ld_act + self.__V_D_DSE_4, np.minimum(self.__v_des_1[n], 220), np.minimum(self.__v_des_1[n], 250), self.__v_des_2[n], self.__m_des[n]], axis=-1)
 
     def get_procedure_speed(self, H_p, H_p_trans, flight_phase):
         """
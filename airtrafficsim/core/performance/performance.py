@@ -12,7 +12,12 @@ class Performance:
     Performance base class
     """
 
-    def __init__(self, performance_mode):
+    ATMOSPHERE_TABLE_STEP = 10.0
+    """Altitude step of the ISA pressure table [m]"""
+    ATMOSPHERE_TABLE_RANGE = (-1000.0, 25000.0)
+    """Geopotential pressure altitude range of the ISA pressure table [m]. The formula is used outside of the range."""
+
+    def __init__(self, performance_mode, atmosphere_mode="FORMULA"):
         """
         Initialize Performance base class
 
@@ -20,6 +25,9 @@ class Performance:
         ----------
         performance_mode : string, optional
             Which performance model to use [BADA, OpenAP]
+        atmosphere_mode : string, optional
+            How the ISA pressure is calculated [FORMULA, TABLE], by default FORMULA.
+            TABLE interpolates a precomputed table with a relative error below 4e-7 (see cal_air_pressure()).
         """
 
         self.performance_mode = performance_mode
@@ -47,6 +55,12 @@ class Performance:
         """Thrust [N]"""
         self.esf = np.zeros([0])
         """Energy share factor [dimensionless]"""
+        self.sound_speed = np.zeros([0])
+        """Speed of sound of the current timestep, see update_atmosphere() [m/s]"""
+        self.p_rho = np.zeros([0])
+        """Pressure over density of the current timestep, see update_atmosphere() [m^2/s^2]"""
+        self.p_p_0 = np.zeros([0])
+        """Pressure over MSL standard pressure of the current timestep, see update_atmosphere() [dimensionless]"""
 
         # ----------------------------  Atmosphere model (Ref: BADA user menu section 3.1) -----------------------------------------
         # MSL Standard atmosphere condition
@@ -70,6 +84,22 @@ class Performance:
         # Tropopause (separation between troposphere (below) and stratosphere (above))
         self.__H_P_TROP = 11000
         """Geopotential pressure altitude [m]"""
+        self.__T_TROP = self.__T_0 + self.__BETA_T_BELOW_TROP * self.__H_P_TROP
+        """ISA temperature at tropopause [K]"""
+        self.__P_TROP = self.__P_0 * np.power(self.__T_TROP / self.__T_0, -self.__G_0 / (self.__BETA_T_BELOW_TROP * self.__R))
+        """ISA pressure at tropopause [Pa]"""
+
+        self.atmosphere_mode = atmosphere_mode
+        """How the ISA pressure is calculated [FORMULA, TABLE]"""
+        if self.atmosphere_mode == "TABLE":
+            # Pressure of each table interval as p = intercept + slope * H_p
+            H_p = np.arange(self.ATMOSPHERE_TABLE_RANGE[0], self.ATMOSPHERE_TABLE_RANGE[1] + self.ATMOSPHERE_TABLE_STEP/2.0, self.ATMOSPHERE_TABLE_STEP)
+            p = self.__cal_isa_pressure(H_p)
+            slope = np.append(np.diff(p) / self.ATMOSPHERE_TABLE_STEP, 0.0)
+            self.__table_p_slope = slope
+            """Slope of the ISA pressure of each table interval [Pa/m]"""
+            self.__table_p_intercept = p - slope * H_p
+            """Intercept of the ISA pressure of each table interval [Pa]"""
 
     def add_aircraft(self, icao, engine=None, mass_class=2):
         """
@@ -80,22 +110,48 @@ class Performance:
         n: int
             Index of the added aircraft
         """
-        self.drag = np.append(self.drag, 0.0)
-        self.thrust = np.append(self.thrust, 0.0)
-        self.esf = np.append(self.esf, 0.0)
+        self.add_aircraft_bulk([icao], mass_class)
+
+    def add_aircraft_bulk(self, icao, mass_class=2):
+        """
+        Add many aircraft to traffic array at once.
+
+        Parameters
+        ----------
+        icao : string[]
+            ICAO code of each aircraft
+        mass_class : int, optional
+            Mass class of the BADA airline procedure [1: LO, 2: AV, 3: HI], by default 2
+        """
+        k = len(icao)
+        self.drag = np.append(self.drag, np.zeros(k))
+        self.thrust = np.append(self.thrust, np.zeros(k))
+        self.esf = np.append(self.esf, np.zeros(k))
 
         if (self.performance_mode == "BADA"):
-            self.perf_model.add_aircraft(icao, mass_class)
+            self.perf_model.add_aircraft_bulk(icao, mass_class)
         else:
-            self.prop_model.append(prop.aircraft(icao))
-            self.thrust_model.append(Thrust(ac=icao, eng=prop.aircraft_engine_options(icao)[0]))
-            self.drag_model.append(Drag(ac=icao))
-            self.fuel_flow_model.append(FuelFlow(ac=icao, eng=prop.aircraft_engine_options(icao)[0]))
-            self.wrap_model.append(WRAP(ac=icao))
+            # The models of each aircraft type are created once and shared by all aircraft of the type
+            models = {}
+            for i in icao:
+                if i not in models:
+                    engine = prop.aircraft_engine_options(i)[0]
+                    models[i] = (prop.aircraft(i), Thrust(ac=i, eng=engine), Drag(ac=i), FuelFlow(ac=i, eng=engine), WRAP(ac=i))
+            for prop_model, thrust_model, drag_model, fuel_flow_model, wrap_model in (models[i] for i in icao):
+                self.prop_model.append(prop_model)
+                self.thrust_model.append(thrust_model)
+                self.drag_model.append(drag_model)
+                self.fuel_flow_model.append(fuel_flow_model)
+                self.wrap_model.append(wrap_model)
 
     def del_aircraft(self, index):
         """
         Delete an aircraft from traffic array.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Index of the aircraft to be deleted
         """
         self.drag = np.delete(self.drag, index)
         self.thrust = np.delete(self.thrust, index)
@@ -103,11 +159,12 @@ class Performance:
         if (self.performance_mode == "BADA"):
             self.perf_model.del_aircraft(index)
         else:
-            del self.prop_model[index]
-            del self.thrust_model[index]
-            del self.drag_model[index]
-            del self.fuel_flow_model[index]
-            del self.wrap_model[index]
+            for i in np.sort(np.atleast_1d(index))[::-1]:
+                del self.prop_model[i]
+                del self.thrust_model[i]
+                del self.drag_model[i]
+                del self.fuel_flow_model[i]
+                del self.wrap_model[i]
 
     def init_procedure_speed(self, mass, n):
         """
@@ -115,10 +172,10 @@ class Performance:
 
         Parameters
         ----------
-        m: float[]
+        m: float or float[]
             Aircraft mass [kg]
 
-        n: int
+        n: int or int[] or slice
             Index of performance array.
         """
         if (self.performance_mode == "BADA"):
@@ -205,17 +262,65 @@ class Performance:
 
         p\_> if above tropopause: float[]
             Pressure [Pa]
+
+        Notes
+        -----
+        The pressure at a geopotential pressure altitude does not depend on the temperature differential, as T - d_T is
+        the ISA temperature. When atmosphere_mode is TABLE, the pressure of arrays of altitudes is therefore linearly
+        interpolated from a table of the ISA pressure every ATMOSPHERE_TABLE_STEP, for any d_T. The relative error is
+        below 4e-7 with the default 10 m step. Temperature and density are exact formulas in both modes.
         """
+        if self.atmosphere_mode == "TABLE" and np.ndim(H_p) > 0:
+            return self.__cal_isa_pressure_table(np.asarray(H_p, dtype=float))
         return np.where(H_p <= self.__H_P_TROP,
                         # If below or equal Geopotential pressure altitude of tropopause (Equation 3.1-18)
                         self.__P_0 * \
                         np.power((T - d_T) / self.__T_0, -self.__G_0 / \
                                  (self.__BETA_T_BELOW_TROP * self.__R)),
                         # If above Geopotential pressure altitude of tropopause (Equation 3.1-20)
-                        self.__P_0 * np.power((self.cal_temperature(self.__H_P_TROP, d_T) - d_T) / self.__T_0, -self.__G_0/(self.__BETA_T_BELOW_TROP * self.__R)) \
-                        * np.exp(-self.__G_0/(self.__R * self.cal_temperature(self.__H_P_TROP, 0.0)) * (H_p - self.__H_P_TROP))
+                        self.__P_TROP * np.exp(-self.__G_0/(self.__R * self.__T_TROP) * (H_p - self.__H_P_TROP))
                         )
 
+    def __cal_isa_pressure(self, H_p):
+        """
+        Calculate ISA pressure (Equation 3.1-18, 20 with d_T = 0)
+
+        Parameters
+        ----------
+        H_p: float[]
+            Geopotential pressuer altitude [m]
+
+        Returns
+        -------
+        p: float[]
+            Pressure [Pa]
+        """
+        return np.where(H_p <= self.__H_P_TROP,
+                        self.__P_0 * np.power((self.__T_0 + self.__BETA_T_BELOW_TROP * np.minimum(H_p, self.__H_P_TROP)) / self.__T_0,
+                                              -self.__G_0 / (self.__BETA_T_BELOW_TROP * self.__R)),
+                        self.__P_TROP * np.exp(-self.__G_0/(self.__R * self.__T_TROP) * (H_p - self.__H_P_TROP)))
+
+    def __cal_isa_pressure_table(self, H_p):
+        """
+        Interpolate ISA pressure from the table. Altitudes outside of ATMOSPHERE_TABLE_RANGE use the formula.
+
+        Parameters
+        ----------
+        H_p: float[]
+            Geopotential pressuer altitude [m]
+
+        Returns
+        -------
+        p: float[]
+            Pressure [Pa]
+        """
+        i = ((H_p - self.ATMOSPHERE_TABLE_RANGE[0]) / self.ATMOSPHERE_TABLE_STEP).astype(np.intp)
+        p = np.take(self.__table_p_intercept, i, mode='clip') + np.take(self.__table_p_slope, i, mode='clip') * H_p
+        if H_p.size > 0 and (H_p.min() < self.ATMOSPHERE_TABLE_RANGE[0] or H_p.max() > self.ATMOSPHERE_TABLE_RANGE[1]):
+            out = (H_p < self.ATMOSPHERE_TABLE_RANGE[0]) | (H_p > self.ATMOSPHERE_TABLE_RANGE[1])
+            p[out] = self.__cal_isa_pressure(H_p[out])
+        return p
+
     def cal_air_density(self, p, T):
         """
         Calculate Air Density (Equation 3.1-21)
@@ -335,18 +440,117 @@ class Performance:
         """
         return V_tas / np.sqrt(self.__KAPPA * self.__R * T)
 
-    # ----------------------------  Operation limit -----------------------------------------
-    def cal_transition_alt(self, n, d_T):
+    def update_atmosphere(self, p, T, rho):
         """
-        Calculate Mach/CAS transition altitude. (Equation 3.1-27~28)
+        Cache the atmosphere terms of the air speed conversions for the current timestep.
+
+        The speed of sound, p/rho and p/p_0 are computed once per timestep, such that the *_at() conversions below only
+        evaluate the power terms of the speeds for the aircraft that need them.
+
+        Parameters
+        ----------
+        p: float[]
+            Pressure [Pa]
+
+        T: float[]
+            Temperature [K]
+
+        rho: float[]
+            Density [kg/m^3]
+        """
+        self.sound_speed = np.sqrt(self.__KAPPA * self.__R * T)
+        self.p_rho = p / rho
+        self.p_p_0 = p / self.__P_0
+
+    def cas_to_tas_at(self, V_cas, index=slice(None)):
+        """
+        Convert Calibrated air speed to True air speed with the cached atmosphere terms. (Equation 3.1-23)
 
         Parameters
         ----------
         V_cas: float[]
+            Calibrated air speed of the selected aircraft [m/s]
+
+        index: int[] or bool[] or slice, optional
+            Aircraft selected from the atmosphere cache, by default all aircraft
+
+        Returns
+        -------
+        V_tas : float[]
+            True air speed [m/s]
+        """
+        mu = (self.__KAPPA - 1) / self.__KAPPA
+        q_c = np.power(1.0 + mu/2.0 * self.__RHO_0/self.__P_0 * np.square(V_cas), 1.0/mu) - 1.0
+        return np.sqrt(2.0/mu * self.p_rho[index] * (np.power(1.0 + q_c / self.p_p_0[index], mu) - 1.0))
+
+    def tas_to_cas_at(self, V_tas, index=slice(None)):
+        """
+        Convert True air speed to Calibrated air speed with the cached atmosphere terms. (Equation 3.1-24)
+
+        Parameters
+        ----------
+        V_tas: float[]
+            True air speed of the selected aircraft [m/s]
+
+        index: int[] or bool[] or slice, optional
+            Aircraft selected from the atmosphere cache, by default all aircraft
+
+        Returns
+        -------
+        V_cas : float[]
             Calibrated air speed [m/s]
+        """
+        mu = (self.__KAPPA - 1) / self.__KAPPA
+        q_c = self.p_p_0[index] * (np.power(1.0 + mu/2.0 * np.square(V_tas) / self.p_rho[index], 1.0/mu) - 1.0)
+        return np.sqrt(2.0/mu * self.__P_0/self.__RHO_0 * (np.power(1.0 + q_c, mu) - 1.0))
+
+    def mach_to_tas_at(self, M, index=slice(None)):
+        """
+        Convert Mach number to True Air speed with the cached speed of sound. (Equation 3.1-26)
+
+        Parameters
+        ----------
+        M: float[]
+            Mach number of the selected aircraft [dimensionless]
+
+        index: int[] or bool[] or slice, optional
+            Aircraft selected from the atmosphere cache, by default all aircraft
+
+        Returns
+        -------
+        V_tas: float[]
+            True air speed [m/s]
+        """
+        return M * self.sound_speed[index]
+
+    def tas_to_mach_at(self, V_tas, index=slice(None)):
+        """
+        Convert True Air speed to Mach number with the cached speed of sound. (Equation 3.1-26)
+
+        Parameters
+        ----------
+        V_tas: float[]
+            True air speed of the selected aircraft [m/s]
+
+        index: int[] or bool[] or slice, optional
+            Aircraft selected from the atmosphere cache, by default all aircraft
 
+        Returns
+        -------
         M: float[]
             Mach number [dimensionless]
+        """
+        return V_tas / self.sound_speed[index]
+
+    # ----------------------------  Operation limit -----------------------------------------
+    def cal_transition_alt(self, n, d_T):
+        """
+        Calculate Mach/CAS transition altitude. (Equation 3.1-27~28)
+
+        Parameters
+        ----------
+        n: int or int[] or slice
+            Index of aircraft
 
         d_T: float[]
             Temperature differential at MSL [K]
@@ -379,7 +583,7 @@ class Performance:
                             self.__H_P_TROP - self.__R*self.cal_temperature(self.__H_P_TROP, 0.0)/self.__G_0 * np.log(p_trans/p_trop))
 
         else:
-            return self.wrap_model[n].climb_cross_alt_conmach()['default']*1000.0
+            return self.__openap_values(self.wrap_model, n, lambda model: model.climb_cross_alt_conmach()['default'])*1000.0
 
     def get_empty_weight(self, n):
         """
@@ -387,18 +591,39 @@ class Performance:
 
         Parameters
         ----------
-        n: int
+        n: int or int[] or slice
             index of aircraft
 
         Returns
         -------
-        Weight: float
+        Weight: float or float[]
             Empty weight(BADA) or Operating empty weight(OpenAP) [kg]
         """
         if (self.performance_mode == "BADA"):
             return self.perf_model.m_min[n] * 1000.0
         else:
-            return self.prop_model[n]['limits']['OEW']
+            return self.__openap_values(self.prop_model, n, lambda model: model['limits']['OEW'])
+
+    def __openap_values(self, models, n, value):
+        """
+        Get a value of the OpenAP models of aircraft
+
+        Parameters
+        ----------
+        models: []
+            OpenAP model of each aircraft
+        n: int or int[] or slice
+            index of aircraft
+        value: function
+            Function that returns the value of a model
+
+        Returns
+        -------
+        float or float[]
+            Value of the model of each aircraft in n
+        """
+        index = np.arange(len(models))[n]
+        return np.array([value(models[i]) for i in np.ravel(index)], dtype=float).reshape(np.shape(index))[()]
 
     def cal_maximum_alt(self, d_T, m):
         """
@@ -1,17 +1,35 @@
 import time
 import csv
+import json
+import ast
 import threading
 from datetime import datetime
+from pathlib import Path
 
 from airtrafficsim.core.environment import Environment
 
 class RealTimeEnvironment(Environment):
-    def __init__(self, file_name, time_delta=1, weather_mode="ISA", performance_mode="BADA"):
+    def __init__(self, file_name, time_delta=1, weather_mode="ISA", performance_mode="BADA", speed=1.0, max_catch_up=10):
         # Absurdly high end time to avoid simulation ending prematurely
         # TODO: Eventually support None end_time to run forever
         super().__init__(file_name, start_time=datetime.now(), end_time=24 * 3600, weather_mode=weather_mode, performance_mode=performance_mode, create_log_file=False)
 
         self.time_delta = time_delta
+        """Wall clock seconds per timestep at 1x speed [s]"""
+        self.speed = speed
+        """Speed multiplier of the simulation against wall time [dimensionless]"""
+        self.max_catch_up = max_catch_up
+        """Maximum number of catch-up timesteps run in one tick when the simulation falls behind wall time [int]"""
+
+        # Scheduler
+        self.anchor_time = None
+        """Wall time of the scheduler anchor [s]"""
+        self.anchor_tick = 0
+        """Tick count at the scheduler anchor [int]"""
+        self.tick = 0
+        """Number of timesteps run by the scheduler, including paused ones [int]"""
+        self.lag = {'lag': 0.0, 'max_lag': 0.0, 'catch_up_steps': 0, 'dropped_steps': 0}
+        """Lag metrics: current and maximum lag behind wall time [s], catch-up timesteps run, and timesteps dropped because the lag exceeded max_catch_up"""
 
         self.socketio = None
 
@@ -25,28 +43,158 @@ class RealTimeEnvironment(Environment):
         self.cmd_file = open(self.cmd_file_path, 'w+')
         self.cmd_writer = csv.writer(self.cmd_file)
 
-        self.cmd_header = ['timestamp', 'aircraft', 'command', 'payload']
+        self.cmd_header = ['timestamp', 'global_time', 'aircraft', 'command', 'payload']
         self.cmd_writer.writerow(self.cmd_header)
 
+    def record_command(self, receive_time, aircraft, command, payload):
+        """
+        Write a command to commands.csv with the simulation time it is applied at.
+
+        Parameters
+        ----------
+        receive_time : datetime
+            Wall clock time the command is received
+        aircraft : str
+            Callsign of the aircraft
+        command : str
+            Command type
+        payload : any
+            JSON serializable command payload
+        """
+        if 'cmd_writer' not in self.__dict__:
+            return
+        self.cmd_writer.writerow([receive_time.isoformat(), self.global_time, aircraft, command, '' if payload is None else json.dumps(payload)])
+        self.cmd_file.flush()
+
+    @staticmethod
+    def load_commands(file_path, time_delta=1):
+        """
+        Load a command log recorded by a real-time session.
+
+        Parameters
+        ----------
+        file_path : Path
+            Path of commands.csv or the result folder containing it
+        time_delta : int, optional
+            Wall clock seconds per timestep of the recorded session, by default 1.
+            Only used for logs without a global_time column, where the simulation time is estimated from the wall clock timestamps.
+
+        Returns
+        -------
+        [(int, str, str, any)]
+            List of (global time, aircraft, command, payload) sorted by global time
+        """
+        file_path = Path(file_path)
+        if file_path.is_dir():
+            file_path = file_path.joinpath('commands.csv')
+
+        commands = []
+        with open(file_path, 'r') as file:
+            rows = list(csv.DictReader(file))
+        for row in rows:
+            if 'global_time' in row:
+                global_time = int(row['global_time'])
+            else:
+                global_time = round((datetime.fromisoformat(row['timestamp']) - datetime.fromisoformat(rows[0]['timestamp'])).total_seconds() / time_delta)
+
+            payload = row['payload']
+            if payload == '':
+                payload = None
+            else:
+                try:
+                    payload = json.loads(payload)
+                except ValueError:
+                    try:
+                        # Logs before the global_time column stored the Python representation of the payload
+                        payload = ast.literal_eval(payload)
+                    except (ValueError, SyntaxError):
+                        pass
+            commands.append((global_time, row['aircraft'], row['command'], payload))
+
+        commands.sort(key=lambda x: x[0])
+        return commands
+
     def handle_command(self, aircraft, command, payload):
         if command == "init":
             if "name" in payload:
                 self.create_log_files(payload['name'])
 
-        pass
+        elif command == "snapshot":
+            return str(self.snapshot())
+
+        elif command == "speed":
+            self.set_speed(float(payload))
+
+    def set_speed(self, speed):
+        """
+        Change the speed multiplier of the simulation against wall time (e.g. 2 or 10 for fast time).
+
+        Parameters
+        ----------
+        speed : float
+            Speed multiplier [dimensionless]
+        """
+        if speed <= 0:
+            raise ValueError("Speed must be positive.")
+        # Re-anchor at the scheduled time of the current tick so the new rate applies from the next tick on
+        if self.anchor_time is not None:
+            self.anchor_time += (self.tick - self.anchor_tick + 1) * self.time_delta / self.speed
+            self.anchor_tick = self.tick + 1
+        self.speed = speed
+
+    def get_summary(self):
+        """
+        Get the summary metrics of the simulation, including the lag of the real-time scheduler.
+
+        Returns
+        -------
+        {}
+            Summary metrics of Environment.get_summary() with the lag metrics
+        """
+        return {**super().get_summary(), **self.lag, 'speed': self.speed}
 
     def loop(self, socketio):
-        delay = self.time_delta
-        next_time = time.time() + delay
+        """
+        Run timesteps in step with the wall clock.
+
+        Tick n is due at anchor time + n * time_delta / speed. Ticks are scheduled against the anchor rather than the
+        previous tick so that slow timesteps do not accumulate drift. When the simulation falls behind, the missed ticks
+        are run as catch-up timesteps without logging and telemetry, up to max_catch_up per tick. Any further lag is dropped
+        by moving the anchor and counted in the lag metrics.
+
+        Parameters
+        ----------
+        socketio : socketio object
+            Socketio object to handle communciation when running simulation
+        """
+        self.anchor_time = time.time()
+        self.anchor_tick = self.tick
         while True:
+            period = self.time_delta / self.speed
+            next_time = self.anchor_time + (self.tick - self.anchor_tick + 1) * period
             socketio.sleep(max(0, next_time - time.time()))
 
             if self.should_end():
                 self.end_time = self.global_time
                 break
 
+            # Ticks that are due but not run yet, excluding the current one
+            now = time.time()
+            behind = int((now - self.anchor_time) / period) - (self.tick - self.anchor_tick) - 1
+            if behind > self.max_catch_up:
+                self.lag['dropped_steps'] += behind - self.max_catch_up
+                self.anchor_time += (behind - self.max_catch_up) * period
+                behind = self.max_catch_up
+            for _ in range(max(behind, 0)):
+                self.step(socketio, catch_up=True)
+                self.tick += 1
+                self.lag['catch_up_steps'] += 1
+
             self.step(socketio)
-            next_time += (time.time() - next_time) // delay * delay + delay
+            self.tick += 1
+
+            self.lag['lag'] = max(time.time() - (self.anchor_time + (self.tick - self.anchor_tick) * period), 0.0)
+            self.lag['max_lag'] = max(self.lag['max_lag'], self.lag['lag'])
 
     def run(self, socketio=None):
         """
@@ -57,31 +205,56 @@ class RealTimeEnvironment(Environment):
         socketio : socketio object, optional
             Socketio object to handle communciation when running simulation, by default None
         """
-        if socketio:
-            @socketio.on('command')
-            def handle_command_message(command):
-                # Command: { aircraft: str, command: str, payload: any }
-                # Command types:
-                # - takeoff
-                # - heading
-                # - altitude
-                # - airspeed
-                # - resume_nav
-                # - flight_plan
-                # - approach
+        # Commands from clients are routed by the server to queue_command() and applied at the start of each timestep
+        self.socketio = socketio
 
-                receive_time = datetime.now()
+        socketio.start_background_task(self.loop, socketio).join()
 
-                res = self.handle_command(command['aircraft'], command['command'], command['payload'] if 'payload' in command else None)
+        print("")
+        print("Simulation finished")
+        print("Real-time lag:", self.lag)
 
-                self.cmd_writer.writerow([receive_time.isoformat(), command['aircraft'], command['command'], command['payload'] if 'payload' in command else ''])
-                self.cmd_file.flush()
+        if self.profiler.enabled:
+            self.profiler.print_summary()
 
-                return res
+    def replay(self, file_path, duration=0):
+        """
+        Re-run a recorded real-time session in fast time from its command log.
 
-        self.socketio = socketio
+        Each command is applied before the timestep it was originally applied at and the simulation runs without waiting
+        for the wall clock, so the session is reproduced at full CPU speed.
 
-        socketio.start_background_task(self.loop, socketio).join()
+        Parameters
+        ----------
+        file_path : Path
+            Path of commands.csv or the result folder containing it
+        duration : int, optional
+            Number of timesteps to continue after the last command [s], by default 0
+        """
+        commands = RealTimeEnvironment.load_commands(file_path, self.time_delta)
+        end_time = (commands[-1][0] if commands else 0) + duration
+
+        i = 0
+        while True:
+            # Apply all commands received before this timestep
+            while i < len(commands) and commands[i][0] <= self.global_time:
+                _, aircraft, command, payload = commands[i]
+                try:
+                    self.apply_command(datetime.now(), aircraft, command, payload)
+                except Exception as e:
+                    # The command failed in the recorded session as well, continue like the session did
+                    print("Replay - command", command, "for", aircraft, "failed:", repr(e))
+                i += 1
+
+            # Stop at the end time or when the session stays paused with no command left to resume it
+            if self.global_time > end_time or self.should_end() or (self.is_paused() and i == len(commands)):
+                self.end_time = self.global_time
+                break
+
+            self.step()
 
         print("")
-        print("Simulation finished")
+        print("Replay finished")
+
+        if self.profiler.enabled:
+            self.profiler.print_summary()
@@ -0,0 +1,598 @@
+import struct
+import numpy as np
+
+from airtrafficsim.utils.enums import FlightPhase
+
+
+FRAME_MAGIC = b'ATSF'
+"""Signature of binary state frames"""
+FRAME_VERSION = 1
+"""Layout version of binary state frames. Increase when FRAME_HEADER or FRAME_FIELDS change."""
+FRAME_HEADER = struct.Struct('<4sHHIiI')
+"""Frame header: magic, version, flags (bit 0: paused), packet id, global time [s], and number of aircraft n"""
+FRAME_FIELDS = [
+    ('id', '<u4'),
+    ('lat', '<f4'),
+    ('long', '<f4'),
+    ('alt', '<f4'),
+    ('heading', '<f4'),
+    ('track', '<f4'),
+    ('cas', '<f4'),
+    ('tas', '<f4'),
+    ('vs', '<f4'),
+    ('flightPlanIndex', '<u2'),
+    ('flightPhase', '<u1'),
+    ('configuration', '<u1'),
+    ('lateralMode', '<u1'),
+    ('verticalMode', '<u1'),
+]
+"""Arrays following the header, each with n little-endian values. Wider types come first so that every array is aligned to its size."""
+
+
+class Telemetry:
+    """
+    Telemetry class to encode the simulation state for each connected client.
+
+    Clients that subscribe receive their own stream in one of the following modes:
+
+    - full: the complete state of every aircraft in every packet (same as the legacy 'simulationData' broadcast)
+    - delta: static fields (aircraft type, flight plan, airports, procedures and control type) are only sent when an
+      aircraft appears, its flight plan version changes or its control type changes, and dynamic fields are only sent
+      when their value changes. A keyframe with all static and dynamic fields is sent every keyframe_interval packets so
+      that clients can resynchronize.
+    - binary: the dynamic state of every aircraft is sent as a 'simulationFrame' binary message laid out as FRAME_HEADER
+      followed by the FRAME_FIELDS arrays, packed directly from the traffic arrays. Static fields are sent as JSON in a
+      'simulationStatic' message when they change, like in delta mode, and in full every keyframe_interval packets.
+
+    Subscribed clients can register a viewport and filters with set_viewport() to only receive the aircraft they display.
+    Clients that do not subscribe keep receiving the legacy 'simulationData' broadcast of all aircraft.
+    """
+
+    def __init__(self, connected=None):
+        """
+        Initialize telemetry
+
+        Parameters
+        ----------
+        connected : set, optional
+            Session ids of all connected clients, by default None (unknown, the legacy broadcast is always sent)
+        """
+        self.clients = {}
+        """Subscribed clients [{sid: _Client}]"""
+        self.connected = connected
+        """Session ids of all connected clients [set]"""
+
+    def subscribe(self, sid, mode='delta', keyframe_interval=20):
+        """
+        Subscribe a client to its own telemetry stream.
+
+        Parameters
+        ----------
+        sid : str
+            Session id of the client
+        mode : str, optional
+            Telemetry mode [full, delta, binary], by default 'delta'
+        keyframe_interval : int, optional
+            Number of packets between keyframes in delta mode, by default 20
+        """
+        if mode not in ('full', 'delta', 'binary'):
+            raise ValueError(f"Unknown telemetry mode {mode}")
+        self.clients[sid] = _Client(mode, keyframe_interval)
+
+    def set_viewport(self, sid, bbox=None, frequency=None, control_type=None, alt_range=None):
+        """
+        Set the viewport and filters of a subscribed client. Aircraft outside of them are not sent to the client.
+
+        Parameters
+        ----------
+        sid : str
+            Session id of the client
+        bbox : [float, float, float, float], optional
+            Viewport [south, west, north, east] [deg], by default None (no spatial filter).
+            West larger than east means the viewport crosses the antimeridian.
+        frequency : str or [str], optional
+            Only send aircraft tuned to the frequencies, by default None
+        control_type : str or [str], optional
+            Only send aircraft of the control types, by default None
+        alt_range : [float, float], optional
+            Only send aircraft within the altitude band [ft], by default None
+        """
+        client = self.clients[sid]
+        client.bbox = bbox
+        client.frequency = None if frequency is None else np.atleast_1d(frequency)
+        client.control_type = None if control_type is None else np.atleast_1d(control_type)
+        client.alt_range = alt_range
+
+    def unsubscribe(self, sid):
+        """
+        Remove a client from the telemetry streams.
+
+        Parameters
+        ----------
+        sid : str
+            Session id of the client
+        """
+        self.clients.pop(sid, None)
+
+    def reset(self):
+        """
+        Forget the state sent to every client such that the next packets are keyframes (e.g. when a new simulation starts).
+        """
+        for client in self.clients.values():
+            client.reset()
+
+    def has_legacy_clients(self):
+        """
+        Check whether any connected client is not subscribed and needs the legacy broadcast.
+
+        Returns
+        -------
+        bool
+            Whether the legacy broadcast should be sent
+        """
+        if self.connected is None:
+            return True
+        return len(self.connected - self.clients.keys()) > 0
+
+    def send(self, env, socketio):
+        """
+        Send the simulation state of the environment to all clients.
+
+        Parameters
+        ----------
+        env : Environment
+            The simulation environment
+        socketio : socketio object
+            socketio object to handle communciation when running simulation
+        """
+        full = None
+        if self.has_legacy_clients():
+            full = self.encode_full(env)
+            socketio.emit('simulationData', full, to=env.room, skip_sid=list(self.clients.keys()) or None)
+
+        if not self.clients:
+            return
+
+        ids = env.traffic.index.astype(int)
+        columns = None
+        frame = None
+        for sid, client in self.clients.items():
+            rows = client.select(env)
+            if client.mode != 'full' and rows is not None:
+                # Only the full mode keeps the order of env.traffic_order. The diffs need ascending ids.
+                rows = np.sort(rows)
+            if client.mode == 'full':
+                if rows is not None:
+                    socketio.emit('simulationData', self.encode_full(env, rows), to=sid)
+                    continue
+                if full is None:
+                    full = self.encode_full(env)
+                socketio.emit('simulationData', full, to=sid)
+            elif client.mode == 'binary':
+                keyframe = client.packets % client.keyframe_interval == 0
+                static = self.encode_static(env, client, ids, rows, keyframe)
+                if static['static'] or static['removed'] or keyframe:
+                    socketio.emit('simulationStatic', static, to=sid)
+                client.packets += 1
+                if rows is not None:
+                    socketio.emit('simulationFrame', self.encode_frame(env, rows), to=sid)
+                    continue
+                if frame is None:
+                    frame = self.encode_frame(env)
+                socketio.emit('simulationFrame', frame, to=sid)
+            else:
+                if columns is None:
+                    columns = self.get_dynamic_columns(env)
+                socketio.emit('simulationDelta', self.encode_delta(env, client, ids, columns, rows), to=sid)
+
+    @staticmethod
+    def get_static(env, i):
+        """
+        Get the static and rarely changing fields of one aircraft.
+
+        Parameters
+        ----------
+        env : Environment
+            The simulation environment
+        i : int
+            Array index of the aircraft
+
+        Returns
+        -------
+        {}
+            Static fields of the aircraft
+        """
+        return {
+            'callsign': env.traffic.call_sign[i].item(),
+            'aircraftType': env.traffic.aircraft_type[i].item(),
+            'flightPlan': env.traffic.ap.flight_plan_name[i],
+            'flightPlanEnroute': env.traffic.ap.flight_plan_enroute[i],
+            'flightPlanPos': list(zip(env.traffic.ap.flight_plan_lat[i], env.traffic.ap.flight_plan_long[i])),
+            'flightPlanTargetSpeed': env.traffic.ap.flight_plan_target_speed[i],
+            'departureAirport': env.traffic.ap.departure_airport[i],
+            'departureRunway': env.traffic.ap.departure_runway[i],
+            'sid': env.traffic.ap.sid[i],
+            'arrivalAirport': env.traffic.ap.arrival_airport[i],
+            'arrivalRunway': env.traffic.ap.arrival_runway[i],
+            'star': env.traffic.ap.star[i],
+            'approach': env.traffic.ap.approach[i],
+            'controlType': env.traffic.control_type[i],
+            'version': env.traffic.ap.flight_plan_version[i].item(),
+        }
+
+    @staticmethod
+    def get_dynamic_columns(env):
+        """
+        Get the dynamic fields of all aircraft as arrays.
+
+        Parameters
+        ----------
+        env : Environment
+            The simulation environment
+
+        Returns
+        -------
+        {str: np.array}
+            Dynamic field name to the array of values of all aircraft
+        """
+        taxi = (env.traffic.flight_phase == FlightPhase.TAXI_ORIGIN) | (env.traffic.flight_phase == FlightPhase.TAXI_DEST)
+        return {
+            'flightPhase': env.traffic.flight_phase,
+            'configuration': env.traffic.configuration,
+            'lateralMode': env.traffic.ap.lateral_mode,
+            'verticalMode': env.traffic.vertical_mode,
+            'lat': env.traffic.lat,
+            'long': env.traffic.long,
+            'altitude': env.traffic.alt,
+            'altimeter': env.traffic.altimeter,
+            'heading': env.traffic.heading,
+            'track': env.traffic.track_angle,
+            'tas': np.where(taxi, 0.0, env.traffic.tas),
+            'vs': np.where(taxi, 0.0, env.traffic.vs),
+            'flightPlanIndex': env.traffic.ap.flight_plan_index,
+            'dist': env.traffic.ap.dist,
+            'frequency': np.array(env.traffic.frequency, dtype=object),
+        }
+
+    @staticmethod
+    def encode_full(env, rows=None):
+        """
+        Encode the complete state of every aircraft (legacy 'simulationData' format).
+
+        Parameters
+        ----------
+        env : Environment
+            The simulation environment
+        rows : int[], optional
+            Array indices of the aircraft to encode, by default None (all aircraft in the order of env.traffic_order)
+
+        Returns
+        -------
+        {}
+            JSON serializable packet
+        """
+        aircraft_data = [
+            {
+                'callsign': env.traffic.call_sign[i].item(),
+                'aircraftType': env.traffic.aircraft_type[i].item(),
+                'flightPhase': env.traffic.flight_phase[i].item(),
+                'configuration': env.traffic.configuration[i].item(),
+                'lateralMode': env.traffic.ap.lateral_mode[i].item(),
+                'verticalMode': env.traffic.vertical_mode[i].item(),
+                'position': [env.traffic.lat[i].item(), env.traffic.long[i].item()],
+                'altitude': env.traffic.alt[i].item(),
+                'altimeter': env.traffic.altimeter[i].item(),
+                'heading': env.traffic.heading[i].item(),
+                'track': env.traffic.track_angle[i].item(),
+                'tas': 0 if env.traffic.flight_phase[i].item() == FlightPhase.TAXI_ORIGIN or env.traffic.flight_phase[i].item() == FlightPhase.TAXI_DEST else env.traffic.tas[i].item(),
+                'vs': 0 if env.traffic.flight_phase[i].item() == FlightPhase.TAXI_ORIGIN or env.traffic.flight_phase[i].item() == FlightPhase.TAXI_DEST else env.traffic.vs[i].item(),
+                'flightPlan': env.traffic.ap.flight_plan_name[i],
+                'flightPlanEnroute': env.traffic.ap.flight_plan_enroute[i],
+                'flightPlanPos': list(zip(env.traffic.ap.flight_plan_lat[i], env.traffic.ap.flight_plan_long[i])),
+                'flightPlanTargetSpeed': env.traffic.ap.flight_plan_target_speed[i],
+                'flightPlanIndex': env.traffic.ap.flight_plan_index[i].item(),
+                'dist': env.traffic.ap.dist[i],
+                'departureAirport': env.traffic.ap.departure_airport[i],
+                'departureRunway': env.traffic.ap.departure_runway[i],
+                'sid': env.traffic.ap.sid[i],
+                'arrivalAirport': env.traffic.ap.arrival_airport[i],
+                'arrivalRunway': env.traffic.ap.arrival_runway[i],
+                'star': env.traffic.ap.star[i],
+                'approach': env.traffic.ap.approach[i],
+                'frequency': env.traffic.frequency[i],
+                'controlType': env.traffic.control_type[i],
+            }
+            for i in (rows if rows is not None else range(len(env.traffic.index)) if env.traffic_order is None else env.traffic_order)
+        ]
+
+        return {
+            'packet_id': env.packet_id,
+            'global_time': env.global_time - 1,
+            'aircraft': aircraft_data,
+            'weather': env.weather,
+            'paused': env.paused
+        }
+
+    @staticmethod
+    def encode_delta(env, client, ids, columns, rows=None):
+        """
+        Encode the changes since the last packet sent to a client.
+
+        Parameters
+        ----------
+        env : Environment
+            The simulation environment
+        client : _Client
+            State of the client
+        ids : int[]
+            Aircraft id of each array index
+        columns : {str: np.array}
+            Dynamic fields of all aircraft
+        rows : int[], optional
+            Array indices of the aircraft in the viewport of the client, by default None (all aircraft)
+
+        Returns
+        -------
+        {}
+            JSON serializable packet with the static fields of new or changed aircraft ('static'),
+            changed dynamic fields of each aircraft ('aircraft'), and ids of aircraft no longer sent ('removed')
+        """
+        keyframe = client.prev_ids is None or client.packets % client.keyframe_interval == 0
+        client.packets += 1
+
+        static = Telemetry.encode_static(env, client, ids, rows, keyframe)['static']
+        if rows is not None:
+            ids = ids[rows]
+            columns = {name: value[rows] for name, value in columns.items()}
+
+        # Dynamic fields that changed since the last packet
+        if keyframe:
+            changed = {name: np.ones(len(ids), dtype=bool) for name in columns}
+            removed = [] if client.prev_ids is None else np.setdiff1d(client.prev_ids, ids).tolist()
+        else:
+            pos, matched = _align(client.prev_ids, ids)
+            changed = {name: _changed(client.prev[name], pos, matched, value) for name, value in columns.items()}
+            removed = np.setdiff1d(client.prev_ids, ids).tolist()
+        any_changed = np.logical_or.reduce(list(changed.values())) if changed else np.zeros(len(ids), dtype=bool)
+
+        aircraft = {}
+        for i in np.flatnonzero(any_changed):
+            aircraft[str(ids[i])] = {name: _item(columns[name][i]) for name in columns if changed[name][i]}
+
+        client.prev_ids = ids
+        client.prev = {name: value.copy() for name, value in columns.items()}
+
+        return {
+            'packet_id': env.packet_id,
+            'global_time': env.global_time - 1,
+            'keyframe': keyframe,
+            'static': static,
+            'aircraft': aircraft,
+            'removed': removed,
+            'weather': env.weather,
+            'paused': env.paused
+        }
+
+
+    @staticmethod
+    def encode_static(env, client, ids, rows=None, keyframe=False):
+        """
+        Encode the static fields of new aircraft and aircraft with a new flight plan version or control type since the last
+        packet sent to a client.
+
+        Parameters
+        ----------
+        env : Environment
+            The simulation environment
+        client : _Client
+            State of the client
+        ids : int[]
+            Aircraft id of each array index
+        rows : int[], optional
+            Array indices of the aircraft in the viewport of the client, by default None (all aircraft)
+        keyframe : bool, optional
+            Encode the static fields of all aircraft, by default False
+
+        Returns
+        -------
+        {}
+            JSON serializable packet with the static fields of new or changed aircraft ('static') and ids of aircraft no longer sent ('removed')
+        """
+        if rows is None:
+            rows = np.arange(len(ids))
+        ids = ids[rows]
+        versions = env.traffic.ap.flight_plan_version[rows]
+        control_types = np.array(env.traffic.control_type, dtype=object)[rows]
+        pos, matched = _align(client.static_ids, ids)
+        if keyframe:
+            changed = np.ones(len(ids), dtype=bool)
+        else:
+            changed = _changed(client.static_versions, pos, matched, versions) | _changed(client.static_control_types, pos, matched, control_types)
+        static = {str(ids[j]): Telemetry.get_static(env, rows[j]) for j in np.flatnonzero(changed)}
+        removed = np.setdiff1d(client.static_ids, ids).tolist()
+        client.static_ids = ids
+        client.static_versions = versions.copy()
+        client.static_control_types = control_types
+
+        return {
+            'packet_id': env.packet_id,
+            'static': static,
+            'removed': removed,
+            'weather': env.weather
+        }
+
+    @staticmethod
+    def encode_frame(env, rows=None):
+        """
+        Pack the dynamic state of all aircraft into a binary frame.
+
+        Parameters
+        ----------
+        env : Environment
+            The simulation environment
+        rows : int[], optional
+            Array indices of the aircraft to pack, by default None (all aircraft)
+
+        Returns
+        -------
+        bytes
+            FRAME_HEADER followed by the FRAME_FIELDS arrays
+        """
+        taxi = (env.traffic.flight_phase == FlightPhase.TAXI_ORIGIN) | (env.traffic.flight_phase == FlightPhase.TAXI_DEST)
+        columns = {
+            'id': env.traffic.index,
+            'lat': env.traffic.lat,
+            'long': env.traffic.long,
+            'alt': env.traffic.alt,
+            'heading': env.traffic.heading,
+            'track': env.traffic.track_angle,
+            'cas': env.traffic.cas,
+            'tas': np.where(taxi, 0.0, env.traffic.tas),
+            'vs': np.where(taxi, 0.0, env.traffic.vs),
+            'flightPlanIndex': env.traffic.ap.flight_plan_index,
+            'flightPhase': env.traffic.flight_phase,
+            'configuration': env.traffic.configuration,
+            'lateralMode': env.traffic.ap.lateral_mode,
+            'verticalMode': env.traffic.vertical_mode,
+        }
+        if rows is not None:
+            columns = {name: np.asarray(value)[rows] for name, value in columns.items()}
+        header = FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, int(env.paused), env.packet_id, env.global_time - 1, len(columns['id']))
+        return b''.join([header] + [np.asarray(columns[name]).astype(dtype).tobytes() for name, dtype in FRAME_FIELDS])
+
+    @staticmethod
+    def decode_frame(frame):
+        """
+        Unpack a binary frame created by encode_frame().
+
+        Parameters
+        ----------
+        frame : bytes
+            Binary frame
+
+        Returns
+        -------
+        {}
+            Header values and the array of each field
+        """
+        magic, version, flags, packet_id, global_time, n = FRAME_HEADER.unpack_from(frame)
+        if magic != FRAME_MAGIC or version != FRAME_VERSION:
+            raise ValueError("Unsupported telemetry frame.")
+        data = {'packet_id': packet_id, 'global_time': global_time, 'paused': bool(flags & 1)}
+        offset = FRAME_HEADER.size
+        for name, dtype in FRAME_FIELDS:
+            data[name] = np.frombuffer(frame, dtype=dtype, count=n, offset=offset)
+            offset += n * np.dtype(dtype).itemsize
+        return data
+
+
+class _Client:
+    """
+    State of the telemetry stream of one client.
+    """
+
+    def __init__(self, mode, keyframe_interval):
+        self.mode = mode
+        """Telemetry mode [full, delta, binary]"""
+        self.keyframe_interval = keyframe_interval
+        """Number of packets between keyframes [int]"""
+        self.bbox = None
+        """Viewport [south, west, north, east] [deg]"""
+        self.frequency = None
+        """Frequencies to send [str[]]"""
+        self.control_type = None
+        """Control types to send [str[]]"""
+        self.alt_range = None
+        """Altitude band to send [ft, ft]"""
+        self.reset()
+
+    def select(self, env):
+        """
+        Select the aircraft in the viewport and filters of the client.
+
+        Parameters
+        ----------
+        env : Environment
+            The simulation environment
+
+        Returns
+        -------
+        int[]
+            Array indices of the selected aircraft in the order of env.traffic_order (None if the client has no viewport or filter)
+        """
+        if self.bbox is None and self.frequency is None and self.control_type is None and self.alt_range is None:
+            return None
+
+        traffic = env.traffic
+        mask = np.ones(len(traffic.index), dtype=bool)
+        if self.bbox is not None:
+            south, west, north, east = self.bbox
+            mask &= (traffic.lat >= south) & (traffic.lat <= north)
+            if west <= east:
+                mask &= (traffic.long >= west) & (traffic.long <= east)
+            else:
+                mask &= (traffic.long >= west) | (traffic.long <= east)
+        if self.alt_range is not None:
+            mask &= (traffic.alt >= self.alt_range[0]) & (traffic.alt <= self.alt_range[1])
+        if self.frequency is not None:
+            mask &= np.isin(np.array(traffic.frequency, dtype=object), self.frequency)
+        if self.control_type is not None:
+            mask &= np.isin(np.array(traffic.control_type, dtype=object), self.control_type)
+
+        if env.traffic_order is None:
+            return np.flatnonzero(mask)
+        order = np.asarray(env.traffic_order, dtype=int)
+        return order[mask[order]]
+
+    def reset(self):
+        self.packets = 0
+        """Number of packets sent [int]"""
+        self.prev_ids = None
+        """Aircraft ids of the last packet [int[]]"""
+        self.prev = {}
+        """Dynamic fields of the last packet [{str: np.array}]"""
+        self.static_ids = np.zeros([0], dtype=int)
+        """Aircraft ids whose static fields are sent [int[]]"""
+        self.static_versions = np.zeros([0], dtype=int)
+        """Flight plan version of the static fields sent [int[]]"""
+        self.static_control_types = np.zeros([0], dtype=object)
+        """Control type of the static fields sent [str[]]"""
+
+
+def _align(prev_ids, ids):
+    """
+    Find the position of each id in the sorted array of previous ids.
+
+    Returns
+    -------
+    pos : int[]
+        Position of each id in prev_ids (0 if not found)
+    matched : bool[]
+        Whether each id is in prev_ids
+    """
+    if prev_ids is None or len(prev_ids) == 0:
+        return np.zeros(len(ids), dtype=int), np.zeros(len(ids), dtype=bool)
+    pos = np.minimum(np.searchsorted(prev_ids, ids), len(prev_ids) - 1)
+    matched = prev_ids[pos] == ids
+    return np.where(matched, pos, 0), matched
+
+
+def _changed(prev_values, pos, matched, values):
+    """
+    Check whether each value is new or different from its previous value.
+
+    Returns
+    -------
+    bool[]
+        Whether each value changed
+    """
+    changed = ~matched
+    changed[matched] = prev_values[pos[matched]] != values[matched]
+    return changed
+
+
+def _item(value):
+    """
+    Convert a numpy scalar to a JSON serializable Python value.
+    """
+    return value.item() if isinstance(value, np.generic) else value
@@ -6,10 +6,11 @@ from airtrafficsim.core.performance.performance import Performance
 from airtrafficsim.utils.unit_conversion import Unit
 from airtrafficsim.utils.enums import FlightPhase, SpeedMode, APSpeedMode, APThrottleMode, APVerticalMode, Config, VerticalMode
 from airtrafficsim.utils.calculation import Cal
+from airtrafficsim.utils.profiler import Profiler
 
 
 class Traffic:
-    def __init__(self, file_name, start_time, end_time, weather_mode, performance_mode):
+    def __init__(self, file_name, start_time, end_time, weather_mode, performance_mode, atmosphere_mode="FORMULA"):
         """
         Initialize base traffic array to store aircraft state variables for one timestep.
 
@@ -19,6 +20,8 @@ class Traffic:
             Output file name
         N :  int
             Total number of aircraft
+        atmosphere_mode : String, optional
+            How the ISA pressure is calculated [FORMULA, TABLE], by default FORMULA
         """
 
         # Memory and index control vairable:
@@ -125,9 +128,11 @@ class Traffic:
         """Payload weight [kg]"""
         self.fuel_consumed = np.zeros([0])
         """Fuel consumped [kg]"""
+        self.retired_fuel_consumed = 0.0
+        """Fuel consumed by aircraft already deleted from the traffic array [kg]"""
 
         # Sub classes
-        self.perf = Performance(performance_mode)
+        self.perf = Performance(performance_mode, atmosphere_mode)
         """Performance class"""
         self.ap = Autopilot()
         """Autopilot class"""
@@ -138,6 +143,9 @@ class Traffic:
         self.frequency = []
         self.control_type = []
 
+        self.profiler = Profiler()
+        """Profiler of the update stages (disabled by default)"""
+
     def add_aircraft(self, call_sign, aircraft_type, flight_phase, configuration, lat, long, alt, heading, cas, fuel_weight, payload_weight, departure_airport, departure_runway, sid, arrival_airport, arrival_runway, star, approach, flight_plan, flight_plan_index, cruise_alt, initial_frequency, control_type):
         """
         Add an aircraft to traffic array.
@@ -147,81 +155,120 @@ class Traffic:
         self.n-1: int
             Index of the added aircraft
         """
+        return self.add_aircraft_bulk([dict(call_sign=call_sign, aircraft_type=aircraft_type, flight_phase=flight_phase, configuration=configuration, lat=lat, long=long, alt=alt,
+                                            heading=heading, cas=cas, fuel_weight=fuel_weight, payload_weight=payload_weight, departure_airport=departure_airport,
+                                            departure_runway=departure_runway, sid=sid, arrival_airport=arrival_airport, arrival_runway=arrival_runway, star=star,
+                                            approach=approach, flight_plan=flight_plan, flight_plan_index=flight_plan_index, cruise_alt=cruise_alt,
+                                            initial_frequency=initial_frequency, control_type=control_type)])[0]
+
+    def add_aircraft_bulk(self, aircraft):
+        """
+        Add many aircraft to traffic array at once.
 
-        print("Traffic.py - add_aircraft()",
-              call_sign, " Type:",  aircraft_type)
+        The state arrays of the traffic, performance, weather, and autopilot classes are extended once for all aircraft
+        instead of once per aircraft, and the ceiling of all aircraft is recalculated once.
+
+        Parameters
+        ----------
+        aircraft : {}[]
+            Keyword arguments of add_aircraft() of each aircraft
+
+        Returns
+        -------
+        int[]
+            Index of the added aircraft
+        """
+        k = len(aircraft)
+        if k == 0:
+            return []
+        start = len(self.index)
+        new = slice(start, start + k)
+
+        def column(name, dtype=float):
+            return np.array([ac[name] for ac in aircraft], dtype=dtype)
+
+        def values(name):
+            return [ac[name] for ac in aircraft]
+
+        def extend(array, values):
+            return np.concatenate((array, np.broadcast_to(values, k)))
 
         # Add aircraft in performance, weather, and autopilot array
-        self.perf.add_aircraft(aircraft_type)
-        self.weather.add_aircraft(alt, self.perf)
-        self.ap.add_aircraft(lat, long, alt, heading, cas, departure_airport, departure_runway,
-                             sid, arrival_airport, arrival_runway, star, approach, flight_plan, flight_plan_index, cruise_alt)
-
-        self.index = np.append(self.index, self.n)
-        self.call_sign = np.append(self.call_sign, call_sign)
-        self.aircraft_type = np.append(self.aircraft_type, aircraft_type)
-        self.configuration = np.append(self.configuration, configuration)
-        self.flight_phase = np.append(self.flight_phase, flight_phase)
-        self.lat = np.append(self.lat, lat)
-        self.long = np.append(self.long, long)
-        self.alt = np.append(self.alt, alt)
-        self.cruise_alt = np.append(self.cruise_alt, cruise_alt)
-        self.altimeter = np.append(self.altimeter, 30.00)
-        self.heading = np.append(self.heading, heading)
-        self.track_angle = np.append(self.track_angle, heading)
-        self.bank_angle = np.append(self.bank_angle, 0.0)
-        self.path_angle = np.append(self.path_angle, 0.0)
-        self.cas = np.append(self.cas, cas)
-        self.tas = np.append(self.tas, Unit.mps2kts(self.perf.cas_to_tas(
-            Unit.kts2mps(cas), self.weather.p[-1], self.weather.rho[-1])))
-        self.gs_north = np.append(self.gs_north, 0.0)
-        self.gs_east = np.append(self.gs_east, 0.0)
-        self.mach = np.append(self.mach, self.perf.tas_to_mach(
-            Unit.kts2mps(self.tas[-1]), self.weather.T[-1]))
-        self.accel = np.append(self.accel, 0.0)
-        self.speed_mode = np.append(self.speed_mode, SpeedMode.CAS)
-        self.max_alt = np.append(self.max_alt, 0.0)
-        self.max_cas = np.append(self.max_cas, 0.0)
-        self.max_mach = np.append(self.max_mach, 0.0)
-        self.vs = np.append(self.vs, 0.0)
-        self.fpa = np.append(self.fpa, 0.0)
-        self.vertical_mode = np.append(self.vertical_mode, VerticalMode.LEVEL)
-        self.empty_weight = np.append(
-            self.empty_weight, self.perf.get_empty_weight(-1))
-        self.fuel_weight = np.append(self.fuel_weight, fuel_weight)
-        self.payload_weight = np.append(self.payload_weight, payload_weight)
-        self.mass = np.append(
-            self.mass, self.empty_weight[-1] + fuel_weight + payload_weight)
-        self.fuel_consumed = np.append(self.fuel_consumed, 0.0)
+        self.perf.add_aircraft_bulk(values('aircraft_type'))
+        self.weather.add_aircraft_bulk(column('alt'), self.perf)
+        self.ap.add_aircraft_bulk(values('lat'), values('long'), values('alt'), values('heading'), values('cas'), values('departure_airport'), values('departure_runway'),
+                                  values('sid'), values('arrival_airport'), values('arrival_runway'), values('star'), values('approach'), values('flight_plan'),
+                                  values('flight_plan_index'), values('cruise_alt'))
+
+        cas = column('cas')
+        heading = column('heading')
+        fuel_weight = column('fuel_weight')
+        payload_weight = column('payload_weight')
+        tas = Unit.mps2kts(self.perf.cas_to_tas(Unit.kts2mps(cas), self.weather.p[new], self.weather.rho[new]))
+        empty_weight = np.asarray(self.perf.get_empty_weight(new), dtype=float)
+
+        index = np.arange(self.n, self.n + k)
+        self.index = extend(self.index, index)
+        self.call_sign = extend(self.call_sign, column('call_sign', str))
+        self.aircraft_type = extend(self.aircraft_type, column('aircraft_type', str))
+        self.configuration = extend(self.configuration, column('configuration', None))
+        self.flight_phase = extend(self.flight_phase, column('flight_phase', None))
+        self.lat = extend(self.lat, column('lat'))
+        self.long = extend(self.long, column('long'))
+        self.alt = extend(self.alt, column('alt'))
+        self.cruise_alt = extend(self.cruise_alt, column('cruise_alt'))
+        self.altimeter = extend(self.altimeter, 30.00)
+        self.heading = extend(self.heading, heading)
+        self.track_angle = extend(self.track_angle, heading)
+        self.bank_angle = extend(self.bank_angle, 0.0)
+        self.path_angle = extend(self.path_angle, 0.0)
+        self.cas = extend(self.cas, cas)
+        self.tas = extend(self.tas, tas)
+        self.gs_north = extend(self.gs_north, 0.0)
+        self.gs_east = extend(self.gs_east, 0.0)
+        self.mach = extend(self.mach, self.perf.tas_to_mach(Unit.kts2mps(tas), self.weather.T[new]))
+        self.accel = extend(self.accel, 0.0)
+        self.speed_mode = extend(self.speed_mode, SpeedMode.CAS)
+        self.max_alt = extend(self.max_alt, 0.0)
+        self.max_cas = extend(self.max_cas, 0.0)
+        self.max_mach = extend(self.max_mach, 0.0)
+        self.vs = extend(self.vs, 0.0)
+        self.fpa = extend(self.fpa, 0.0)
+        self.vertical_mode = extend(self.vertical_mode, VerticalMode.LEVEL)
+        self.empty_weight = extend(self.empty_weight, empty_weight)
+        self.fuel_weight = extend(self.fuel_weight, fuel_weight)
+        self.payload_weight = extend(self.payload_weight, payload_weight)
+        self.mass = extend(self.mass, empty_weight + fuel_weight + payload_weight)
+        self.fuel_consumed = extend(self.fuel_consumed, 0.0)
 
         # Init Procedural speed
-        self.perf.init_procedure_speed(self.mass[-1], -1)
-        self.trans_alt = np.append(self.trans_alt, Unit.m2ft(
-            self.perf.cal_transition_alt(-1, self.weather.d_T[-1])))
+        self.perf.init_procedure_speed(self.mass[new], new)
+        self.trans_alt = extend(self.trans_alt, Unit.m2ft(self.perf.cal_transition_alt(new, self.weather.d_T[new])))
 
         self.max_alt = self.perf.cal_maximum_alt(self.weather.d_T, self.mass)
         self.max_cas, self.max_mach = self.perf.cal_maximum_speed()
 
-        self.frequency.append(initial_frequency)
-        self.control_type.append(control_type)
+        self.frequency.extend(ac['initial_frequency'] for ac in aircraft)
+        self.control_type.extend(ac['control_type'] for ac in aircraft)
 
         # Increase aircraft count
-        self.n = self.n + 1
+        self.n = self.n + k
 
-        return self.n - 1
+        return index.tolist()
 
     def del_aircraft(self, index):
         """
-        Delete an aircraft from traffic array.
+        Delete aircraft from traffic array.
 
         Parameters
         ----------
-        index : int
-            Index of an aircraft
+        index : int or int[]
+            Index of an aircraft, or indices of many aircraft to delete at once
         """
-        print("Traffic.py - del_aircraft()", index)
-        print(self.index)
-        i = np.where(self.index == index)[0][0]
+        i = np.flatnonzero(np.isin(self.index, index))
+        if len(i) == 0:
+            return
+        self.retired_fuel_consumed += np.sum(self.fuel_consumed[i])
         self.index = np.delete(self.index, i)
         self.call_sign = np.delete(self.call_sign, i)
         self.aircraft_type = np.delete(self.aircraft_type, i)
@@ -260,8 +307,35 @@ class Traffic:
         self.ap.del_aircraft(i)
         self.weather.del_aircraft(i)
 
-        del self.frequency[i]
-        del self.control_type[i]
+        for j in i[::-1]:
+            del self.frequency[j]
+            del self.control_type[j]
+
+    def set_altimeter(self, index, altimeter):
+        """
+        Set the altimeter setting of one or many aircraft.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Position of the aircraft in the traffic array
+        altimeter : float or float[]
+            Altimeter setting [inHg]
+        """
+        self.altimeter[index] = altimeter
+
+    def set_flight_phase(self, index, flight_phase):
+        """
+        Set the flight phase of one or many aircraft.
+
+        Parameters
+        ----------
+        index : int or int[]
+            Position of the aircraft in the traffic array
+        flight_phase : FlightPhase or FlightPhase[]
+            Flight phase [FlightPhase enum]
+        """
+        self.flight_phase[index] = flight_phase
 
     def update(self, global_time, d_t=1):
         """
@@ -274,8 +348,10 @@ class Traffic:
         """
 
         # Update atmosphere
-        self.weather.update(self.lat, self.long, self.alt,
-                            self.perf, global_time)
+        with self.profiler.measure('weather'):
+            self.weather.update(self.lat, self.long, self.alt,
+                                self.perf, global_time)
+            self.perf.update_atmosphere(self.weather.p, self.weather.T, self.weather.rho)
 
         # Ceiling
         # min_speed = self.perf.cal_minimum_speed(self.flight_phase)
@@ -289,7 +365,8 @@ class Traffic:
         #     return
 
         # Update autopilot
-        self.ap.update(self)
+        with self.profiler.measure('autopilot'):
+            self.ap.update(self)
 
         # Flight phase and configuration
         # Take off -> climb
@@ -346,14 +423,14 @@ class Traffic:
         )
 
         tas = Unit.kts2mps(self.tas)  # TAS in m/s
-        self.vs, self.accel = self.perf.cal_vs_accel(self, tas)
+        with self.profiler.measure('performance'):
+            self.vs, self.accel = self.perf.cal_vs_accel(self, tas)
 
         # Air Speed
         # self.tas = self.perf.cas_to_tas(self.cas, self.weather.p, self.weather.rho)
         tas = tas + self.accel
-        self.mach = self.perf.tas_to_mach(tas, self.weather.T)
-        self.cas = Unit.mps2kts(self.perf.tas_to_cas(
-            tas, self.weather.p, self.weather.rho))
+        self.mach = self.perf.tas_to_mach_at(tas)
+        self.cas = Unit.mps2kts(self.perf.tas_to_cas_at(tas))
 
         # Bound to autopilot
         self.mach = np.select(condlist=[
@@ -390,38 +467,19 @@ class Traffic:
         ],
             default=self.cas)
 
-        tas = np.select(condlist=[
-            self.ap.speed_mode == APSpeedMode.CONSTANT_MACH,
-            self.ap.speed_mode == APSpeedMode.CONSTANT_CAS
-        ],
-            choicelist=[
-            self.perf.mach_to_tas(self.mach, self.weather.T),
-            self.perf.cas_to_tas(Unit.kts2mps(
-                self.cas), self.weather.p, self.weather.rho)
-        ],
-            default=tas)
-
-        tas = np.select(condlist=[
-            (self.speed_mode == SpeedMode.CAS) & ((self.ap.speed_mode == APSpeedMode.ACCELERATE) | (
-                self.ap.speed_mode == APSpeedMode.DECELERATE)) & (self.cas == self.ap.cas),
-            (self.speed_mode == SpeedMode.MACH) & ((self.ap.speed_mode == APSpeedMode.ACCELERATE) | (
-                self.ap.speed_mode == APSpeedMode.DECELERATE)) & (self.mach == self.ap.mach)
-        ],
-            choicelist=[
-            self.perf.cas_to_tas(Unit.kts2mps(
-                self.cas), self.weather.p, self.weather.rho),
-            self.perf.mach_to_tas(self.mach, self.weather.T)
-        ],
-            default=tas)
-
-        self.mach = np.where((self.speed_mode == SpeedMode.CAS) & ((self.ap.speed_mode == APSpeedMode.ACCELERATE) | (self.ap.speed_mode == APSpeedMode.DECELERATE)) & (self.cas == self.ap.cas),
-                             self.perf.tas_to_mach(tas, self.weather.T),
-                             self.mach)
+        # Convert the speed of the aircraft holding or reaching the autopilot speed. Only these aircraft are converted.
+        accel_decel = (self.ap.speed_mode == APSpeedMode.ACCELERATE) | (self.ap.speed_mode == APSpeedMode.DECELERATE)
+        cas_reached = (self.speed_mode == SpeedMode.CAS) & accel_decel & (self.cas == self.ap.cas)
+        mach_reached = (self.speed_mode == SpeedMode.MACH) & accel_decel & (self.mach == self.ap.mach)
+        from_cas = np.flatnonzero((self.ap.speed_mode == APSpeedMode.CONSTANT_CAS) | cas_reached)
+        from_mach = np.flatnonzero((self.ap.speed_mode == APSpeedMode.CONSTANT_MACH) | mach_reached)
+        tas[from_cas] = self.perf.cas_to_tas_at(Unit.kts2mps(self.cas[from_cas]), from_cas)
+        tas[from_mach] = self.perf.mach_to_tas_at(self.mach[from_mach], from_mach)
 
-        self.cas = np.where((self.speed_mode == SpeedMode.MACH) & ((self.ap.speed_mode == APSpeedMode.ACCELERATE) | (self.ap.speed_mode == APSpeedMode.DECELERATE)) & (self.mach == self.ap.mach),
-                            Unit.mps2kts(self.perf.tas_to_cas(
-                                tas, self.weather.p, self.weather.rho)),
-                            self.cas)
+        cas_reached = np.flatnonzero(cas_reached)
+        mach_reached = np.flatnonzero(mach_reached)
+        self.mach[cas_reached] = self.perf.tas_to_mach_at(tas[cas_reached], cas_reached)
+        self.cas[mach_reached] = Unit.mps2kts(self.perf.tas_to_cas_at(tas[mach_reached], mach_reached))
 
         self.tas = Unit.mps2kts(tas)
 
@@ -468,7 +526,8 @@ class Traffic:
         self.alt = np.where((self.flight_phase != FlightPhase.TAXI_ORIGIN) & (self.flight_phase != FlightPhase.TAXI_DEST), new_alt, self.alt)
 
         # Fuel
-        fuel_burn = self.perf.cal_fuel_burn(
-            self.configuration, self.tas, self.alt)
-        self.fuel_consumed = self.fuel_consumed + fuel_burn
-        self.mass = self.mass - fuel_burn
+        with self.profiler.measure('fuel'):
+            fuel_burn = self.perf.cal_fuel_burn(
+                self.configuration, self.tas, self.alt)
+            self.fuel_consumed = self.fuel_consumed + fuel_burn
+            self.mass = self.mass - fuel_burn
@@ -57,9 +57,24 @@ class Weather:
         if self.mode == "ERA5":
             multilevel, surface = Era5.download_data(
                 start_time, end_time, file_name)
+            self.weather_file_path = (multilevel, surface)
+            """Path to the ERA5 multilevel and surface data [Path, Path]"""
             self.weather_data = xr.open_dataset(multilevel)
             self.radar_data = xr.open_dataset(surface)
 
+    def __getstate__(self):
+        # Weather datasets are reopened from their files instead of being serialized
+        state = self.__dict__.copy()
+        state.pop('weather_data', None)
+        state.pop('radar_data', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.mode == "ERA5":
+            self.weather_data = xr.open_dataset(self.weather_file_path[0])
+            self.radar_data = xr.open_dataset(self.weather_file_path[1])
+
     def add_aircraft(self, alt, perf: Performance):
         """
         Add aircraft to the weather class
@@ -71,18 +86,32 @@ class Weather:
         perf : Performance
             Performance class
         """
-        self.wind_speed = np.append(self.wind_speed, 0.0)
-        self.wind_direction = np.append(self.wind_direction, 0.0)
-        self.wind_north = np.append(self.wind_north, 0.0)
-        self.wind_east = np.append(self.wind_east, 0.0)
-        self.d_T = np.append(self.d_T, 0.0)
-        self.d_p = np.append(self.d_p, 0.0)
-        self.T = np.append(self.T, perf.cal_temperature(
-            Unit.ft2m(alt), self.d_T[-1]))
-        self.p = np.append(self.p, perf.cal_air_pressure(
-            Unit.ft2m(alt), self.T[-1], self.d_T[-1]))
-        self.rho = np.append(
-            self.rho, perf.cal_air_density(self.p[-1], self.T[-1]))
+        self.add_aircraft_bulk(np.array([alt], dtype=float), perf)
+
+    def add_aircraft_bulk(self, alt, perf: Performance):
+        """
+        Add many aircraft to the weather class at once
+
+        Parameters
+        ----------
+        alt : float[]
+            Altitude of each aircraft [ft]
+        perf : Performance
+            Performance class
+        """
+        k = len(alt)
+        d_T = np.zeros(k)
+        T = perf.cal_temperature(Unit.ft2m(alt), d_T)
+        p = perf.cal_air_pressure(Unit.ft2m(alt), T, d_T)
+        self.wind_speed = np.append(self.wind_speed, np.zeros(k))
+        self.wind_direction = np.append(self.wind_direction, np.zeros(k))
+        self.wind_north = np.append(self.wind_north, np.zeros(k))
+        self.wind_east = np.append(self.wind_east, np.zeros(k))
+        self.d_T = np.append(self.d_T, d_T)
+        self.d_p = np.append(self.d_p, np.zeros(k))
+        self.T = np.append(self.T, T)
+        self.p = np.append(self.p, p)
+        self.rho = np.append(self.rho, perf.cal_air_density(p, T))
 
     def del_aircraft(self, index):
         """
@@ -90,7 +119,7 @@ class Weather:
 
         Parameters
         ----------
-        index : int
+        index : int or int[]
             Index of the aircraft
         """
         self.wind_speed = np.delete(self.wind_speed, index)
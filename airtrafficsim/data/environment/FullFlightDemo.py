@@ -21,11 +21,11 @@ class FullFlightDemo(Environment):
 
         # Add aircraft
         lat_dep, long_dep, alt_dep = Nav.get_runway_coord("VHHH", "25L")
-        self.aircraft_full = Aircraft(self.traffic, call_sign="FULL", aircraft_type="A320", flight_phase=FlightPhase.TAKEOFF, configuration=Config.TAKEOFF,
+        self.aircraft_full = Aircraft(self.traffic, callsign="FULL", aircraft_type="A320", flight_phase=FlightPhase.TAKEOFF, configuration=Config.TAKEOFF,
                                       lat=lat_dep, long=long_dep, alt=alt_dep, heading=254.0, cas=149.0,
                                       fuel_weight=5273.0, payload_weight=12000.0,
                                       departure_airport="VHHH", departure_runway="RW25L", sid="OCEA2B",
-                                      arrival_airport="RCTP", arrival_runway="05R", star="TONG1A", approach="I05R",
+                                      arrival_airport="RCTP", arrival_runway="RW05R", star="TONG1A", approach="I05R",
                                       flight_plan=[
                                           "RASSE", "CONGA", "ENVAR", "DADON", "EXTRA", "RENOT"],
                                       cruise_alt=37000)
@@ -19,9 +19,9 @@ class OpenApDemo(Environment):
                          )
 
         # Add aircraft
-        self.aircraft_head = Aircraft(self.traffic, call_sign="HEAD", aircraft_type="A320", flight_phase=FlightPhase.CRUISE, configuration=Config.CLEAN,
+        self.aircraft_head = Aircraft(self.traffic, callsign="HEAD", aircraft_type="A320", flight_phase=FlightPhase.CRUISE, configuration=Config.CLEAN,
                                       lat=22.019213, long=113.539164, alt=20000.0, heading=175.0, cas=250.0, fuel_weight=10000.0, payload_weight=12000.0, cruise_alt=37000)
-        self.aircraft_fol = Aircraft(self.traffic, call_sign="FOLLOW", aircraft_type="A320", flight_phase=FlightPhase.CRUISE, configuration=Config.CLEAN,
+        self.aircraft_fol = Aircraft(self.traffic, callsign="FOLLOW", aircraft_type="A320", flight_phase=FlightPhase.CRUISE, configuration=Config.CLEAN,
                                      lat=21.9, long=113.5, alt=20000.0, heading=175.0, cas=310.0, fuel_weight=10000.0, payload_weight=12000.0, cruise_alt=37000)
         self.aircraft_head.set_speed(250.0) # To set the aircraft to follow given speed command instead of auto procedural
         self.aircraft_fol.set_speed(310.0) # To set the aircraft to follow given speed command instead of auto procedural
@@ -32,7 +32,7 @@ class StudyFullFlight(RealTimeEnvironment):
         # Add aircraft
         # lat_dep, long_dep, alt_dep = Nav.get_runway_coord("KPDX", "28L")
 
-        # self.aircraft['HMT 110'] = Aircraft(self.traffic, call_sign="HMT 110", aircraft_type="A320", flight_phase=FlightPhase.TAKEOFF, configuration=Config.TAKEOFF,
+        # self.aircraft['HMT 110'] = Aircraft(self.traffic, callsign="HMT 110", aircraft_type="A320", flight_phase=FlightPhase.TAKEOFF, configuration=Config.TAKEOFF,
         #                               lat=lat_dep, long=long_dep, alt=alt_dep, heading=280.0, cas=149.0,
         #                               fuel_weight=5273.0, payload_weight=12000.0,
         #                               departure_airport="KPDX", departure_runway="RW28L", sid="",
@@ -55,7 +55,8 @@ class StudyFullFlight(RealTimeEnvironment):
         return super().should_end()
 
     def handle_command(self, aircraft, command, payload):
-        super().handle_command(aircraft, command, payload)
+        # The base class handles init log files, snapshot, and speed, and returns the snapshot path
+        result = super().handle_command(aircraft, command, payload)
 
         print(f'received command {command} for aircraft {aircraft} with payload {payload}')
 
@@ -150,4 +151,4 @@ class StudyFullFlight(RealTimeEnvironment):
         elif command == "frequency":
             self.aircraft[aircraft].set_frequency(payload)
 
-        return True
+        return True if result is None else result
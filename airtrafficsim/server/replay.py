@@ -1,11 +1,43 @@
 from pathlib import Path
-import csv
+from collections import OrderedDict
+import re
+import pickle
 import pandas as pd
 import numpy as np
-from datetime import datetime, timezone
+
+from airtrafficsim.utils.route_detection import rdp_mask
+from airtrafficsim.utils.flight_store import FlightStore
+from airtrafficsim.server.result_reader import ResultReader
+
+CACHE_VERSION = 3
+"""Version of the replay cache format"""
+
+LOD_LEVELS = [(0.0, 0.0), (50.0, 120.0), (250.0, 600.0), (1000.0, 1800.0)]
+"""Tolerance [m] and maximum time between samples [s] of each level of detail. Level 0 keeps every sample."""
+
+LOD_AUTO_DURATION = [3600.0, 6*3600.0, 24*3600.0]
+"""Longest time window [s] served at each level of detail when the level is chosen automatically"""
+
+ALTITUDE_WEIGHT = 5.0
+"""Weight of the vertical error in the simplification tolerance such that level-offs are kept"""
+
+
+def _iso(seconds):
+    """
+    Format epoch seconds as ISO 8601 UTC strings.
+    """
+    milliseconds = np.round(np.asarray(seconds, dtype=float)*1000.0).astype('int64')
+    unit = 's' if np.all(milliseconds % 1000 == 0) else 'ms'
+    return np.datetime_as_string(milliseconds.astype('datetime64[ms]'), unit=unit, timezone='UTC').tolist()
 
 
 class Replay:
+    cache_path = Path(__file__).parent.parent.joinpath('data/cache')
+    """Folder of the cached replay trajectories [Path]"""
+    MAX_LOADED = 4
+    """Maximum number of replays kept in memory"""
+    _loaded = OrderedDict()
+
     @staticmethod
     def get_replay_dir():
         """
@@ -37,202 +69,310 @@ class Replay:
         return {"historic": historic_list, "simulation": simulation_list, "simulation_files": simulation_file_list}
 
     @staticmethod
-    def get_replay_czml(replayCategory, replayFile):
+    def get_source_files(replayCategory, replayFile):
         """
-        Generate CZML file for visualization given replay file name.
+        Get the data files of a replay.
 
         Parameters
         ----------
         replayCategory : string
             The category to replay (historic / simulation)
+        replayFile : string
+            Name of the replay file directory
+
+        Returns
+        -------
+        Path[]
+            Sorted list of data files
+        """
+        if replayCategory == 'historic':
+            return FlightStore.get_source_files(replayFile)
+        elif replayCategory == 'simulation':
+            return [Path(__file__).parent.parent.joinpath('data/result', replayFile)]
+        return []
+
+    @staticmethod
+    def load_replay(replayCategory, replayFile):
+        """
+        Load the trajectories of a replay.
 
+        The trajectories are parsed and simplified from the data files once and cached in data/cache/. The cache is
+        rebuilt when the modification time or size of any data file, or the levels of detail change.
+
+        Parameters
+        ----------
+        replayCategory : string
+            The category to replay (historic / simulation)
         replayFile : string
             Name of the replay file directory
 
         Returns
         -------
         {}
-            JSON CZML file
+            Start and end time [epoch s], and list of trajectories. Each trajectory contains its id, sample time [epoch s],
+            position (longitude [deg], latitude [deg], altitude [m]), label, and sample indices of each level of detail.
         """
+        files = Replay.get_source_files(replayCategory, replayFile)
+        signature = (CACHE_VERSION, LOD_LEVELS, ALTITUDE_WEIGHT, [(file.name, file.stat().st_mtime_ns, file.stat().st_size) for file in files])
+        key = replayCategory + '-' + re.sub(r'[^\w.-]', '_', replayFile)
+
+        # In memory
+        cached = Replay._loaded.get(key)
+        if cached is not None and cached['signature'] == signature:
+            Replay._loaded.move_to_end(key)
+            return cached
+
+        # On disk
+        cache_file = Replay.cache_path.joinpath(key + '.pkl')
+        if cache_file.is_file():
+            try:
+                with open(cache_file, 'rb') as f:
+                    cached = pickle.load(f)
+            except Exception:
+                cached = None
+            if cached is not None and cached['signature'] == signature:
+                Replay._remember(key, cached)
+                return cached
+
+        # Parse data files
         if replayCategory == 'historic':
-            trajectories = []
-            start_time = None
-            end_time = None
-            for file in Path(__file__).parent.parent.joinpath('data/flight_data/', replayFile).iterdir():
-                if file != Path(__file__).parent.parent.joinpath('data/flight_data/', replayFile, replayFile+'.csv'):
-                    file_content = pd.read_csv(file)
-
-                    if replayCategory == 'historic':
-                        # start = datetime.utcfromtimestamp(file_content.iloc[0]['timestamp'])
-                        # end = datetime.utcfromtimestamp(file_content.iloc[-1]['timestamp'])
-
-                        id = file.name
-                        if ('timestamp' and 'long' and 'lat' and 'alt' and 'gspeed') in file_content:
-                            # FR24
-                            start = datetime.fromtimestamp(
-                                file_content.iloc[0]['timestamp'], timezone.utc)
-                            end = datetime.fromtimestamp(
-                                file_content.iloc[-1]['timestamp'], timezone.utc)
-                            positions = np.column_stack((file_content['timestamp'].map(lambda x: datetime.fromtimestamp(x, timezone.utc).isoformat()),
-                                                         file_content['long'].values, file_content['lat'].values, file_content['alt'].values/3.2808)).flatten().tolist()
-                            label = [{"interval": datetime.fromtimestamp(time, timezone.utc).isoformat()+"/"+end.isoformat(),
-                                      "string": file.name+"\n"+str(alt)+"ft "+str(gspeed)+"kt"}
-                                     for time, alt, gspeed in zip(file_content['timestamp'], file_content['alt'], file_content['gspeed'])]
-
-                        elif ('timestamp' and 'longitude' and 'latitude' and 'altitude' and 'groundspeed') in file_content:
-                            # Opensky
-                            start = datetime.fromisoformat(
-                                file_content.iloc[0]['timestamp']+'+00:00')
-                            end = datetime.fromisoformat(
-                                file_content.iloc[-1]['timestamp']+'+00:00')
-                            positions = np.column_stack((file_content['timestamp'].map(lambda x: datetime.fromisoformat(x+'+00:00').isoformat(timespec='seconds')),
-                                                         file_content['longitude'].values, file_content['latitude'].values, file_content['altitude'].values/3.2808))[::360].flatten().tolist()
-                            label = [{"interval": datetime.fromisoformat(time+'+00:00').isoformat(timespec='seconds')+"/"+end.isoformat(timespec='seconds'),
-                                      "string": file.name+"\n"+str(alt)+"ft "+str(gspeed)+"kt"}
-                                     for time, alt, gspeed in zip(file_content['timestamp'], file_content['altitude'], file_content['groundspeed'])]
-                            label = label[0::60]
-
-                        # positions =  np.column_stack((file_content['timestamp'].map(lambda x : datetime.utcfromtimestamp(x).isoformat()),
-                        #                         file_content['long'].values, file_content['lat'].values, file_content['alt'].values/3.2808)).flatten().tolist()
-                        # label = [{"interval": datetime.utcfromtimestamp(time).isoformat()+"/"+end.isoformat(),
-                        #         "string": file.name+"\n"+str(alt)+"ft "+str(gspeed)+"kt"}
-                        #         for time, alt, gspeed in zip(file_content['timestamp'], file_content['alt'], file_content['gspeed'])]
-
-                    if start_time == None and end_time == None:
-                        start_time = start
-                        end_time = end
-
-                    if start < start_time:
-                        start_time = start
-
-                    if end > end_time:
-                        end_time = end
-
-                    trajectory = {
-                        "id": id,
-                        "availability": start.isoformat(timespec='seconds')+"/" + end.isoformat(timespec='seconds'),
-                        "position": {
-                            "cartographicDegrees": positions
-                        },
-                        "point": {
-                            "pixelSize": 5,
-                            "color": {
-                                "rgba": [39, 245, 106, 215]
-                            }
-                        },
-                        "path": {
-                            "leadTime": 0,
-                            "trailTime": 20,
-                            "distanceDisplayCondition": {
-                                "distanceDisplayCondition": [0, 1000000]
-                            },
-                            #     "resolution": 600.0,
-                            #     "material": {
-                            #     "polylineDash": {}
-                            # }
-                        },
-                        "label": {
-                            "text": label,
-                            "font": "9px sans-serif",
-                            "horizontalOrigin": "LEFT",
-                            "pixelOffset": {
-                                "cartesian2": [20, 20],
-                            },
-                            "distanceDisplayCondition": {
-                                "distanceDisplayCondition": [0, 1000000]
-                            },
-                            "showBackground": True,
-                            "backgroundColor": {
-                                "rgba": [0, 0, 0, 50]
-                            }
-                        }
+            trajectories = Replay._read_historic_flights(replayFile)
+        else:
+            trajectories = Replay._read_simulation_file(files[0])
+
+        cached = {
+            'signature': signature,
+            'start': min(trajectory['time'][0] for trajectory in trajectories) if trajectories else 0.0,
+            'end': max(trajectory['time'][-1] for trajectory in trajectories) if trajectories else 0.0,
+            'trajectories': trajectories,
+        }
+        Replay.cache_path.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_file.replace(cache_file)
+        Replay._remember(key, cached)
+        return cached
+
+    @staticmethod
+    def _remember(key, cached):
+        """
+        Keep a replay in memory and evict the least recently used one beyond MAX_LOADED.
+        """
+        Replay._loaded[key] = cached
+        Replay._loaded.move_to_end(key)
+        if len(Replay._loaded) > Replay.MAX_LOADED:
+            Replay._loaded.popitem(last=False)
+
+    @staticmethod
+    def _read_historic_flights(replayFile):
+        """
+        Read the historic flights of a day from the flight store into trajectories.
+        """
+        store = FlightStore(replayFile)
+        trajectories = []
+        for index, flight in enumerate(store.flights['flight']):
+            data = store.get_flight(index, ['time', 'long', 'lat', 'alt', 'gspeed'])
+            if len(data['time']) == 0:
+                continue
+            position = np.column_stack((data['long'], data['lat'], data['alt']/3.2808))
+            label = flight+".csv\n"+pd.Series(data['alt']).round().astype('Int64').astype(str)+"ft " + \
+                pd.Series(data['gspeed']).round().astype('Int64').astype(str)+"kt"
+            trajectories.append(Replay._make_trajectory(flight+".csv", data['time'], position, label.to_numpy(dtype=object)))
+        return trajectories
+
+    @staticmethod
+    def _read_simulation_file(file):
+        """
+        Parse a simulation result file into trajectories.
+        """
+        df = pd.read_csv(file)
+        df['time'] = pd.to_datetime(df['timestamp'], format='ISO8601').to_numpy(dtype='datetime64[ns]').astype('int64') / 1e9
+        df['label'] = df['callsign']+"\n"+np.round(df['alt']).astype(int).astype(str)+"ft "+np.round(df['cas']).astype(int).astype(str)+"kt"
+        trajectories = []
+        for _, content in df.groupby('id', sort=False):
+            time = content['time'].to_numpy()
+            position = content[['long', 'lat', 'alt']].to_numpy(dtype=float)
+            position[:, 2] = position[:, 2]/3.2808
+            trajectories.append(Replay._make_trajectory(content['callsign'].iloc[0], time, position, content['label'].to_numpy(dtype=object)))
+        return trajectories
+
+    @staticmethod
+    def _make_trajectory(id, time, position, label):
+        """
+        Build a trajectory with the sample indices of each level of detail.
+        """
+        return {
+            'id': id,
+            'time': time,
+            'position': position,
+            'label': label,
+            'levels': [None] + [np.flatnonzero(Replay.simplify(time, position, tolerance, max_gap)).astype(np.int32)
+                                for tolerance, max_gap in LOD_LEVELS[1:]],
+        }
+
+    @staticmethod
+    def simplify(time, position, tolerance, max_gap):
+        """
+        Select the samples of a trajectory kept at a level of detail.
+
+        The trajectory is projected to a local plane and simplified with the Ramer-Douglas-Peucker algorithm, with the
+        altitude weighted by ALTITUDE_WEIGHT. Samples are also kept such that no gap is longer than max_gap.
+
+        Parameters
+        ----------
+        time : float[]
+            Sample time [s]
+        position : float[n, 3]
+            Longitude [deg], latitude [deg], and altitude [m] of the samples
+        tolerance : float
+            Maximum distance between the original and the simplified trajectory [m]
+        max_gap : float
+            Maximum time between two kept samples [s], 0 to disable
+
+        Returns
+        -------
+        bool[]
+            Whether each sample is kept
+        """
+        long = np.unwrap(position[:, 0], period=360.0)
+        lat = position[:, 1]
+        points = np.column_stack((long * np.cos(np.deg2rad(np.mean(lat))) * 111320.0,
+                                  lat * 110574.0,
+                                  position[:, 2] * ALTITUDE_WEIGHT))
+        mask = rdp_mask(points, tolerance)
+        if max_gap > 0.0 and len(time) > 1:
+            bins = np.floor((time - time[0]) / max_gap)
+            mask[1:] |= bins[1:] != bins[:-1]
+        return mask
+
+    @staticmethod
+    def get_replay_info(replayCategory, replayFile):
+        """
+        Get the time span of a replay such that the client can request the CZML in pages.
+
+        Parameters
+        ----------
+        replayCategory : string
+            The category to replay (historic / simulation)
+        replayFile : string
+            Name of the replay file directory
+
+        Returns
+        -------
+        {}
+            Start and end time (ISO 8601), duration [s], number of trajectories, and tolerance [m] of each level of detail
+        """
+        replay = Replay.load_replay(replayCategory, replayFile)
+        start, end = _iso([replay['start'], replay['end']])
+        return {'start': start, 'end': end, 'duration': float(replay['end'] - replay['start']), 'trajectories': len(replay['trajectories']),
+                'levels': [tolerance for tolerance, _ in LOD_LEVELS]}
+
+    @staticmethod
+    def get_replay_czml(replayCategory, replayFile, start=None, end=None, level='auto'):
+        """
+        Generate CZML file for visualization given replay file name.
+
+        When a time window is given, only the trajectories active in the window are returned with their samples in the
+        window (and one sample on each side for interpolation). Pages of consecutive windows can be processed one after
+        another by the same CZML data source on the client.
+
+        The trajectories are simplified to the requested level of detail (see LOD_LEVELS), which the client can choose
+        from its zoom level. By default, the level is chosen from the duration of the time window.
+
+        Parameters
+        ----------
+        replayCategory : string
+            The category to replay (historic / simulation)
+        replayFile : string
+            Name of the replay file directory
+        start : float, optional
+            Start of the time window since the start of the replay [s], by default the start of the replay
+        end : float, optional
+            End of the time window since the start of the replay [s], by default the end of the replay
+        level : int or string, optional
+            Level of detail, by default 'auto'
+
+        Returns
+        -------
+        {}
+            JSON CZML file
+        """
+        replay = Replay.load_replay(replayCategory, replayFile)
+        window_start = replay['start'] + (start if start is not None else 0.0)
+        window_end = replay['start'] + end if end is not None else replay['end']
+        if level == 'auto':
+            level = int(np.searchsorted(LOD_AUTO_DURATION, window_end - window_start))
+        level = min(max(int(level), 0), len(LOD_LEVELS) - 1)
+
+        replay_start, replay_end = _iso([replay['start'], replay['end']])
+        document = [{
+            "id": "document",
+            "name": "Replay" if replayCategory == 'historic' else "simulation",
+            "version": "1.0",
+            "clock": {
+                "interval": replay_start+"/"+replay_end,
+                "currentTime": replay_start,
+            }
+        }]
+
+        for trajectory in replay['trajectories']:
+            if trajectory['time'][-1] < window_start or trajectory['time'][0] > window_end:
+                continue
+            index = trajectory['levels'][level]
+            time = trajectory['time'] if index is None else trajectory['time'][index]
+            i0 = max(np.searchsorted(time, window_start, 'right') - 1, 0)
+            i1 = np.searchsorted(time, window_end, 'left') + 1
+            page = slice(i0, i1) if index is None else index[i0:i1]
+            position = trajectory['position'][page]
+
+            # Merge consecutive identical labels into one interval
+            label = trajectory['label'][page]
+            changed = np.ones(len(label), dtype=bool)
+            changed[1:] = label[1:] != label[:-1]
+            label_time = time[i0:i1][changed]
+            interval_start = _iso(label_time)
+            interval_end = _iso(np.append(label_time[1:], time[i1] if i1 < len(time) else time[-1]))
+
+            epoch, availability_start, availability_end = _iso([time[i0], time[0], time[-1]])
+            document.append({
+                "id": trajectory['id'],
+                "availability": availability_start+"/"+availability_end,
+                "position": {
+                    "epoch": epoch,
+                    "cartographicDegrees": np.column_stack((time[i0:i1] - time[i0], position)).ravel().tolist()
+                },
+                "point": {
+                    "pixelSize": 5,
+                    "color": {
+                        "rgba": [39, 245, 106, 215]
+                    }
+                },
+                "path": {
+                    "leadTime": 0,
+                    "trailTime": 20,
+                    "distanceDisplayCondition": {
+                        "distanceDisplayCondition": [0, 1000000]
+                    },
+                },
+                "label": {
+                    "text": [{"interval": s+"/"+e, "string": string}
+                             for s, e, string in zip(interval_start, interval_end, label[changed])],
+                    "font": "9px sans-serif",
+                    "horizontalOrigin": "LEFT",
+                    "pixelOffset": {
+                        "cartesian2": [20, 20],
+                    },
+                    "distanceDisplayCondition": {
+                        "distanceDisplayCondition": [0, 1000000]
+                    },
+                    "showBackground": True,
+                    "backgroundColor": {
+                        "rgba": [0, 0, 0, 50]
                     }
-                    trajectories.append(trajectory)
-            trajectories.insert(0, {
-                "id": "document",
-                "name": "Replay",
-                "version": "1.0",
-                "clock": {
-                    "interval": start_time.isoformat(timespec='seconds')+"/" + end_time.isoformat(timespec='seconds'),
-                    "currentTime": start_time.isoformat(timespec='seconds'),
                 }
             })
-            return trajectories
-
-        elif replayCategory == 'simulation':
-            df = pd.read_csv(
-                Path(__file__).parent.parent.joinpath('data/result', replayFile))
-            document = [{
-                "id": "document",
-                "name": "simulation",
-                "version": "1.0",
-                "clock": {
-                    "interval": df.iloc[0]['timestamp']+"/"+df.iloc[-1]['timestamp'],
-                    "currentTime": df.iloc[0]['timestamp'],
-                }
-            }]
-
-            for id in df['id'].unique():
-                content = df[df['id'] == id]
-                id = content.iloc[0]['callsign']
-                positions = np.column_stack(
-                    (content['timestamp'], content['long'].values, content['lat'].values, content['alt'].values/3.2808)).flatten().tolist()
-                label = [{"interval": time+"/"+content.iloc[-1]['timestamp'],
-                          "string": id+"\n"+str(int(np.round(alt)))+"ft "+str(int(np.round(cas)))+"kt"}
-                         for time, alt, cas in zip(content['timestamp'], content['alt'], content['cas'])]
-                document.append(
-                    {
-                        "id": id,
-                        "availability": content.iloc[0]['timestamp']+"/" + content.iloc[-1]['timestamp'],
-                        "position": {
-                            "cartographicDegrees": positions
-                        },
-                        "point": {
-                            "pixelSize": 5,
-                            "color": {
-                                "rgba": [39, 245, 106, 215]
-                            }
-                        },
-                        # "billboard": {
-                        #     "image":{
-                        #         "interval": content.iloc[0]['timestamp']+"/"+ content.iloc[-1]['timestamp'],
-                        #         "uri": "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iOTYiIGhlaWdodD0iOTYiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyIgeG1sbnM6eGxpbms9Imh0dHA6Ly93d3cudzMub3JnLzE5OTkveGxpbmsiIHhtbDpzcGFjZT0icHJlc2VydmUiIG92ZXJmbG93PSJoaWRkZW4iPjxkZWZzPjxjbGlwUGF0aCBpZD0iY2xpcDAiPjxyZWN0IHg9IjU5MiIgeT0iMzEyIiB3aWR0aD0iOTYiIGhlaWdodD0iOTYiLz48L2NsaXBQYXRoPjwvZGVmcz48ZyBjbGlwLXBhdGg9InVybCgjY2xpcDApIiB0cmFuc2Zvcm09InRyYW5zbGF0ZSgtNTkyIC0zMTIpIj48cGF0aCBkPSJNNjc0IDM3OCA2NzQgMzY5IDY0NSAzNDguNSA2NDUgMzI5QzY0NSAzMjUuMSA2NDMgMzIwIDY0MCAzMjAgNjM3LjEgMzIwIDYzNSAzMjUuMSA2MzUgMzI5TDYzNSAzNDguNSA2MDYgMzY5IDYwNiAzNzggNjM1IDM2My41IDYzNSAzODUuMyA2MjUgMzk0IDYyNSA0MDAgNjQwIDM5NCA2NTUgNDAwIDY1NSAzOTQgNjQ1IDM4NS4zIDY0NSAzNjMuNSA2NzQgMzc4WiIgZmlsbD0iIzAwQ0MzMyIvPjwvZz48L3N2Zz4="
-                        #     },
-                        #     "scale": 1.0,
-                        #     # "rotation": 1.3,
-                        #     "alignedAxis": {
-                        #         "velocityReference": id+"#position"
-                        #     }
-                        # },
-                        "path": {
-                            "leadTime": 0,
-                            "trailTime": 20,
-                            "distanceDisplayCondition": {
-                                "distanceDisplayCondition": [0, 1000000]
-                            },
-                            #     "resolution": 600.0,
-                            #     "material": {
-                            #     "polylineDash": {}
-                            # }
-                        },
-                        "label": {
-                            "text": label,
-                            "font": "9px sans-serif",
-                            "horizontalOrigin": "LEFT",
-                            "pixelOffset": {
-                                "cartesian2": [20, 20],
-                            },
-                            "distanceDisplayCondition": {
-                                "distanceDisplayCondition": [0, 1000000]
-                            },
-                            "showBackground": True,
-                            "backgroundColor": {
-                                "rgba": [0, 0, 0, 50]
-                            }
-                        }
-                    }
-                )
-            return document
+        return document
 
     @staticmethod
     def get_graph_header(mode, replayCategory, replayFile):
@@ -255,14 +395,7 @@ class Replay:
         """
         header = ['None']
         if mode == 'replay' and replayCategory == 'simulation':
-            with open(Path(__file__).parent.parent.joinpath('data/result', replayFile), 'r') as file:
-                header.extend(next(csv.reader(file)))
-            header.remove('timestep')
-            header.remove('timestamp')
-            header.remove('id')
-            header.remove('callsign')
-            header.remove('lat')
-            header.remove('long')
+            header.extend(ResultReader.open(Path(__file__).parent.parent.joinpath('data/result', replayFile)).get_graph_header())
         return header
 
     @staticmethod
@@ -284,31 +417,14 @@ class Replay:
         {}
             JSON file for graph data for Plotly.js
         """
-        data = []
-        if mode == 'replay' and replayCategory == 'simulation' and graph != 'None':
-            df = pd.read_csv(
-                Path(__file__).parent.parent.joinpath('data/result/', replayFile))
-            for id in df['id'].unique():
-                content = df[df['id'] == id]
-                data.append({
-                    "x": content['timestep'].to_list(),
-                    "y": content[graph].to_list(),
-                    "name": content.iloc[0]['callsign'],
-                    "type": 'scattergl',
-                    "mode": 'lines',
-                })
-
-        elif mode == 'simulation' and graph != 'None':
-            df = pd.read_csv(Path(__file__).parent.parent.joinpath(
-                'data/result/', simulationFile, simulationFile+'.csv'))
-            for id in df['id'].unique():
-                content = df[df['id'] == id]
-                data.append({
-                    "x": content['timestep'].to_list(),
-                    "y": content[graph].to_list(),
-                    "name": content.iloc[0]['callsign'],
-                    "type": 'scattergl',
-                    "mode": 'lines',
-                })
-
-        return data
+        if graph == 'None':
+            return []
+        if mode == 'replay' and replayCategory == 'simulation':
+            path = Path(__file__).parent.parent.joinpath('data/result/', replayFile)
+        elif mode == 'simulation':
+            path = Path(__file__).parent.parent.joinpath('data/result/', simulationFile, 'simulation.csv')
+            if not path.is_file():
+                path = path.with_name(simulationFile+'.csv')
+        else:
+            return []
+        return ResultReader.open(path).get_graph_data(graph)
@@ -0,0 +1,158 @@
+import csv
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+class ResultReader:
+    """
+    A cached reader of a simulation result file for plotting graphs.
+
+    Only the requested columns are parsed from the file. The rows of each aircraft are indexed once per file, and the
+    recently used readers and columns are kept in LRU caches such that repeated graph requests do not touch the file.
+    A reader is replaced when the modification time or size of its file changes (e.g. a running simulation).
+    """
+
+    MAX_READERS = 4
+    """Maximum number of cached files"""
+    MAX_COLUMNS = 8
+    """Maximum number of cached columns and graphs per file"""
+    _readers = OrderedDict()
+
+    def __init__(self, path):
+        """
+        Initialize result reader
+
+        Parameters
+        ----------
+        path : Path
+            Path of the simulation result file
+        """
+        self.path = path
+        """Path of the simulation result file [Path]"""
+        with open(path, 'r') as file:
+            self.header = next(csv.reader(file), [])
+            """Column names [string[]]"""
+        self.x = 'timestep' if 'timestep' in self.header else 'timestamp'
+        """Column of the x axis [string]"""
+        self.columns = OrderedDict()
+        """Cached columns [{string: np.ndarray}]"""
+        self.graphs = OrderedDict()
+        """Cached graph data [{string: {}[]}]"""
+        self.index = None
+        """Row numbers grouped by aircraft id, and the start and end of the rows of each aircraft [(int[], int[], int[])]"""
+
+    @staticmethod
+    def open(path):
+        """
+        Get the cached reader of a file.
+
+        Parameters
+        ----------
+        path : Path
+            Path of the simulation result file
+
+        Returns
+        -------
+        ResultReader
+            Reader of the file
+        """
+        stat = path.stat()
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        reader = ResultReader._readers.get(key)
+        if reader is None:
+            reader = ResultReader(path)
+            ResultReader._readers[key] = reader
+            if len(ResultReader._readers) > ResultReader.MAX_READERS:
+                ResultReader._readers.popitem(last=False)
+        else:
+            ResultReader._readers.move_to_end(key)
+        return reader
+
+    def get_column(self, name):
+        """
+        Read one column of the file.
+
+        Parameters
+        ----------
+        name : string
+            Column name
+
+        Returns
+        -------
+        np.ndarray
+            Values of the column
+        """
+        column = self.columns.get(name)
+        if column is None:
+            column = pd.read_csv(self.path, usecols=[name])[name].to_numpy()
+            self.columns[name] = column
+            if len(self.columns) > ResultReader.MAX_COLUMNS:
+                self.columns.popitem(last=False)
+        else:
+            self.columns.move_to_end(name)
+        return column
+
+    def get_index(self):
+        """
+        Get the index of the rows of each aircraft, built on first use.
+
+        Returns
+        -------
+        (int[], int[], int[])
+            Row numbers grouped by aircraft id (in order of appearance within each aircraft), and the start and end of
+            the rows of each aircraft in the grouped row numbers
+        """
+        if self.index is None:
+            id = pd.read_csv(self.path, usecols=['id'])['id'].to_numpy()
+            order = np.argsort(id, kind='stable')
+            _, starts = np.unique(id[order], return_index=True)
+            self.index = (order, starts, np.append(starts[1:], len(order)))
+        return self.index
+
+    def get_graph_header(self):
+        """
+        Get the list of parameters name suitable for plotting graph.
+
+        Returns
+        -------
+        string[]
+            List of column names excluding time, identity and position
+        """
+        return [name for name in self.header if name not in ('timestep', 'timestamp', 'id', 'callsign', 'lat', 'long')]
+
+    def get_graph_data(self, graph):
+        """
+        Get the data of one parameter of every aircraft to plot a graph.
+
+        Parameters
+        ----------
+        graph : string
+            Column name of the parameter
+
+        Returns
+        -------
+        {}[]
+            One Plotly.js trace per aircraft
+        """
+        data = self.graphs.get(graph)
+        if data is not None:
+            self.graphs.move_to_end(graph)
+            return data
+
+        order, starts, ends = self.get_index()
+        x, y, callsign = self.get_column(self.x), self.get_column(graph), self.get_column('callsign')
+        data = []
+        for start, end in zip(starts, ends):
+            rows = order[start:end]
+            data.append({
+                "x": x[rows].tolist(),
+                "y": y[rows].tolist(),
+                "name": callsign[rows[0]],
+                "type": 'scattergl',
+                "mode": 'lines',
+            })
+        self.graphs[graph] = data
+        if len(self.graphs) > ResultReader.MAX_COLUMNS:
+            self.graphs.popitem(last=False)
+        return data
@@ -7,17 +7,22 @@ app : Flask()
     A flask server object.
 socketio : SocketIO()
     A SocketIO object for communication.
+sessions : {str: Session}
+    Simulation sessions running on the server. Each session runs in its own green thread and Socket.IO room.
 
 """
 
+import uuid
 from pathlib import Path
 from importlib import import_module
-from flask import Flask, render_template
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, request
+from flask_socketio import SocketIO, emit, join_room, leave_room
+from eventlet.event import Event
 # import eventlet
 
 from airtrafficsim.server.replay import Replay
 from airtrafficsim.server.data import Data
+from airtrafficsim.server.session import Session
 
 # eventlet.monkey_patch()
 
@@ -27,7 +32,42 @@ app = Flask(__name__, static_url_path='', static_folder=frontend_path, template_
 socketio = SocketIO(app, cors_allowed_origins='*', max_http_buffer_size=1e8,
                     ping_timeout=60, async_mode='eventlet')  # engineio_logger=True
 
-running_environment = None
+MAX_SESSIONS = 8
+"""Maximum number of concurrent simulation sessions"""
+COMMAND_TIMEOUT = 10.0
+"""Maximum time to wait for a queued command to be applied [s]"""
+
+sessions = {}
+client_sessions = {}
+
+
+def get_client_session():
+    """
+    Get the simulation session of the client of the current event.
+
+    Returns
+    -------
+    Session
+        The session the client joined, or None
+    """
+    session_id = client_sessions.get(request.sid)
+    return sessions.get(session_id)
+
+
+def join_session(session):
+    """
+    Move the client of the current event to a simulation session.
+
+    Parameters
+    ----------
+    session : Session
+        The session to join
+    """
+    leave_session()
+    join_room(session.id)
+    session.join(request.sid)
+    client_sessions[request.sid] = session.id
+
 
 @socketio.on('connect')
 def test_connect():
@@ -42,17 +82,151 @@ def test_disconnect():
     """
     Debug function to inform the client is disconnected.
     """
+    session = get_client_session()
+    if session is not None:
+        session.leave(request.sid)
+    client_sessions.pop(request.sid, None)
     print('Client disconnected')
 
 
+@socketio.on('leaveSession')
+def leave_session():
+    """
+    Leave the simulation session of the client. The session keeps running.
+    """
+    session = get_client_session()
+    if session is not None:
+        leave_room(session.id)
+        session.leave(request.sid)
+    client_sessions.pop(request.sid, None)
+
+
+@socketio.on('joinSession')
+def join_session_event(session_id):
+    """
+    Join a running simulation session to receive its telemetry.
+
+    Parameters
+    ----------
+    session_id : string
+        Session id
+
+    Returns
+    -------
+    {}
+        Status of the session, or None if the session does not exist
+    """
+    if session_id not in sessions:
+        return None
+    join_session(sessions[session_id])
+    return sessions[session_id].get_status()
+
+
+@socketio.on('getSessions')
+def get_sessions():
+    """
+    Get the status of all simulation sessions.
+
+    Returns
+    -------
+    {}[]
+        Session id, environment, number of clients, simulation time, paused state, and CPU accounting of each session
+    """
+    return [session.get_status() for session in sessions.values()]
+
+
+@socketio.on('stopSession')
+def stop_session(session_id=None):
+    """
+    Stop a simulation session.
+
+    Parameters
+    ----------
+    session_id : string, optional
+        Session id, by default the session of the client
+    """
+    session = sessions.get(session_id) if session_id is not None else get_client_session()
+    if session is not None:
+        session.env.stop()
+
+
+@socketio.on('subscribeTelemetry')
+def subscribe_telemetry(mode='delta', keyframe_interval=20):
+    """
+    Subscribe the client to its own simulation telemetry stream instead of the 'simulationData' broadcast.
+
+    Parameters
+    ----------
+    mode : string, optional
+        Telemetry mode (full / delta / binary), by default 'delta'.
+        In delta mode, 'simulationDelta' packets contain the static fields of an aircraft only when it appears, its flight plan changes,
+        or its control type changes, and only the dynamic fields that changed since the last packet.
+        In binary mode, 'simulationFrame' binary messages contain the packed state of all aircraft (see airtrafficsim.core.telemetry.FRAME_FIELDS)
+        and 'simulationStatic' packets contain the static fields when they change.
+    keyframe_interval : int, optional
+        Number of packets between keyframes containing all static and dynamic fields, by default 20
+    """
+    session = get_client_session()
+    if session is not None:
+        session.env.telemetry.subscribe(request.sid, mode, keyframe_interval)
+
+
+@socketio.on('setViewport')
+def set_viewport(bbox=None, filters=None):
+    """
+    Only stream the aircraft within the viewport and filters of the client. The client must subscribe to telemetry first.
+
+    Parameters
+    ----------
+    bbox : [float, float, float, float], optional
+        Viewport [south, west, north, east] [deg], by default None (no spatial filter)
+    filters : {}, optional
+        Optional filters 'frequency' (str or [str]), 'controlType' (str or [str]), and 'altRange' ([min, max] [ft]), by default None
+    """
+    filters = filters if filters else {}
+    session = get_client_session()
+    if session is not None and request.sid in session.env.telemetry.clients:
+        session.env.telemetry.set_viewport(request.sid, bbox, filters.get('frequency'), filters.get('controlType'), filters.get('altRange'))
+
+
+@socketio.on('unsubscribeTelemetry')
+def unsubscribe_telemetry():
+    """
+    Return the client to the 'simulationData' broadcast.
+    """
+    session = get_client_session()
+    if session is not None:
+        session.env.telemetry.unsubscribe(request.sid)
+
+
 @socketio.on('getReplayDir')
 def get_replay_dir():
     """Get the list of directories in data/replay"""
     return Replay.get_replay_dir()
 
 
+@socketio.on('getReplayInfo')
+def get_replay_info(replayCategory, replayFile):
+    """
+    Get the time span of a replay for requesting its CZML in pages.
+
+    Parameters
+    ----------
+    replayCategory : string
+        The category to replay (historic / simulation)
+    replayFile : string
+        Name of the replay file directory
+
+    Returns
+    -------
+    {}
+        Start and end time (ISO 8601), duration [s], and number of trajectories
+    """
+    return Replay.get_replay_info(replayCategory, replayFile)
+
+
 @socketio.on('getReplayCZML')
-def get_replay_czml(replayCategory, replayFile):
+def get_replay_czml(replayCategory, replayFile, start=None, end=None, level='auto'):
     """
     Generate a CZML file to client for replaying data.
 
@@ -62,13 +236,19 @@ def get_replay_czml(replayCategory, replayFile):
         The category to replay (historic / simulation)
     replayFile : string
         Name of the replay file directory
+    start : float, optional
+        Start of the page since the start of the replay [s], by default the start of the replay
+    end : float, optional
+        End of the page since the start of the replay [s], by default the end of the replay
+    level : int or string, optional
+        Level of detail, by default 'auto' to choose from the duration of the page
 
     Returns
     -------
     {}
         JSON dictionary of the CZML data file
     """
-    return Replay.get_replay_czml(replayCategory, replayFile)
+    return Replay.get_replay_czml(replayCategory, replayFile, start, end, level)
 
 
 @socketio.on('getGraphHeader')
@@ -135,30 +315,135 @@ def get_simulation_file():
 @socketio.on('runSimulation')
 def run_simulation(file):
     """
-    Start the simulation given file name.
+    Start the simulation given file name in a new session and join the client to it.
 
     Parameters
     ----------
     file : string
         Environment file name
+
+    Returns
+    -------
+    string
+        Session id of the simulation, or None if the maximum number of sessions is reached
     """
-    global running_environment
     print(file)
+    if len(sessions) >= MAX_SESSIONS:
+        emit('loadingMsg', 'The server is running the maximum number of ' + str(MAX_SESSIONS) + ' simulations. <br> Please stop a simulation and try again.')
+        return None
+
     if file == "ConvertHistoricDemo":
-        socketio.emit('loadingMsg', 'Converting historic data to simulation data... <br> Please check the terminal for progress.')
+        emit('loadingMsg', 'Converting historic data to simulation data... <br> Please check the terminal for progress.')
     elif file == "WeatherDemo":
-        socketio.emit('loadingMsg', 'Downloading weather data... <br> Please check the terminal for progress.')
+        emit('loadingMsg', 'Downloading weather data... <br> Please check the terminal for progress.')
     else:
-        socketio.emit('loadingMsg', 'Running simulation... <br> Please check the terminal for progress.')
+        emit('loadingMsg', 'Running simulation... <br> Please check the terminal for progress.')
     socketio.sleep(0)
     Env = getattr(import_module('airtrafficsim.data.environment.' + file, '...'), file)
     env = Env()
 
-    if running_environment is not None:
-        running_environment.stop()
-    running_environment = env
+    session = Session(uuid.uuid4().hex[:8], file, env)
+    sessions[session.id] = session
+    join_session(session)
+    socketio.start_background_task(run_session, session)
+    return session.id
+
+
+def run_session(session):
+    """
+    Run the environment of a session until it ends, then remove the session.
+
+    Parameters
+    ----------
+    session : Session
+        The session to run
+    """
+    try:
+        session.env.run(socketio)
+    finally:
+        sessions.pop(session.id, None)
+        socketio.emit('sessionEnded', session.get_status(), to=session.id)
+        for sid in list(session.clients):
+            if client_sessions.get(sid) == session.id:
+                del client_sessions[sid]
+        socketio.close_room(session.id)
+
+
+@socketio.on('command')
+def command(command):
+    """
+    Queue a command for the simulation session of the client and wait until it is applied.
+    Commands are applied in one batch at the start of the next timestep.
+
+    Parameters
+    ----------
+    command : {}
+        { aircraft: str, command: str, payload: any }. The command types are defined by the handle_command() method of the environment
+        (e.g. takeoff, heading, altitude, airspeed, resume_nav, flight_plan, approach, speed, snapshot).
+        Errors of failing commands, and commands not applied within COMMAND_TIMEOUT (e.g. the session ended), are sent back
+        with the 'commandResult' event.
 
-    env.run(socketio)
+    Returns
+    -------
+    any
+        Result of the handle_command() method of the environment, None if the command fails or times out, or False if the client has no session
+    """
+    session = get_client_session()
+    if session is None:
+        return False
+    applied = Event()
+    response = session.env.queue_command(command['aircraft'], command['command'], command.get('payload'), request.sid, applied.send)
+    if applied.wait(COMMAND_TIMEOUT) is None:
+        emit('commandResult', {'aircraft': command['aircraft'], 'command': command['command'],
+                               'error': 'Command was not applied within ' + str(COMMAND_TIMEOUT) + ' s'})
+        return None
+    return response.get('result')
+
+
+@socketio.on('setSimulationGraphType')
+def set_simulation_graph_type(graph_type):
+    """
+    Set the graph type of the simulation session of the client.
+
+    Parameters
+    ----------
+    graph_type : string
+        Graph type
+    """
+    session = get_client_session()
+    if session is not None:
+        session.env.graph_type = graph_type
+
+
+@socketio.on('setProfiling')
+def set_profiling(enabled):
+    """
+    Enable or disable the timestep profiler of the simulation session of the client.
+
+    Parameters
+    ----------
+    enabled : bool
+        Whether to record the time of each simulation stage
+    """
+    session = get_client_session()
+    if session is not None:
+        session.env.profiler.enabled = enabled
+
+
+@socketio.on('getProfile')
+def get_profile():
+    """
+    Get the timestep profile of the simulation session of the client.
+
+    Returns
+    -------
+    {}
+        Count, cumulative time [s], and mean, median, 95th and 99th percentile, and maximum time [ms] of each simulation stage
+    """
+    session = get_client_session()
+    if session is None:
+        return {}
+    return session.env.profiler.summary()
 
 
 @socketio.on('getNav')
@@ -263,8 +548,12 @@ def get_radar_img(lat1, long1, lat2, long2, file, time):
 
 @socketio.on('webrtc')
 def webrtc(data):
-    """Send webrtc data to client"""
-    emit('webrtc', data, broadcast=True, include_self=False)
+    """Send webrtc data to the other clients of the simulation session (or all clients outside of a session)"""
+    session = get_client_session()
+    if session is not None:
+        emit('webrtc', data, to=session.id, include_self=False)
+    else:
+        emit('webrtc', data, broadcast=True, include_self=False)
 
 
 @app.route("/")
@@ -0,0 +1,84 @@
+import time
+
+from airtrafficsim.core.telemetry import Telemetry
+
+
+class Session:
+    """
+    A simulation environment hosted by the server in its own Socket.IO room.
+
+    Clients that join a session receive the telemetry of its environment only. The session tracks the CPU time spent by
+    its environment such that concurrent sessions can be monitored.
+    """
+
+    def __init__(self, session_id, file, env):
+        """
+        Initialize session
+
+        Parameters
+        ----------
+        session_id : str
+            Session id, also used as the Socket.IO room name
+        file : str
+            Environment file name
+        env : Environment
+            The simulation environment
+        """
+        self.id = session_id
+        """Session id and Socket.IO room name [str]"""
+        self.file = file
+        """Environment file name [str]"""
+        self.env = env
+        """The simulation environment [Environment]"""
+        self.clients = set()
+        """Session ids of the clients in the room [set]"""
+        self.start_time = time.time()
+        """Wall time the session starts [s]"""
+
+        env.room = session_id
+        env.telemetry = Telemetry(connected=self.clients)
+
+    def join(self, sid):
+        """
+        Add a client to the session.
+
+        Parameters
+        ----------
+        sid : str
+            Session id of the client
+        """
+        self.clients.add(sid)
+
+    def leave(self, sid):
+        """
+        Remove a client from the session.
+
+        Parameters
+        ----------
+        sid : str
+            Session id of the client
+        """
+        self.clients.discard(sid)
+        self.env.telemetry.unsubscribe(sid)
+
+    def get_status(self):
+        """
+        Get the status of the session.
+
+        Returns
+        -------
+        {}
+            Session id, environment file name, number of clients, simulation time [s], paused state,
+            CPU time of the environment [s], wall time since the start [s], and CPU usage [fraction of one core]
+        """
+        wall_time = time.time() - self.start_time
+        return {
+            'id': self.id,
+            'environment': self.file,
+            'clients': len(self.clients),
+            'global_time': self.env.global_time,
+            'paused': self.env.paused,
+            'cpu_time': self.env.cpu_time,
+            'wall_time': wall_time,
+            'cpu_usage': self.env.cpu_time / wall_time if wall_time > 0 else 0.0,
+        }
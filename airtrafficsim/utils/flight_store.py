@@ -0,0 +1,243 @@
+import json
+import shutil
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+
+class FlightStore:
+    """
+    A columnar store of the historic flight data of one day.
+
+    The CSV files in data/flight_data/<day>/ (one per flight, in FlightRadar24 or OpenSky format) are normalized once into
+    one memory-mapped .npy file per column in data/cache/flight_store/<day>/. The rows are grouped by flight and sorted
+    by time, and an index of the row range, time span and bounding box of every flight is kept in memory such that
+    queries only read the rows they need. The store is rebuilt when any source file changes.
+
+    Attributes
+    ----------
+    FlightStore.COLUMNS : str[]
+        Names of the numerical columns: time [epoch s], lat [deg], long [deg], alt [ft], gspeed [kt], heading [deg],
+        vertrate [ft/min]
+
+    FlightStore.METADATA : str[]
+        Names of the per-flight metadata in the index
+    """
+
+    COLUMNS = ['time', 'lat', 'long', 'alt', 'gspeed', 'heading', 'vertrate']
+    METADATA = ['icao24', 'aircraft_model', 'origin', 'destination']
+    VERSION = 1
+
+    data_path = Path(__file__).parent.parent.joinpath('data/flight_data')
+    """Folder of the historic flight data [Path]"""
+    store_path = Path(__file__).parent.parent.joinpath('data/cache/flight_store')
+    """Folder of the columnar stores [Path]"""
+
+    def __init__(self, day):
+        """
+        Open the store of a day, ingesting the source files if the store is missing or outdated.
+
+        Parameters
+        ----------
+        day : string
+            Name of the directory in data/flight_data/ (e.g. 2018-05-01)
+        """
+        self.day = day
+        """Name of the day directory [string]"""
+        self.path = FlightStore.store_path.joinpath(day)
+        """Folder of the store [Path]"""
+
+        signature = self.get_signature()
+        meta_file = self.path.joinpath('meta.json')
+        if not meta_file.is_file() or json.loads(meta_file.read_text()) != signature:
+            self.ingest(signature)
+
+        self.flights = pd.read_csv(self.path.joinpath('flights.csv'), keep_default_na=False,
+                                   dtype={name: str for name in ['flight'] + FlightStore.METADATA})
+        """Index of the flights with their row range, time span, bounding box and metadata [pd.DataFrame]"""
+        self.columns = {name: np.load(self.path.joinpath(name+'.npy'), mmap_mode='r') for name in FlightStore.COLUMNS}
+        """Memory-mapped columns [{str: np.memmap}]"""
+
+    @staticmethod
+    def get_source_files(day):
+        """
+        Get the source files of a day.
+
+        Parameters
+        ----------
+        day : string
+            Name of the directory in data/flight_data/
+
+        Returns
+        -------
+        Path[]
+            Sorted list of flight CSV files
+        """
+        path = FlightStore.data_path.joinpath(day)
+        return sorted(file for file in path.iterdir() if file.suffix == '.csv' and file.name != day+'.csv')
+
+    def get_signature(self):
+        """
+        Get the signature of the source files used to detect an outdated store.
+
+        Returns
+        -------
+        {}
+            Store version and name, modification time and size of each source file
+        """
+        return {'version': FlightStore.VERSION,
+                'files': [[file.name, file.stat().st_mtime_ns, file.stat().st_size] for file in FlightStore.get_source_files(self.day)]}
+
+    @staticmethod
+    def read_flight(file):
+        """
+        Read a flight CSV file in FlightRadar24 or OpenSky format into normalized columns.
+
+        Parameters
+        ----------
+        file : Path
+            Flight CSV file
+
+        Returns
+        -------
+        ({str: float[]}, {str: str})
+            Numerical columns sorted by time and metadata of the flight, or None if the format is not recognized
+        """
+        df = pd.read_csv(file)
+        if df.empty:
+            return None
+        if {'timestamp', 'long', 'lat', 'alt', 'gspeed'}.issubset(df.columns):
+            # FR24
+            time = df['timestamp'].to_numpy(dtype=float)
+            df = df.rename(columns={'hangle': 'heading', 'Aircraft_model': 'aircraft_model'})
+        elif {'timestamp', 'longitude', 'latitude', 'altitude', 'groundspeed'}.issubset(df.columns):
+            # Opensky
+            time = pd.to_datetime(df['timestamp'], format='ISO8601').to_numpy(dtype='datetime64[ns]').astype('int64') / 1e9
+            df = df.rename(columns={'latitude': 'lat', 'longitude': 'long', 'altitude': 'alt', 'groundspeed': 'gspeed',
+                                    'track': 'heading', 'vertical_rate': 'vertrate', 'typecode': 'aircraft_model'})
+        else:
+            return None
+
+        order = np.argsort(time, kind='stable')
+        columns = {'time': time[order]}
+        for name in FlightStore.COLUMNS[1:]:
+            columns[name] = df[name].to_numpy(dtype=float)[order] if name in df else np.full(len(df), np.nan)
+        metadata = {name: str(df[name].iloc[0]) if name in df else '' for name in FlightStore.METADATA}
+        return columns, metadata
+
+    def ingest(self, signature=None):
+        """
+        Normalize the source files of the day into the columnar store.
+
+        Parameters
+        ----------
+        signature : {}, optional
+            Signature of the source files, by default computed from the files
+        """
+        if signature is None:
+            signature = self.get_signature()
+        print("Ingesting flight data of", self.day)
+
+        columns = {name: [] for name in FlightStore.COLUMNS}
+        flights = []
+        row = 0
+        for file in FlightStore.get_source_files(self.day):
+            flight = FlightStore.read_flight(file)
+            if flight is None:
+                continue
+            data, metadata = flight
+            n = len(data['time'])
+            for name in FlightStore.COLUMNS:
+                columns[name].append(data[name])
+            flights.append({
+                'flight': file.name.removesuffix('.csv'),
+                'start_row': row,
+                'end_row': row + n,
+                'time_min': data['time'][0],
+                'time_max': data['time'][-1],
+                'lat_min': np.nanmin(data['lat']),
+                'lat_max': np.nanmax(data['lat']),
+                'long_min': np.nanmin(data['long']),
+                'long_max': np.nanmax(data['long']),
+                **metadata
+            })
+            row += n
+
+        # Write to a temporary folder and swap it in
+        tmp_path = self.path.with_name(self.day+'.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        for name in FlightStore.COLUMNS:
+            np.save(tmp_path.joinpath(name+'.npy'), np.concatenate(columns[name]) if columns[name] else np.empty(0))
+        pd.DataFrame(flights, columns=['flight', 'start_row', 'end_row', 'time_min', 'time_max', 'lat_min', 'lat_max',
+                                       'long_min', 'long_max'] + FlightStore.METADATA).to_csv(tmp_path.joinpath('flights.csv'), index=False)
+        tmp_path.joinpath('meta.json').write_text(json.dumps(signature))
+        shutil.rmtree(self.path, ignore_errors=True)
+        tmp_path.rename(self.path)
+
+    def get_flight(self, flight, columns=None, t0=None, t1=None):
+        """
+        Read the samples of one flight.
+
+        Parameters
+        ----------
+        flight : string or int
+            Flight name (CSV file name without extension) or its position in the index
+        columns : str[], optional
+            Columns to read, by default all columns
+        t0 : float, optional
+            Start of the time range [epoch s], by default the first sample
+        t1 : float, optional
+            End of the time range [epoch s], by default the last sample
+
+        Returns
+        -------
+        {str: float[]}
+            Column name to the values of the samples in the time range
+        """
+        index = self.flights.index[self.flights['flight'] == flight][0] if isinstance(flight, str) else flight
+        start, end = self.flights['start_row'].iat[index], self.flights['end_row'].iat[index]
+        if t0 is not None or t1 is not None:
+            time = self.columns['time'][start:end]
+            start, end = (start + np.searchsorted(time, t0, 'left') if t0 is not None else start,
+                          start + np.searchsorted(time, t1, 'right') if t1 is not None else end)
+        return {name: np.asarray(self.columns[name][start:end]) for name in (columns if columns else FlightStore.COLUMNS)}
+
+    def query(self, t0=None, t1=None, bbox=None):
+        """
+        Find the flights active in a time range and within a bounding box.
+
+        The index statistics are used to discard flights first, and only the samples of the remaining flights in the
+        time range are read to check the bounding box.
+
+        Parameters
+        ----------
+        t0 : float, optional
+            Start of the time range [epoch s], by default unbounded
+        t1 : float, optional
+            End of the time range [epoch s], by default unbounded
+        bbox : [float, float, float, float], optional
+            Minimum latitude, minimum longitude, maximum latitude, maximum longitude [deg], by default unbounded
+
+        Returns
+        -------
+        pd.DataFrame
+            Rows of the flight index matching the query
+        """
+        flights = self.flights
+        mask = np.ones(len(flights), dtype=bool)
+        if t0 is not None:
+            mask &= flights['time_max'].to_numpy() >= t0
+        if t1 is not None:
+            mask &= flights['time_min'].to_numpy() <= t1
+        if bbox is not None:
+            lat_min, long_min, lat_max, long_max = bbox
+            mask &= (flights['lat_max'].to_numpy() >= lat_min) & (flights['lat_min'].to_numpy() <= lat_max) & \
+                    (flights['long_max'].to_numpy() >= long_min) & (flights['long_min'].to_numpy() <= long_max)
+
+            # Check the samples in the time range of the candidates
+            for index in np.flatnonzero(mask):
+                data = self.get_flight(int(index), ['lat', 'long'], t0, t1)
+                mask[index] = np.any((data['lat'] >= lat_min) & (data['lat'] <= lat_max) &
+                                     (data['long'] >= long_min) & (data['long'] <= long_max))
+        return flights[mask]
@@ -0,0 +1,172 @@
+"""Convert historic flights to spawn records of simulated aircraft in parallel, with results cached per flight."""
+import json
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from airtrafficsim.utils.calculation import Cal
+from airtrafficsim.utils.flight_store import FlightStore
+from airtrafficsim.utils.route_detection import rdp_mask, detect_sid_star
+
+CACHE_VERSION = 3
+"""Version of the conversion cache format"""
+
+cache_path = Path(__file__).parent.parent.joinpath('data/cache/conversion')
+"""Folder of the conversion caches [Path]"""
+
+
+def analyze_flight(flight, data, aircraft_type, arrivals, approaches, center, radius, epsilon, margin):
+    """
+    Analyze one historic flight. This function is executed in a worker process.
+
+    Parameters
+    ----------
+    flight : string
+        Flight name (callsign)
+    data : {str: float[]}
+        Columns time, lat, long, alt, heading and gspeed of the flight read from the FlightStore
+    aircraft_type : string
+        ICAO aircraft type
+    arrivals : {}
+        Arrival procedures packed by route_detection.pack_procedures()
+    approaches : {}
+        Approach procedures packed by route_detection.pack_procedures()
+    center : (float, float)
+        Lat, Long of the center of the simulation area [deg, deg]
+    radius : float
+        Distance to the center where the aircraft appears [km]
+    epsilon : float
+        Tolerance of the trajectory simplification [deg]
+    margin : float
+        Margin of the bounding box prefilter of the procedures [deg] (see route_detection.detect_sid_star())
+
+    Returns
+    -------
+    {}
+        Spawn record with callsign, aircraft type, STAR, approach, and time [epoch s], position [deg], altitude [ft],
+        heading [deg] and ground speed [kt] at the appearance point, or None if the flight never enters the area
+    """
+    traj = np.column_stack((data['lat'], data['long']))
+
+    # Determine aircraft appearance point
+    inside = np.flatnonzero(Cal.cal_great_circle_dist(traj[:, 0], traj[:, 1], center[0], center[1]) < radius)
+    if len(inside) == 0:
+        return None
+    index = inside[0]
+
+    # Detect arrival and approach procedures on the simplified trajectory
+    simplified = traj[rdp_mask(traj, epsilon)]
+    star, _ = detect_sid_star(simplified, packed=arrivals, margin=margin)
+    approach, _ = detect_sid_star(simplified, packed=approaches, margin=margin)
+
+    return {
+        'callsign': flight,
+        'aircraft_type': aircraft_type,
+        'star': star,
+        'approach': approach,
+        'time': float(data['time'][index]),
+        'lat': float(data['lat'][index]),
+        'long': float(data['long'][index]),
+        'alt': float(data['alt'][index]),
+        'heading': float(data['heading'][index]),
+        'speed': float(data['gspeed'][index]),
+    }
+
+
+def get_cache_key(arrivals, approaches, center, radius, epsilon, margin):
+    """
+    Get the key of the conversion cache from the analysis parameters.
+
+    Returns
+    -------
+    str
+        Hash of the procedures and parameters
+    """
+    key = hashlib.sha1(json.dumps([CACHE_VERSION, center, radius, epsilon, margin]).encode())
+    for packed in (arrivals, approaches):
+        key.update(json.dumps(packed['names']).encode())
+        for name in ('coord', 'index', 'counts'):
+            key.update(np.ascontiguousarray(packed[name]).tobytes())
+    return key.hexdigest()
+
+
+def convert_historic(day, arrivals, approaches, center=(22.3193, 114.1694), radius=200.0, epsilon=0.005, margin=0.5, workers=None):
+    """
+    Analyze the historic flights of a day over a process pool and yield their spawn records in the order of the flights.
+
+    The flights are read from the columnar FlightStore of the day. Only the flights whose samples fall within the
+    bounding box of the simulation area are analyzed, and only the columns needed for the analysis are read.
+
+    The records are cached per flight name, modification time and size of its source file and per analysis parameters in
+    data/cache/conversion/, so unchanged flights are not analyzed again. Flights that fail to be analyzed are reported
+    and skipped, and are not cached so that they are analyzed again next time. The cache is also written when the caller
+    stops early.
+
+    Parameters
+    ----------
+    day : string
+        Name of the directory in data/flight_data/ (e.g. 2018-05-01)
+    arrivals : {}
+        Arrival procedures packed by route_detection.pack_procedures()
+    approaches : {}
+        Approach procedures packed by route_detection.pack_procedures()
+    center : (float, float), optional
+        Lat, Long of the center of the simulation area [deg, deg], by default Hong Kong
+    radius : float, optional
+        Distance to the center where the aircraft appears [km], by default 200.0
+    epsilon : float, optional
+        Tolerance of the trajectory simplification [deg], by default 0.005
+    margin : float, optional
+        Only procedures within margin [deg] of the trajectory in the procedure area are compared, by default 0.5
+    workers : int, optional
+        Number of worker processes, by default the number of CPUs
+
+    Yields
+    ------
+    {}
+        Spawn record of each flight entering the area (see analyze_flight())
+    """
+    cache_file = cache_path.joinpath(get_cache_key(arrivals, approaches, list(center), radius, epsilon, margin) + '.json')
+    cache = json.loads(cache_file.read_text()) if cache_file.is_file() else {}
+
+    # Bounding box of the simulation area
+    d_lat = np.rad2deg(radius / 6371.009)
+    d_long = min(d_lat / np.cos(np.deg2rad(min(abs(center[0]) + d_lat, 89.0))), 180.0)
+    store = FlightStore(day)
+    candidates = store.query(bbox=[center[0] - d_lat, center[1] - d_long, center[0] + d_lat, center[1] + d_long])
+
+    # The callsign comes from the flight name, so the name is part of the key and renamed or copied files are analyzed
+    files = {name: (mtime, size) for name, mtime, size in store.get_signature()['files']}
+    flights = {}
+    for index, flight in zip(candidates.index, candidates['flight']):
+        mtime, size = files[flight + '.csv']
+        flights[day + '/' + flight + ':' + str(mtime) + ':' + str(size)] = index
+    pending = {key: index for key, index in flights.items() if key not in cache}
+
+    executor = ProcessPoolExecutor(max_workers=workers) if len(pending) > 0 else None
+    futures = {}
+    try:
+        # All new flights are analyzed in parallel, the records are collected in the order of the flights
+        futures = {key: executor.submit(analyze_flight, store.flights['flight'].iat[index],
+                                        store.get_flight(int(index), ['time', 'lat', 'long', 'alt', 'heading', 'gspeed']),
+                                        store.flights['aircraft_model'].iat[index], arrivals, approaches, center, radius, epsilon, margin)
+                   for key, index in pending.items()}
+        for key, index in flights.items():
+            if key in futures:
+                try:
+                    cache[key] = futures[key].result()
+                except Exception as e:
+                    print("Historic conversion -", store.flights['flight'].iat[index], "failed:", repr(e))
+                    continue
+            if cache[key] is not None:
+                yield cache[key]
+    finally:
+        if executor is not None:
+            for future in futures.values():
+                future.cancel()
+            executor.shutdown()
+            cache_path.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix('.tmp')
+            tmp_file.write_text(json.dumps(cache))
+            tmp_file.replace(cache_file)
@@ -0,0 +1,135 @@
+import time
+from collections import deque
+from contextlib import nullcontext
+import numpy as np
+
+
+class Profiler:
+    """
+    A utility class to measure the time spent in each stage of a simulation timestep.
+
+    Stages are timed with ``with profiler.measure('stage'):``. When the profiler is disabled, measure() returns a shared
+    no-op context so the instrumentation costs almost nothing in the hot path.
+    """
+
+    _NULL_CONTEXT = nullcontext()
+
+    def __init__(self, enabled=False, max_samples=10000):
+        """
+        Initialize profiler
+
+        Parameters
+        ----------
+        enabled : bool, optional
+            Whether timings are recorded, by default False
+        max_samples : int, optional
+            Number of most recent samples kept per stage for percentiles, by default 10000
+        """
+        self.enabled = enabled
+        """Whether timings are recorded [bool]"""
+        self.max_samples = max_samples
+        """Number of most recent samples kept per stage [int]"""
+        self.total = {}
+        """Cumulative time of each stage [s]"""
+        self.count = {}
+        """Number of samples of each stage [int]"""
+        self.samples = {}
+        """Most recent samples of each stage [s]"""
+
+    def measure(self, stage):
+        """
+        Context manager to time one execution of a stage.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage
+
+        Returns
+        -------
+        context manager
+            Timer of the stage, or a no-op context if the profiler is disabled
+        """
+        if not self.enabled:
+            return Profiler._NULL_CONTEXT
+        return _StageTimer(self, stage)
+
+    def record(self, stage, duration):
+        """
+        Record one sample of a stage.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage
+        duration : float
+            Time spent [s]
+        """
+        if stage not in self.total:
+            self.total[stage] = 0.0
+            self.count[stage] = 0
+            self.samples[stage] = deque(maxlen=self.max_samples)
+        self.total[stage] += duration
+        self.count[stage] += 1
+        self.samples[stage].append(duration)
+
+    def reset(self):
+        """
+        Clear all recorded timings.
+        """
+        self.total = {}
+        self.count = {}
+        self.samples = {}
+
+    def summary(self):
+        """
+        Summarize the recorded timings of all stages.
+
+        Returns
+        -------
+        {str: {}}
+            Sample count, cumulative time [s], and mean, median, 95th percentile, 99th percentile, and maximum time [ms] of each stage
+        """
+        summary = {}
+        for stage, total in self.total.items():
+            samples = np.array(self.samples[stage]) * 1000.0
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            summary[stage] = {
+                'count': self.count[stage],
+                'total': total,
+                'mean': total / self.count[stage] * 1000.0,
+                'p50': p50,
+                'p95': p95,
+                'p99': p99,
+                'max': np.max(samples),
+            }
+        return summary
+
+    def print_summary(self):
+        """
+        Print the summary of all stages as a table.
+        """
+        print("")
+        print(f"{'Stage':<24}{'Count':>8}{'Total [s]':>12}{'Mean [ms]':>12}{'P50 [ms]':>12}{'P95 [ms]':>12}{'P99 [ms]':>12}{'Max [ms]':>12}")
+        for stage, s in self.summary().items():
+            print(f"{stage:<24}{s['count']:>8}{s['total']:>12.3f}{s['mean']:>12.3f}{s['p50']:>12.3f}{s['p95']:>12.3f}{s['p99']:>12.3f}{s['max']:>12.3f}")
+
+
+class _StageTimer:
+    """
+    Context manager to time one execution of a stage.
+    """
+
+    __slots__ = ('profiler', 'stage', 'start')
+
+    def __init__(self, profiler, stage):
+        self.profiler = profiler
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.stage, time.perf_counter() - self.start)
+        return False
@@ -1,3 +1,5 @@
+import pickle
+from pathlib import Path
 import numpy as np
 from airtrafficsim.utils.calculation import Cal
 from airtrafficsim.core.navigation import Nav
@@ -53,7 +55,7 @@ def point_line_distance(point, start, end):
         return n / d
 
 
-def rdp(points, epsilon):
+def rdp(points, epsilon, metric='planar'):
     """
     Reduces a series of points to a simplified version that loses detail, but
     maintains the general shape of the series.
@@ -64,70 +66,264 @@ def rdp(points, epsilon):
         Trajectory points
     epsilon : float
         Maximum distance between the original line and the simplified line
+    metric : string, optional
+        Distance metric (planar / great_circle), by default 'planar'. See rdp_batch().
+
+    Returns
+    -------
+    float[lat, long][]
+        Simplified trajectory points
     """
-    dmax = 0.0
-    index = 0
-    for i in range(1, len(points) - 1):
-        d = point_line_distance(points[i], points[0], points[-1])
-        if d > dmax:
-            index = i
-            dmax = d
-
-    if dmax >= epsilon:
-        results = rdp(points[:index+1], epsilon)[:-1] + \
-            rdp(points[index:], epsilon)
-    else:
-        results = [points[0], points[-1]]
+    points = np.asarray(points)
+    return list(points[rdp_mask(points, epsilon, metric)])
+
 
-    return results
+def perpendicular_distance(points, start, end):
+    """
+    Calculate the distance between points and lines in any number of dimensions.
 
+    Parameters
+    ----------
+    points : float[n, d]
+        Points
+    start : float[d] or float[n, d]
+        Start point of the line (of each point)
+    end : float[d] or float[n, d]
+        End point of the line (of each point)
 
-def detect_sid_star(simplified_trajectory, procedure_dict, waypoints_coord_dict):
+    Returns
+    -------
+    float[n]
+        Minimum distance between each point and its line
     """
-    Detect SID and STAR
+    direction = end - start
+    vector = points - start
+    norm = np.sum(direction**2, axis=-1)
+    projection = np.divide(np.sum(vector * direction, axis=-1), norm, out=np.zeros(np.broadcast(vector[..., 0], norm).shape), where=norm > 0.0)
+    return np.sqrt(np.sum((vector - projection[..., None] * direction)**2, axis=-1))
+
+
+def great_circle_distance(points, start, end):
+    """
+    Calculate the cross track distance between points and great circle paths.
+
+    Parameters
+    ----------
+    points : float[n, 2]
+        Lat, Long of the points [deg, deg]
+    start : float[2] or float[n, 2]
+        Lat, Long of the start point of the path (of each point) [deg, deg]
+    end : float[2] or float[n, 2]
+        Lat, Long of the end point of the path (of each point) [deg, deg]
+
+    Returns
+    -------
+    float[n]
+        Cross track distance, or distance to the start point if the path has no length [km]
+    """
+    start = np.broadcast_to(start, points.shape)
+    end = np.broadcast_to(end, points.shape)
+    to_start = Cal.cal_great_circle_dist(start[:, 0], start[:, 1], points[:, 0], points[:, 1])
+    cross_track = np.abs(Cal.cal_cross_track_dist(start[:, 0], start[:, 1], end[:, 0], end[:, 1], points[:, 0], points[:, 1]))
+    return np.where(np.all(start == end, axis=-1), to_start, cross_track)
+
+
+def rdp_mask(points, epsilon, metric='planar'):
+    """
+    Select the points of a simplified trajectory with the Ramer-Douglas-Peucker algorithm.
+
+    Parameters
+    ----------
+    points : float[n, d]
+        Trajectory points
+    epsilon : float
+        Maximum distance between the original line and the simplified line
+    metric : string, optional
+        Distance metric (planar / great_circle), by default 'planar'. See rdp_batch().
+
+    Returns
+    -------
+    bool[n]
+        Whether each point is kept
+    """
+    return rdp_batch([points], epsilon, metric)[0]
+
+
+def rdp_batch(trajectories, epsilon, metric='planar'):
+    """
+    Select the points of many simplified trajectories with the Ramer-Douglas-Peucker algorithm.
+
+    Instead of recursing, all segments still to be split (of all trajectories) are processed together: the distances
+    of all their inner points are computed in one vectorized operation, and each segment whose farthest point is at
+    least epsilon away is split at this point for the next iteration. The result is identical to the recursive
+    algorithm and the number of iterations is the depth of the recursion.
+
+    Parameters
+    ----------
+    trajectories : float[n, d][]
+        Points of each trajectory
+    epsilon : float
+        Maximum distance between the original line and the simplified line
+    metric : string, optional
+        Distance metric, by default 'planar'.
+        'planar': Euclidean distance to the line in the units of the points (any number of dimensions).
+        'great_circle': Cross track distance to the great circle path [km]; points are [lat, long] [deg].
+
+    Returns
+    -------
+    bool[n][]
+        Whether each point of each trajectory is kept
+    """
+    distance = great_circle_distance if metric == 'great_circle' else perpendicular_distance
+    lengths = np.array([len(trajectory) for trajectory in trajectories], dtype=int)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    mask = np.zeros(offsets[-1], dtype=bool)
+    if offsets[-1] == 0:
+        return [mask[:0] for _ in trajectories]
+    points = np.concatenate([np.asarray(trajectory, dtype=float) for trajectory in trajectories if len(trajectory) > 0])
+
+    nonempty = lengths > 0
+    seg_start = offsets[:-1][nonempty]
+    seg_end = offsets[1:][nonempty] - 1
+    mask[seg_start] = True
+    mask[seg_end] = True
+
+    while True:
+        # Segments with inner points
+        inner = seg_end - seg_start - 1
+        seg_start, seg_end, inner = seg_start[inner > 0], seg_end[inner > 0], inner[inner > 0]
+        if len(seg_start) == 0:
+            break
+
+        # Inner points of all segments
+        seg_offsets = np.cumsum(inner) - inner
+        seg_id = np.repeat(np.arange(len(seg_start)), inner)
+        index = np.arange(np.sum(inner)) - seg_offsets[seg_id] + seg_start[seg_id] + 1
+        dist = np.nan_to_num(distance(points[index], points[seg_start[seg_id]], points[seg_end[seg_id]]))
+
+        # First farthest point of each segment
+        dmax = np.maximum.reduceat(dist, seg_offsets)
+        farthest = np.flatnonzero(dist == dmax[seg_id])
+        farthest = farthest[np.unique(seg_id[farthest], return_index=True)[1]]
+
+        split = dmax >= epsilon
+        split_index = index[farthest][split]
+        mask[split_index] = True
+        seg_start, seg_end = np.concatenate((seg_start[split], split_index)), np.concatenate((split_index, seg_end[split]))
+
+    return [mask[offsets[i]:offsets[i+1]] for i in range(len(trajectories))]
+
+
+def pack_procedures(procedure_dict, waypoints_coord_dict):
+    """
+    Pack procedures and the coordinates of their waypoints into flat arrays for detect_sid_star().
 
     Parameters
     ----------
-    simplified_trajectory : float[lat, long]
-        Simplified trajectory
     procedure_dict : dict
         Procedure dictionary
     waypoints_coord_dict : dict
         SID/STAR waypoint coordinate dictionary
 
+    Returns
+    -------
+    {}
+        names : string[]
+            Procedure names
+        coord : float[n, 2]
+            Lat, Long of the waypoints [deg, deg]
+        index : int[]
+            Waypoint index in coord of the waypoints of all procedures, one procedure after another
+        offsets : int[]
+            Start of the waypoints of each procedure in index
+        counts : int[]
+            Number of waypoints of each procedure
+        bbox : float[p, 4]
+            Minimum latitude, minimum longitude, maximum latitude, maximum longitude of each procedure [deg]
+        area : float[4]
+            Bounding box of all waypoints [deg]
+    """
+    waypoints = list(waypoints_coord_dict.keys())
+    position = {wp: i for i, wp in enumerate(waypoints)}
+    coord = np.array(list(waypoints_coord_dict.values()), dtype=float).reshape(-1, 2)
+    names = list(procedure_dict.keys())
+    counts = np.array([len(procedure_dict[name]) for name in names], dtype=int)
+    index = np.array([position[wp] for name in names for wp in procedure_dict[name]], dtype=int)
+    offsets = np.cumsum(counts) - counts
+
+    bbox = np.full((len(names), 4), np.nan)
+    for i, (offset, count) in enumerate(zip(offsets, counts)):
+        if count > 0:
+            wp = coord[index[offset:offset+count]]
+            bbox[i] = [*np.min(wp, axis=0), *np.max(wp, axis=0)]
+    area = np.array([*np.min(coord, axis=0), *np.max(coord, axis=0)]) if len(coord) > 0 else np.full(4, np.nan)
+    return {'names': names, 'coord': coord, 'index': index, 'offsets': offsets, 'counts': counts, 'bbox': bbox, 'area': area}
+
+
+def detect_sid_star(simplified_trajectory, procedure_dict=None, waypoints_coord_dict=None, packed=None, margin=None):
+    """
+    Detect SID and STAR
+
+    For each trajectory segment starting within the area of the procedures, the area of the triangle between the segment
+    and each waypoint is computed as one broadcast matrix. The detected procedure has the smallest sum over the segments
+    of the area to its closest waypoint.
+
+    Parameters
+    ----------
+    simplified_trajectory : float[lat, long]
+        Simplified trajectory
+    procedure_dict : dict, optional
+        Procedure dictionary (not needed if packed is given)
+    waypoints_coord_dict : dict, optional
+        SID/STAR waypoint coordinate dictionary (not needed if packed is given)
+    packed : {}, optional
+        Procedures packed by pack_procedures(), by default packed from procedure_dict and waypoints_coord_dict
+    margin : float, optional
+        If given, only procedures whose bounding box expanded by margin [deg] intersects the bounding box of the
+        trajectory segments in the area are candidates, by default None (all procedures)
+
     Returns
     -------
     SID/STAR : string
         Identified SID/STAR
+    trajectory_in_area : float[lat, long]
+        Start and end point of the trajectory segments within the area of the procedures
     """
-    area_list = []
-    ats_list = []
-    wp_lat = np.array(list(waypoints_coord_dict.values()))[:, 0]
-    wp_long = np.array(list(waypoints_coord_dict.values()))[:, 1]
-    for ats, waypoints in procedure_dict.items():
-        # All waypoints in one procedure
-        wp_list = np.empty([0, 2])
-        for wp in waypoints:
-            wp_list = np.vstack((wp_list, waypoints_coord_dict[wp]))
-        # Calculate total area between each segment and its cloest waypoint
-        total_area = 0
-        trajectory_in_area = np.empty([0, 2])
-        for i in range(len(simplified_trajectory)-1):
-            # If the segment is within the procedure region
-            if (simplified_trajectory[i][0] >= np.min(wp_lat)) & (simplified_trajectory[i][0] <= np.max(wp_lat)) & (simplified_trajectory[i][1] >= np.min(wp_long)) & (simplified_trajectory[i][1] <= np.max(wp_long)):
-                trajectory_in_area = np.vstack(
-                    (trajectory_in_area, simplified_trajectory[i], simplified_trajectory[i+1]))
-                cross_dist = Cal.cal_cross_track_dist(
-                    simplified_trajectory[i][0], simplified_trajectory[i][1], simplified_trajectory[i + 1][0], simplified_trajectory[i + 1][1], wp_list[:, 0], wp_list[:, 1])
-                area = np.abs(Cal.cal_great_circle_dist(
-                    simplified_trajectory[i][0], simplified_trajectory[i][1], simplified_trajectory[i + 1][0], simplified_trajectory[i + 1][1]) * cross_dist / 2.0)
-                total_area += np.min(area)
-
-        area_list.append(total_area)
-        ats_list.append(ats)
-        # print(ats, total_area)
-
-    return ats_list[np.argmin(area_list)], trajectory_in_area
+    if packed is None:
+        packed = pack_procedures(procedure_dict, waypoints_coord_dict)
+    trajectory = np.asarray(simplified_trajectory, dtype=float).reshape(-1, 2)
+    lat_min, long_min, lat_max, long_max = packed['area']
+
+    # Segments starting within the procedure region
+    start, end = trajectory[:-1], trajectory[1:]
+    in_area = (start[:, 0] >= lat_min) & (start[:, 0] <= lat_max) & (start[:, 1] >= long_min) & (start[:, 1] <= long_max)
+    start, end = start[in_area], end[in_area]
+    trajectory_in_area = np.stack((start, end), axis=1).reshape(-1, 2)
+
+    # Candidate procedures
+    candidate = packed['counts'] > 0
+    if margin is not None and len(trajectory_in_area) > 0:
+        bbox = packed['bbox']
+        overlap = candidate & (bbox[:, 0] - margin <= np.max(trajectory_in_area[:, 0])) & (bbox[:, 2] + margin >= np.min(trajectory_in_area[:, 0])) & \
+            (bbox[:, 1] - margin <= np.max(trajectory_in_area[:, 1])) & (bbox[:, 3] + margin >= np.min(trajectory_in_area[:, 1]))
+        if np.any(overlap):
+            candidate = overlap
+
+    # Total area of each procedure over the segments to its closest waypoint
+    total_area = np.full(len(packed['names']), np.inf)
+    counts = packed['counts'][candidate]
+    if len(start) > 0 and np.any(candidate):
+        index = np.concatenate([packed['index'][offset:offset+count] for offset, count in zip(packed['offsets'][candidate], counts)])
+        # Area between each segment and each waypoint of the candidates [segment, waypoint]
+        waypoints, index = np.unique(index, return_inverse=True)
+        coord = packed['coord'][waypoints]
+        cross_dist = Cal.cal_cross_track_dist(start[:, 0, None], start[:, 1, None], end[:, 0, None], end[:, 1, None], coord[None, :, 0], coord[None, :, 1])
+        area = np.abs(Cal.cal_great_circle_dist(start[:, 0], start[:, 1], end[:, 0], end[:, 1])[:, None] * cross_dist / 2.0)
+        total_area[candidate] = np.sum(np.minimum.reduceat(area[:, index], np.cumsum(counts) - counts, axis=1), axis=0)
+    else:
+        total_area[candidate] = 0.0
+
+    return packed['names'][np.argmin(total_area)], trajectory_in_area
 
 
 def get_arrival_data(airport, runway):
@@ -202,7 +398,7 @@ def get_approach_data(airport, runway):
     approach_waypoints = []
     approach_dict = {}
     for approach in approach_procedures:
-        wp = Nav.get_procedure("VHHH", "", approach)[0]
+        wp = Nav.get_procedure(airport, "", approach)[0]
         wp = [ele for ele in wp if ele.strip() and "RW" not in ele]
         approach_waypoints.extend(wp)
         approach_dict[approach] = wp
@@ -213,3 +409,106 @@ def get_approach_data(airport, runway):
         coord = Nav.get_wp_coord(wp, lat, long)
         approach_waypoints_coord_dict[wp] = list(coord)
     return approach_dict, approach_waypoints_coord_dict
+
+
+class ProcedureCatalogue:
+    """
+    Arrival and approach procedures of an airport runway packed for route detection.
+
+    A catalogue is built once per (airport, runway) with get_arrival_data() and get_approach_data(), memoized in memory
+    and persisted in data/cache/procedures/. It is rebuilt when the navigation data of the airport changes.
+    """
+
+    VERSION = 1
+    cache_path = Path(__file__).parent.parent.joinpath('data/cache/procedures')
+    """Folder of the persisted catalogues [Path]"""
+    _catalogues = {}
+
+    def __init__(self, airport, runway):
+        """
+        Build the procedure catalogue of an airport runway from the navigation data.
+
+        Parameters
+        ----------
+        airport : string
+            Airport ICAO code
+        runway : string
+            Runway name
+        """
+        self.airport = airport
+        """Airport ICAO code [string]"""
+        self.runway = runway
+        """Runway name [string]"""
+        self.signature = ProcedureCatalogue.get_signature(airport)
+        """Signature of the navigation data the catalogue is built from"""
+        self.arrivals_dict, self.arrival_waypoints_coord_dict = get_arrival_data(airport, runway)
+        """Arrival procedures and the coordinate of their waypoints [dict, dict]"""
+        self.approach_dict, self.approach_waypoints_coord_dict = get_approach_data(airport, runway)
+        """Approach procedures and the coordinate of their waypoints [dict, dict]"""
+        self.arrivals = pack_procedures(self.arrivals_dict, self.arrival_waypoints_coord_dict)
+        """Arrival procedures packed for detect_sid_star() [dict]"""
+        self.approaches = pack_procedures(self.approach_dict, self.approach_waypoints_coord_dict)
+        """Approach procedures packed for detect_sid_star() [dict]"""
+
+    @staticmethod
+    def get_signature(airport):
+        """
+        Get the signature of the navigation data used by the catalogue of an airport.
+
+        Parameters
+        ----------
+        airport : string
+            Airport ICAO code
+
+        Returns
+        -------
+        []
+            Catalogue version and name, modification time and size of the navigation data files
+        """
+        path = Path(__file__).parent.parent.joinpath('data/navigation/xplane')
+        signature = [ProcedureCatalogue.VERSION]
+        for file in (path.joinpath('CIFP', airport+'.dat'), path.joinpath('earth_fix.dat'), path.joinpath('earth_nav.dat')):
+            signature.append([file.name, file.stat().st_mtime_ns, file.stat().st_size] if file.is_file() else [file.name])
+        return signature
+
+    @staticmethod
+    def get(airport, runway):
+        """
+        Get the procedure catalogue of an airport runway, from memory or disk if available.
+
+        Parameters
+        ----------
+        airport : string
+            Airport ICAO code
+        runway : string
+            Runway name
+
+        Returns
+        -------
+        ProcedureCatalogue
+            Procedure catalogue of the airport runway
+        """
+        key = (airport, runway)
+        signature = ProcedureCatalogue.get_signature(airport)
+        catalogue = ProcedureCatalogue._catalogues.get(key)
+        if catalogue is not None and catalogue.signature == signature:
+            return catalogue
+
+        cache_file = ProcedureCatalogue.cache_path.joinpath(airport+'-'+runway+'.pkl')
+        if cache_file.is_file():
+            try:
+                with open(cache_file, 'rb') as f:
+                    catalogue = pickle.load(f)
+            except Exception:
+                catalogue = None
+
+        if catalogue is None or catalogue.signature != signature:
+            catalogue = ProcedureCatalogue(airport, runway)
+            ProcedureCatalogue.cache_path.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(catalogue, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_file.replace(cache_file)
+
+        ProcedureCatalogue._catalogues[key] = catalogue
+        return catalogue
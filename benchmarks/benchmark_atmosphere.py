@@ -0,0 +1,94 @@
+"""
+Benchmark of the ISA atmosphere backends of the performance model.
+
+The benchmark compares the closed-form formulas (atmosphere_mode FORMULA) with the interpolated pressure table
+(atmosphere_mode TABLE) on the temperature, pressure and density calculation of Weather.update for random traffic of
+increasing size, and reports the maximum relative error of the table over the altitude range with temperature
+differentials.
+
+Usage::
+
+    python benchmarks/benchmark_atmosphere.py                          # Run with the default sizes
+    python benchmarks/benchmark_atmosphere.py --sizes 100 10000        # Run a subset
+"""
+import sys
+import json
+import timeit
+import argparse
+from pathlib import Path
+import numpy as np
+
+from airtrafficsim.core.performance.performance import Performance
+
+BENCHMARK_PATH = Path(__file__).parent.resolve()
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+
+def update_atmosphere(perf, H_p, d_T):
+    """
+    Calculate temperature, pressure and density like Weather.update.
+    """
+    T = perf.cal_temperature(H_p, d_T)
+    p = perf.cal_air_pressure(H_p, T, d_T)
+    return T, p, perf.cal_air_density(p, T)
+
+
+def benchmark_accuracy(formula, table):
+    """
+    Measure the maximum relative error of the table backend.
+
+    Returns
+    -------
+    {}
+        Maximum relative error of temperature, pressure and density
+    """
+    H_p = np.linspace(-1000.0, 25000.0, 1000001)
+    error = {'T': 0.0, 'p': 0.0, 'rho': 0.0}
+    for d_T in (0.0, -20.0, 20.0):
+        for name, exact, approx in zip(error, update_atmosphere(formula, H_p, d_T), update_atmosphere(table, H_p, d_T)):
+            error[name] = max(error[name], float(np.max(np.abs(approx / exact - 1.0))))
+    return error
+
+
+def benchmark_size(formula, table, n, repeat, seed):
+    """
+    Measure the time of both backends with n aircraft.
+
+    Returns
+    -------
+    {}
+        Time per call of each backend [ms] and the speed up of the table
+    """
+    rng = np.random.default_rng(seed)
+    H_p = rng.uniform(0.0, 13000.0, n)
+    d_T = rng.uniform(-10.0, 10.0, n)
+    number = max(1, 100000 // n)
+    result = {}
+    for name, perf in (('formula', formula), ('table', table)):
+        result[name] = min(timeit.repeat(lambda: update_atmosphere(perf, H_p, d_T), number=number, repeat=repeat)) / number * 1000.0
+    result['speed_up'] = result['formula'] / result['table']
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ISA atmosphere backends of the performance model")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Number of aircraft of each benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of repetitions, the fastest is reported")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the altitudes and temperature differentials")
+    parser.add_argument("--output", type=Path, default=BENCHMARK_PATH.joinpath('results_atmosphere.json'), help="Output JSON file")
+    args = parser.parse_args(argv)
+
+    formula, table = Performance("OpenAP"), Performance("OpenAP", atmosphere_mode="TABLE")
+    results = {'accuracy': benchmark_accuracy(formula, table), 'sizes': {}}
+    print("Maximum relative error of the table", results['accuracy'])
+    for n in args.sizes:
+        size = results['sizes'][str(n)] = benchmark_size(formula, table, n, args.repeat, args.seed)
+        print(f"{n:>6} aircraft - formula {size['formula']:.4f} ms, table {size['table']:.4f} ms, speed up {size['speed_up']:.2f}x")
+
+    args.output.write_text(json.dumps(results, indent=2))
+    print("Results written to", args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""
+Benchmark suite of the simulation core with synthetic traffic.
+
+The benchmark generates synthetic traffic of increasing size with mixed aircraft types, flight phases and flight plans
+and measures the per-step latency of Traffic.update (with the profiler breakdown of each stage), the throughput of
+adding and deleting aircraft, navigation data lookups, logging to file, emission to the client, and peak memory.
+
+The results are written to JSON and compared against a stored baseline to catch regressions in the hot path. Latency and
+throughput are compared with --tolerance, peak memory and emitted bytes per step with --memory-tolerance. The exit code
+is 1 when a metric regressed and 2 when there is no baseline to compare with.
+
+Usage::
+
+    python benchmarks/benchmark_core.py                                 # Run and compare with benchmarks/baseline.json
+    python benchmarks/benchmark_core.py --sizes 10 100 1000 --steps 20  # Run a quick subset
+    python benchmarks/benchmark_core.py --save-baseline                 # Store the results as the new baseline
+"""
+import io
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from datetime import datetime, timezone
+from contextlib import redirect_stdout
+import numpy as np
+
+from airtrafficsim.core.environment import Environment
+from airtrafficsim.core.aircraft import Aircraft
+from airtrafficsim.core.navigation import Nav
+from airtrafficsim.utils.enums import Config, FlightPhase
+
+BENCHMARK_PATH = Path(__file__).parent.resolve()
+DEFAULT_SIZES = [10, 100, 1000, 10000, 50000]
+AIRCRAFT_TYPES = ["A320", "A20N", "B738", "A333", "B744"]
+WAYPOINTS = ["RASSE", "CONGA", "ENVAR", "DADON", "EXTRA", "RENOT"]
+LATENCY_METRICS = ['update', 'step', 'save', 'send_to_client']
+"""Latency metrics, where a larger value is a regression"""
+MEMORY_METRICS = ['peak_memory', 'send_bytes']
+"""Memory and payload size metrics, where a larger value is a regression (all other metrics are throughputs)"""
+
+
+class SyntheticEnv(Environment):
+    """
+    Environment with a synthetic mix of departures, en-route flights with flight plans, arrivals with STAR and
+    approach procedures, and free cruising aircraft.
+    """
+
+    def __init__(self, n, seed=0):
+        super().__init__(file_name='Benchmark',
+                         start_time=datetime.fromisoformat('2022-03-22T00:00:00+00:00'),
+                         end_time=3600,
+                         weather_mode="",
+                         performance_mode="BADA",
+                         profile=True
+                         )
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.add_synthetic(n)
+
+    def add_synthetic(self, n):
+        """
+        Add n synthetic aircraft.
+
+        Returns
+        -------
+        Aircraft[]
+            The added aircraft
+        """
+        aircraft = []
+        for _ in range(n):
+            kind = self.count % 10
+            call_sign = f"SYN{self.count:05d}"
+            aircraft_type = AIRCRAFT_TYPES[self.count % len(AIRCRAFT_TYPES)]
+            self.count += 1
+            if kind == 0:
+                # Departure
+                lat, long, alt = Nav.get_runway_coord("VHHH", "25L")
+                aircraft.append(Aircraft(self.traffic, callsign=call_sign, aircraft_type=aircraft_type, flight_phase=FlightPhase.TAKEOFF, configuration=Config.TAKEOFF,
+                                         lat=lat, long=long, alt=alt, heading=254.0, cas=149.0, fuel_weight=5273.0, payload_weight=12000.0,
+                                         departure_airport="VHHH", departure_runway="RW25L", sid="OCEA2B",
+                                         arrival_airport="RCTP", arrival_runway="RW05R", star="TONG1A", approach="I05R",
+                                         flight_plan=WAYPOINTS, cruise_alt=37000))
+            elif kind == 1:
+                # Arrival
+                aircraft.append(Aircraft(self.traffic, callsign=call_sign, aircraft_type=aircraft_type, flight_phase=FlightPhase.CRUISE, configuration=Config.CLEAN,
+                                         lat=22.0 + self.rng.uniform(-0.2, 0.2), long=113.5 + self.rng.uniform(-0.2, 0.2), alt=20000.0, heading=175.0, cas=250.0,
+                                         fuel_weight=10000.0, payload_weight=12000.0,
+                                         arrival_airport="VHHH", arrival_runway="RW07R", star="SIER7A", approach="I07R", cruise_alt=37000))
+            elif kind <= 4:
+                # En-route with flight plan
+                start = int(self.rng.integers(0, len(WAYPOINTS) - 1))
+                aircraft.append(Aircraft(self.traffic, callsign=call_sign, aircraft_type=aircraft_type, flight_phase=FlightPhase.CRUISE, configuration=Config.CLEAN,
+                                         lat=self.rng.uniform(20.0, 24.0), long=self.rng.uniform(112.0, 118.0), alt=float(self.rng.choice([29000.0, 33000.0, 37000.0])),
+                                         heading=self.rng.uniform(0.0, 360.0), cas=280.0, fuel_weight=10000.0, payload_weight=12000.0,
+                                         flight_plan=WAYPOINTS[start:], cruise_alt=37000))
+            else:
+                # Free cruise, climb and descent under heading and altitude commands
+                alt = self.rng.uniform(5000.0, 39000.0)
+                ac = Aircraft(self.traffic, callsign=call_sign, aircraft_type=aircraft_type, flight_phase=FlightPhase.CRUISE, configuration=Config.CLEAN,
+                              lat=self.rng.uniform(15.0, 30.0), long=self.rng.uniform(105.0, 125.0), alt=alt,
+                              heading=self.rng.uniform(0.0, 360.0), cas=self.rng.uniform(220.0, 300.0), fuel_weight=10000.0, payload_weight=12000.0,
+                              cruise_alt=37000)
+                ac.set_alt(float(np.clip(alt + self.rng.choice([-4000.0, 0.0, 4000.0]), 3000.0, 39000.0)))
+                aircraft.append(ac)
+        return aircraft
+
+
+class DummySocketio:
+    """
+    Socketio stand-in that serializes the emitted payload like the server would, without a network.
+    """
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    def emit(self, event, data, **kwargs):
+        self.bytes_sent += len(json.dumps(data, default=str))
+
+    def sleep(self, seconds=0):
+        pass
+
+
+def latency(samples):
+    """
+    Summarize latency samples [s] in [ms].
+    """
+    samples = np.array(samples) * 1000.0
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {'mean': float(np.mean(samples)), 'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'max': float(np.max(samples))}
+
+
+def benchmark_size(n, steps, churn, seed):
+    """
+    Benchmark the simulation core with n synthetic aircraft.
+
+    Parameters
+    ----------
+    n : int
+        Number of aircraft
+    steps : int
+        Number of timesteps to measure
+    churn : int
+        Number of aircraft to add and delete for the throughput measurement
+    seed : int
+        Random seed of the synthetic traffic
+
+    Returns
+    -------
+    {}
+        Results of this traffic size
+    """
+    result = {}
+
+    # Build the traffic and measure the peak memory
+    tracemalloc.start()
+    start = time.perf_counter()
+    env = SyntheticEnv(n, seed)
+    result['build'] = time.perf_counter() - start
+    result['peak_memory'] = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+    # Traffic.update and full step with profiler breakdown
+    env.profiler.reset()
+    update = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        env.traffic.update(env.global_time)
+        update.append(time.perf_counter() - start)
+        env.global_time += 1
+    result['update'] = latency(update)
+    result['stages'] = env.profiler.summary()
+
+    env.profiler.reset()
+    for _ in range(steps):
+        env.step()
+    result['step'] = env.profiler.summary()['step']
+
+    # Logging
+    save = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        env.save()
+        save.append(time.perf_counter() - start)
+    result['save'] = latency(save)
+
+    # Emission
+    socketio = DummySocketio()
+    send = []
+    for _ in range(steps):
+        start = time.perf_counter()
+        env.send_to_client(socketio)
+        send.append(time.perf_counter() - start)
+    result['send_to_client'] = latency(send)
+    result['send_bytes'] = socketio.bytes_sent / steps
+
+    # Add and delete throughput at this traffic size
+    start = time.perf_counter()
+    added = env.add_synthetic(churn)
+    result['add_rate'] = churn / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for ac in added:
+        env.traffic.del_aircraft(ac.index)
+    result['delete_rate'] = churn / (time.perf_counter() - start)
+
+    env.sim_file.close()
+    return result
+
+
+def benchmark_nav(repeat):
+    """
+    Benchmark the navigation data lookups used when adding aircraft and setting flight plans.
+
+    Returns
+    -------
+    {}
+        Lookup rates [1/s]
+    """
+    result = {}
+    lookups = {
+        'get_wp_coord': lambda: [Nav.get_wp_coord(name, 22.3, 113.9) for name in WAYPOINTS],
+        'get_runway_coord': lambda: [Nav.get_runway_coord("VHHH", "25L") for _ in WAYPOINTS],
+        'find_closest_airport_runway': lambda: [Nav.find_closest_airport_runway(22.3, 113.9) for _ in WAYPOINTS],
+        'get_procedure': lambda: [Nav.get_procedure("VHHH", "RW07R", "SIER7A") for _ in WAYPOINTS],
+    }
+    for name, lookup in lookups.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            lookup()
+        result[name + '_rate'] = repeat * len(WAYPOINTS) / (time.perf_counter() - start)
+    return result
+
+
+def flatten(results, prefix=''):
+    """
+    Flatten the nested results to {'size.metric.stat': value}.
+    """
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + str(key) + '.'))
+        else:
+            flat[prefix + str(key)] = value
+    return flat
+
+
+def compare(results, baseline, tolerance, memory_tolerance):
+    """
+    Compare the results with a baseline.
+
+    Parameters
+    ----------
+    results : {}
+        Results of this run
+    baseline : {}
+        Results of the baseline run
+    tolerance : float
+        Allowed relative slow down before a metric is a regression
+    memory_tolerance : float
+        Allowed relative increase of memory and emitted bytes before a metric is a regression
+
+    Returns
+    -------
+    [(str, float, float, float)]
+        Metric, baseline value, current value, and ratio of every regression
+    """
+    current = flatten(results)
+    regressions = []
+    for metric, base in flatten(baseline).items():
+        if metric not in current or not base or metric.endswith('.count') or '.stages.' in metric:
+            continue
+        name = metric.split('.')
+        if name[-1] in MEMORY_METRICS:
+            ratio, allowed = current[metric] / base, memory_tolerance
+        elif any(part in LATENCY_METRICS for part in name) and name[-1] in ('mean', 'p50'):
+            ratio, allowed = current[metric] / base, tolerance
+        elif name[-1].endswith('_rate'):
+            ratio, allowed = base / current[metric], tolerance
+        else:
+            continue
+        if ratio > 1.0 + allowed:
+            regressions.append((metric, base, current[metric], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the AirTrafficSim simulation core with synthetic traffic")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Number of aircraft of each benchmark")
+    parser.add_argument("--steps", type=int, default=50, help="Number of timesteps measured for each size")
+    parser.add_argument("--churn", type=int, default=100, help="Number of aircraft added and deleted for the throughput measurement")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic traffic")
+    parser.add_argument("--output", type=Path, default=BENCHMARK_PATH.joinpath('results.json'), help="Output JSON file")
+    parser.add_argument("--baseline", type=Path, default=BENCHMARK_PATH.joinpath('baseline.json'), help="Baseline JSON file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slow down before a metric is a regression")
+    parser.add_argument("--memory-tolerance", type=float, default=0.1, help="Allowed relative increase of memory and emitted bytes before a metric is a regression")
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'steps': args.steps,
+            'churn': args.churn,
+        },
+        'nav': {},
+        'sizes': {},
+    }
+
+    with tempfile.TemporaryDirectory() as result_path:
+        Environment.result_path = Path(result_path)
+        log = io.StringIO()
+        with redirect_stdout(log):
+            results['nav'] = benchmark_nav(repeat=10)
+        print("Navigation lookups", results['nav'])
+        for n in args.sizes:
+            with redirect_stdout(log):
+                results['sizes'][str(n)] = benchmark_size(n, args.steps, args.churn, args.seed)
+            log.seek(0)
+            log.truncate()
+            size = results['sizes'][str(n)]
+            print(f"{n:>6} aircraft - update {size['update']['mean']:.3f} ms, step {size['step']['mean']:.3f} ms, save {size['save']['mean']:.3f} ms, "
+                  f"send {size['send_to_client']['mean']:.3f} ms, add {size['add_rate']:.1f}/s, delete {size['delete_rate']:.1f}/s, "
+                  f"peak memory {size['peak_memory']:.1f} MB")
+
+    args.output.write_text(json.dumps(results, indent=2))
+    print("Results written to", args.output)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print("Baseline written to", args.baseline)
+        return 0
+
+    if not args.baseline.is_file():
+        print("No baseline found at", args.baseline, "- run with --save-baseline to create one")
+        return 2
+
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare({k: results[k] for k in ('nav', 'sizes')}, {k: baseline[k] for k in ('nav', 'sizes')}, args.tolerance, args.memory_tolerance)
+    for metric, base, current, ratio in regressions:
+        print(f"REGRESSION {metric}: {base:.3f} -> {current:.3f} ({ratio:.2f}x)")
+    if not regressions:
+        print("No regression against", args.baseline)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
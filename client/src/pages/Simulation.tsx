@@ -78,6 +78,7 @@ const Simulation: React.FC = () => {
     const [replayFile, setReplayFile] = useState('')
     const [simulationList, setSimulationList] = useState<any>();
     const [simulationFile, setSimulationFile] = useState('')
+    const [sessionId, setSessionId] = useState('')
     const [isLoading, setIsLoading] = useState(false);
     const [showReplayModal, setShowReplayModal] = useState(false);
     const [showSimulationModal, setShowSimulationModal] = useState(false);
@@ -129,6 +130,11 @@ const Simulation: React.FC = () => {
             }
         })
 
+        socket.on("sessionEnded", (msg) => {
+            setSessionId('');
+            setProgressBar(0);
+        })
+
         socket.on("simulationEnvironment", (msg) => {
             setGraphHeader(msg.header);
             setSimulationFile(msg.file);
@@ -186,10 +192,16 @@ const Simulation: React.FC = () => {
 
     function runSimulation(file :string){
         setGraphType('None')
-        socket.emit("runSimulation", file);
+        socket.emit("runSimulation", file, (res :any) => {
+            setSessionId(res ? res : '')
+        });
     }
 
     function clearData(){
+        if (sessionId) {
+            socket.emit("leaveSession");
+            setSessionId('');
+        }
         replayDataSource.entities.removeAll();
         simulationDataSource.entities.removeAll();
     }
@@ -0,0 +1,15 @@
+import numpy as np
+
+from airtrafficsim.core.performance.performance import Performance
+
+
+def test_atmosphere_table():
+    formula, table = Performance("OpenAP"), Performance("OpenAP", atmosphere_mode="TABLE")
+    H_p = np.concatenate((np.linspace(-1500.0, 26000.0, 100001), [0.0, 11000.0, 25000.0]))
+    for d_T in (0.0, -15.0, np.linspace(-20.0, 20.0, len(H_p))):
+        T = formula.cal_temperature(H_p, d_T)
+        assert np.array_equal(table.cal_temperature(H_p, d_T), T)
+        p, p_table = formula.cal_air_pressure(H_p, T, d_T), table.cal_air_pressure(H_p, T, d_T)
+        assert np.max(np.abs(p_table / p - 1.0)) < 4e-7
+        rho, rho_table = formula.cal_air_density(p, T), table.cal_air_density(p_table, T)
+        assert np.max(np.abs(rho_table / rho - 1.0)) < 4e-7
@@ -0,0 +1,27 @@
+import pytest
+
+from airtrafficsim.core.batch import expand_runs, run_batch
+from airtrafficsim.core.environment import UnknownParameterError
+
+
+def test_expand_runs():
+    runs = expand_runs({'end_time': [10, 20], 'paused': [False]}, [1, 2])
+    assert runs == [({'end_time': 10, 'paused': False}, 1), ({'end_time': 10, 'paused': False}, 2),
+                    ({'end_time': 20, 'paused': False}, 1), ({'end_time': 20, 'paused': False}, 2)]
+    assert expand_runs() == [({}, None)]
+
+
+def test_run_batch(tmp_path):
+    df = run_batch('DemoEnv', {'end_time': [5, 10]}, workers=2, output_path=tmp_path.joinpath('batch'))
+    assert df['end_time'].tolist() == [5, 10] and df['sim_time'].tolist() == [6, 11]
+    assert 'error' not in df.columns and tmp_path.joinpath('batch', 'summary.csv').is_file()
+
+
+def test_run_batch_unknown_parameter(tmp_path):
+    with pytest.raises(UnknownParameterError, match="no parameter 'unknown'"):
+        run_batch('DemoEnv', {'unknown': [1]}, workers=1, output_path=tmp_path.joinpath('batch'))
+
+
+def test_run_batch_failing_run(tmp_path):
+    df = run_batch('DemoEnv', {'end_time': [5, 'never']}, workers=2, output_path=tmp_path.joinpath('batch'))
+    assert df['sim_time'].tolist()[0] == 6 and 'TypeError' in df['error'].tolist()[1]
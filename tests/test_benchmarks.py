@@ -0,0 +1,21 @@
+import sys
+import json
+from pathlib import Path
+from importlib import import_module
+
+sys.path.insert(0, str(Path(__file__).parent.parent.joinpath('benchmarks')))
+benchmark_core = import_module('benchmark_core')
+
+def test_benchmark_core(tmp_path):
+    output, baseline = tmp_path.joinpath('results.json'), tmp_path.joinpath('baseline.json')
+    args = ['--sizes', '10', '--steps', '2', '--churn', '2', '--output', str(output), '--baseline', str(baseline)]
+    assert benchmark_core.main(args) == 2
+    assert benchmark_core.main(args + ['--save-baseline']) == 0
+    results = json.loads(output.read_text())['sizes']['10']
+    assert results['update']['mean'] > 0 and results['peak_memory'] > 0 and results['send_bytes'] > 0
+
+def test_benchmark_compare():
+    baseline = {'sizes': {'10': {'update': {'mean': 1.0}, 'add_rate': 100.0, 'peak_memory': 10.0, 'send_bytes': 1000.0}}}
+    results = {'sizes': {'10': {'update': {'mean': 1.1}, 'add_rate': 90.0, 'peak_memory': 12.0, 'send_bytes': 1000.0}}}
+    regressions = benchmark_core.compare(results, baseline, tolerance=0.2, memory_tolerance=0.1)
+    assert [metric for metric, _, _, _ in regressions] == ['sizes.10.peak_memory']
@@ -1,38 +1,231 @@
+import multiprocessing
 import pytest
 import pandas as pd
+import numpy as np
 from importlib import import_module
 
 def test_demoenv():
     Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
     env = Env()
     env.run()
-    df = pd.read_csv(env.file_path)
+    df = pd.read_csv(env.sim_file_path, keep_default_na=False, na_values=['nan'])
     assert df.shape[0] > 1 and df.isnull().values.any() == False
 
 def test_openapdemo():
     Env = getattr(import_module('airtrafficsim.data.environment.OpenApDemo', '...'), "OpenApDemo")
     env = Env()
     env.run()
-    df = pd.read_csv(env.file_path)
+    df = pd.read_csv(env.sim_file_path, keep_default_na=False, na_values=['nan'])
     assert df.shape[0] > 1 and df.isnull().values.any() == False
 
 def test_fullflightdemo():
     Env = getattr(import_module('airtrafficsim.data.environment.FullFlightDemo', '...'), "FullFlightDemo")
     env = Env()
     env.run()
-    df = pd.read_csv(env.file_path)
+    df = pd.read_csv(env.sim_file_path, keep_default_na=False, na_values=['nan'])
     assert df.shape[0] > 1 and df.isnull().values.any() == False
 
 def test_weatherdemo():
     Env = getattr(import_module('airtrafficsim.data.environment.WeatherDemo', '...'), "WeatherDemo")
     env = Env()
     env.run()
-    df = pd.read_csv(env.file_path)
+    df = pd.read_csv(env.sim_file_path, keep_default_na=False, na_values=['nan'])
     assert df.shape[0] > 1 and df.isnull().values.any() == False
 
 def test_converthistoricdemo():
     Env = getattr(import_module('airtrafficsim.data.environment.ConvertHistoricDemo', '...'), "ConvertHistoricDemo")
     env = Env()
     env.run()
-    df = pd.read_csv(env.file_path)
-    assert df.shape[0] > 1 and df.isnull().values.any() == False
\ No newline at end of file
+    df = pd.read_csv(env.sim_file_path, keep_default_na=False, na_values=['nan'])
+    assert df.shape[0] > 1 and df.isnull().values.any() == False
+
+def test_export_to_csv():
+    Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+    env = Env()
+    env.run()
+    env.export_to_csv(chunksize=100)
+    df = pd.read_csv(env.sim_file_path, keep_default_na=False, na_values=['nan'])
+    for id in df['id'].unique():
+        assert pd.read_csv(env.folder_path.joinpath(str(id)+'.csv')).shape[0] == (df['id'] == id).sum()
+
+
+def test_export_to_parquet():
+    pytest.importorskip('pyarrow')
+    Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+    env = Env()
+    env.run()
+    env.export_to_csv(chunksize=100, file_format='parquet')
+    df = pd.read_csv(env.sim_file_path, keep_default_na=False, na_values=['nan'])
+    for id in df['id'].unique():
+        flight = pd.read_parquet(env.folder_path.joinpath(str(id)+'.parquet'))
+        assert flight.shape[0] == (df['id'] == id).sum() and list(flight.columns) == env.sim_header
+        assert (flight['alt'].to_numpy() == df.loc[df['id'] == id, 'alt'].to_numpy()).all()
+
+
+def test_snapshot_restore():
+    Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+    env = Env()
+    for _ in range(200):
+        env.step()
+    path = env.snapshot()
+    restored = Env.restore(path, create_log_file=False)
+    for _ in range(100):
+        env.step()
+        restored.step()
+    assert restored.global_time == env.global_time
+    assert (restored.traffic.lat == env.traffic.lat).all() and (restored.traffic.alt == env.traffic.alt).all()
+
+
+def test_fork():
+    Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+    env = Env()
+    for _ in range(100):
+        env.step()
+    lat = env.traffic.lat.copy()
+    result = env.fork([None, lambda branch: branch.aircraft_fol.set_heading(90)], 50,
+                      metrics=lambda branch: {'global_time': branch.global_time, 'lat': branch.traffic.lat.tolist()})
+    assert len(result) == 2 and result[0]['global_time'] == 150 and result[0]['lat'] != result[1]['lat']
+    assert env.global_time == 100 and (env.traffic.lat == lat).all()
+
+
+def test_fork_unpicklable_without_fork(monkeypatch):
+    Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+    env = Env()
+    monkeypatch.setattr(multiprocessing, 'get_all_start_methods', lambda: ['spawn'])
+    with pytest.raises(ValueError, match="picklable branches"):
+        env.fork([lambda branch: branch.aircraft_fol.set_heading(90)], 10)
+
+
+def test_telemetry_delta():
+    class SocketIO:
+        def __init__(self):
+            self.packets = []
+        def emit(self, event, data, **kwargs):
+            self.packets.append((event, data, kwargs))
+
+    Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+    env = Env()
+    env.telemetry.connected = {'client'}
+    env.telemetry.subscribe('client', 'delta')
+    socketio = SocketIO()
+    for _ in range(3):
+        env.step()
+        env.send_to_client(socketio)
+    assert [event for event, _, _ in socketio.packets] == ['simulationDelta'] * 3
+    first, second = socketio.packets[0][1], socketio.packets[1][1]
+    assert first['keyframe'] and len(first['static']) == len(env.traffic.index)
+    assert not second['keyframe'] and second['static'] == {}
+    assert all('aircraftType' not in aircraft for aircraft in second['aircraft'].values())
+
+    # Control type changes are sent as static fields, keyframes resend all static fields
+    env.traffic.control_type[0] = 'pseudo'
+    env.send_to_client(socketio)
+    assert list(socketio.packets[-1][1]['static'].values())[0]['controlType'] == 'pseudo' and len(socketio.packets[-1][1]['static']) == 1
+    env.telemetry.clients['client'].packets = 20
+    env.send_to_client(socketio)
+    assert socketio.packets[-1][1]['keyframe'] and len(socketio.packets[-1][1]['static']) == len(env.traffic.index)
+
+
+def test_telemetry_binary_frame():
+    from airtrafficsim.core.telemetry import Telemetry
+
+    Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+    env = Env()
+    for _ in range(10):
+        env.step()
+    frame = Telemetry.decode_frame(Telemetry.encode_frame(env))
+    assert frame['global_time'] == env.global_time - 1 and len(frame['id']) == len(env.traffic.index)
+    assert np.allclose(frame['lat'], env.traffic.lat, atol=1e-4) and np.allclose(frame['alt'], env.traffic.alt, atol=1e-2)
+
+
+def test_spawn_and_retire_aircraft():
+    from airtrafficsim.utils.enums import Config, FlightPhase
+
+    Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+    env = Env()
+    for i, spawn_time in enumerate([5, 3, 3]):
+        env.schedule_aircraft(spawn_time, callsign="SPAWN"+str(i), aircraft_type="A20N", flight_phase=FlightPhase.CRUISE, configuration=Config.CLEAN,
+                              lat=21.9, long=113.5+0.1*i, alt=20000.0, heading=175.0, cas=280.0, fuel_weight=10000.0, payload_weight=12000.0, cruise_alt=37000)
+    for _ in range(4):
+        env.step()
+    assert list(env.traffic.call_sign[-2:]) == ["SPAWN1", "SPAWN2"] and len(env.spawn_queue) == 1
+    for _ in range(2):
+        env.step()
+    assert env.traffic.call_sign[-1] == "SPAWN0" and len(env.spawn_queue) == 0
+
+    env.retire_aircraft([env.aircraft["SPAWN1"].index, env.aircraft_head.index])
+    assert len(env.traffic.index) == 5
+    env.step()
+    assert list(env.traffic.call_sign) == ["FOLLOW", "SPAWN2", "SPAWN0"] and "SPAWN1" not in env.aircraft
+    assert len(env.traffic.ap.flight_plan_name) == 3 and len(env.traffic.frequency) == 3
+
+
+def test_schedule_command():
+    from airtrafficsim.utils.enums import APLateralMode, APThrottleMode
+
+    Env = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+    env = Env()
+    env.schedule_command(5, "FOLLOW", "set_heading", 90.0)
+    env.schedule_command(5, env.aircraft_head, "set_heading", 100.0)
+    env.schedule_command(5, "UNKNOWN", "set_heading", 110.0)
+    env.schedule_command(lambda env: env.global_time >= 7, env.aircraft_head, "set_speed", 200.0)
+    for _ in range(5):
+        env.step()
+    assert len(env.command_schedule) == 3 and env.traffic.ap.lateral_mode[0] == APLateralMode.LNAV
+    env.step()
+    assert env.traffic.ap.heading[0] == 100.0 and env.traffic.ap.heading[1] == 90.0
+    assert env.traffic.ap.lateral_mode[0] == APLateralMode.HEADING and len(env.command_schedule) == 0
+    for _ in range(2):
+        env.step()
+    assert env.traffic.ap.cas[0] == 200.0 and env.traffic.ap.auto_throttle_mode[0] == APThrottleMode.SPEED
+    assert len(env.conditional_commands) == 0
+
+
+def test_record_and_replay_init():
+    Env = getattr(import_module('airtrafficsim.data.environment.StudyFullFlight', '...'), "StudyFullFlight")
+    env = Env()
+    env.queue_command(None, "init", {'name': 'StudyFullFlight',
+                                     'aircraft': [{'callsign': 'HMT 110', 'aircraft_type': 'A320', 'departure_airport': 'KPDX', 'departure_runway': 'RW28L',
+                                                   'arrival_airport': 'KSLE', 'arrival_runway': 'RW13', 'approach': 'R13', 'flight_plan': ['YIBPU', 'UBG'],
+                                                   'starting_leg': 0, 'starting_alt': 8000, 'cruise_alt': 10000}]})
+    for _ in range(20):
+        env.step()
+    env.cmd_file.close()
+
+    replayed = Env()
+    replayed.replay(env.folder_path, duration=19)
+    assert replayed.global_time == env.global_time and list(replayed.traffic.call_sign) == ['HMT 110']
+    assert np.allclose(replayed.traffic.lat, env.traffic.lat) and np.allclose(replayed.traffic.long, env.traffic.long)
+    assert np.allclose(replayed.traffic.alt, env.traffic.alt)
+
+
+def test_failing_command():
+    class SocketIO:
+        def __init__(self):
+            self.packets = []
+        def emit(self, event, data, **kwargs):
+            self.packets.append((event, data, kwargs))
+
+    Env = getattr(import_module('airtrafficsim.data.environment.StudyFullFlight', '...'), "StudyFullFlight")
+    env = Env()
+    failed = env.queue_command("UNKNOWN", "heading", 90.0, sid='client')
+    paused = env.queue_command(None, "paused", True, sid='client')
+    socketio = SocketIO()
+    env.step(socketio)
+    assert socketio.packets[0][0] == 'commandResult' and 'KeyError' in socketio.packets[0][1]['error'] and socketio.packets[0][2]['to'] == 'client'
+    assert 'KeyError' in failed['error'] and paused == {'result': True} and env.is_paused()
+
+    # Catch-up timesteps skip the telemetry but still report command errors
+    socketio.packets.clear()
+    env.queue_command("UNKNOWN", "heading", 90.0, sid='client')
+    env.step(socketio, catch_up=True)
+    assert [packet[0] for packet in socketio.packets] == ['commandResult']
+
+
+def test_snapshot_command():
+    Env = getattr(import_module('airtrafficsim.data.environment.StudyFullFlight', '...'), "StudyFullFlight")
+    env = Env()
+    env.queue_command(None, "init", {'name': 'StudyFullFlight'})
+    response = env.queue_command(None, "snapshot")
+    env.step()
+    assert Env.restore(response['result'], create_log_file=False).global_time == env.global_time - 1
@@ -0,0 +1,40 @@
+import pandas as pd
+from airtrafficsim.utils.flight_store import FlightStore
+from airtrafficsim.utils import historic_conversion
+from airtrafficsim.utils.route_detection import pack_procedures
+
+def test_flight_store_query(tmp_path, monkeypatch):
+    monkeypatch.setattr(FlightStore, 'data_path', tmp_path.joinpath('flight_data'))
+    monkeypatch.setattr(FlightStore, 'store_path', tmp_path.joinpath('store'))
+    day = tmp_path.joinpath('flight_data', '2018-05-01')
+    day.mkdir(parents=True)
+    # FR24
+    pd.DataFrame({'timestamp': [120, 0, 60], 'lat': [22.2, 22.0, 22.1], 'long': [114.2, 114.0, 114.1], 'alt': [3000, 5000, 4000],
+                  'gspeed': [180, 220, 200], 'hangle': [90, 90, 90], 'Aircraft_model': 'A320'}).to_csv(day.joinpath('AAA1.csv'), index=False)
+    # OpenSky
+    pd.DataFrame({'timestamp': ['1970-01-01T00:05:00', '1970-01-01T00:06:00'], 'latitude': [10.0, 10.5], 'longitude': [100.0, 100.5],
+                  'altitude': [35000, 35000], 'groundspeed': [450, 450]}).to_csv(day.joinpath('BBB2.csv'), index=False)
+
+    store = FlightStore('2018-05-01')
+    assert list(store.flights['flight']) == ['AAA1', 'BBB2']
+    assert list(store.get_flight('AAA1')['time']) == [0, 60, 120]
+    assert list(store.get_flight('AAA1', ['alt'], 30, 120)['alt']) == [4000, 3000]
+    assert list(store.query(0, 200)['flight']) == ['AAA1']
+    assert list(store.query(bbox=[9, 99, 11, 101])['flight']) == ['BBB2']
+    assert list(store.query(90, 400, [21.95, 113.95, 22.05, 114.05])['flight']) == []
+
+def test_convert_historic(tmp_path, monkeypatch):
+    monkeypatch.setattr(FlightStore, 'data_path', tmp_path.joinpath('flight_data'))
+    monkeypatch.setattr(FlightStore, 'store_path', tmp_path.joinpath('store'))
+    monkeypatch.setattr(historic_conversion, 'cache_path', tmp_path.joinpath('cache'))
+    day = tmp_path.joinpath('flight_data', '2018-05-01')
+    day.mkdir(parents=True)
+    for name, lat in (('AAA1', 22.0), ('BBB2', 10.0), ('CCC3', 22.5)):
+        pd.DataFrame({'timestamp': [0, 60], 'lat': [lat, lat + 0.1], 'long': [114.0, 114.1], 'alt': [5000, 4000],
+                      'gspeed': [220, 200], 'hangle': [45, 45], 'Aircraft_model': 'A320'}).to_csv(day.joinpath(name+'.csv'), index=False)
+
+    packed = pack_procedures({'STAR1': ['P1', 'P2']}, {'P1': (22.0, 114.0), 'P2': (22.5, 114.5)})
+    records = list(historic_conversion.convert_historic('2018-05-01', packed, packed, center=(22.3, 114.2), radius=100.0, workers=1))
+    assert [record['callsign'] for record in records] == ['AAA1', 'CCC3']
+    assert records[0]['star'] == 'STAR1' and records[0]['aircraft_type'] == 'A320' and records[0]['alt'] == 5000
+    assert list(historic_conversion.convert_historic('2018-05-01', packed, packed, center=(22.3, 114.2), radius=100.0, workers=1)) == records
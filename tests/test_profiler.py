@@ -0,0 +1,17 @@
+import time
+from airtrafficsim.utils.profiler import Profiler
+
+def test_profiler_disabled():
+    profiler = Profiler()
+    with profiler.measure('step'):
+        pass
+    assert profiler.summary() == {}
+
+def test_profiler_summary():
+    profiler = Profiler(enabled=True, max_samples=5)
+    for _ in range(10):
+        with profiler.measure('step'):
+            time.sleep(0.001)
+    summary = profiler.summary()['step']
+    assert summary['count'] == 10 and len(profiler.samples['step']) == 5
+    assert summary['total'] >= 0.01 and summary['p50'] <= summary['p99'] <= summary['max']
@@ -0,0 +1,34 @@
+import numpy as np
+from airtrafficsim.utils.route_detection import point_line_distance, rdp, rdp_mask, rdp_batch, pack_procedures, detect_sid_star
+
+def rdp_recursive(points, epsilon):
+    dist = [point_line_distance(point, points[0], points[-1]) for point in points[1:-1]]
+    if len(dist) > 0 and np.max(dist) >= epsilon:
+        index = int(np.argmax(dist)) + 1
+        return rdp_recursive(points[:index+1], epsilon)[:-1] + rdp_recursive(points[index:], epsilon)
+    return [points[0], points[-1]]
+
+def test_rdp():
+    rng = np.random.default_rng(0)
+    trajectories = [np.cumsum(rng.normal(size=(n, 2)), axis=0) for n in (2, 50, 300)]
+    masks = rdp_batch(trajectories, 1.0)
+    for trajectory, mask in zip(trajectories, masks):
+        expected = np.array(rdp_recursive(trajectory, 1.0))
+        assert np.array_equal(np.array(rdp(trajectory, 1.0)), expected)
+        assert np.array_equal(trajectory[mask], expected)
+    # Long tracks do not hit the recursion limit
+    assert rdp_mask(np.column_stack((np.arange(20000.0), np.zeros(20000))), 0.0).all()
+
+def test_rdp_great_circle():
+    # Points on the equator are on the great circle path, a detour of 1 deg latitude is ~111 km
+    points = np.array([[0.0, 0.0], [0.0, 1.0], [1.0, 2.0], [0.0, 3.0]])
+    assert list(rdp_mask(points, 100.0, 'great_circle')) == [True, False, True, True]
+    assert list(rdp_mask(points, 120.0, 'great_circle')) == [True, False, False, True]
+
+def test_detect_sid_star():
+    waypoints = {'NORTH1': [22.8, 114.0], 'NORTH2': [22.5, 114.0], 'EAST1': [22.3, 114.6], 'EAST2': [22.3, 114.3], 'FINAL': [22.3, 114.0]}
+    procedures = {'NORTH': ['NORTH1', 'NORTH2', 'FINAL'], 'EAST': ['EAST1', 'EAST2', 'FINAL']}
+    trajectory = np.array([[22.32, 114.58], [22.31, 114.35], [22.3, 114.1], [22.3, 114.0]])
+    procedure, trajectory_in_area = detect_sid_star(trajectory, procedures, waypoints)
+    assert procedure == 'EAST' and trajectory_in_area.shape == (6, 2)
+    assert detect_sid_star(trajectory, packed=pack_procedures(procedures, waypoints), margin=0.1)[0] == 'EAST'
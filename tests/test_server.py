@@ -0,0 +1,38 @@
+from importlib import import_module
+
+from airtrafficsim.server import server
+from airtrafficsim.server.session import Session
+
+DemoEnv = getattr(import_module('airtrafficsim.data.environment.DemoEnv', '...'), "DemoEnv")
+
+
+class CommandEnv(DemoEnv):
+    def handle_command(self, aircraft, command, payload):
+        if command == "double":
+            return payload * 2
+        raise KeyError(aircraft)
+
+
+def test_session_command(monkeypatch):
+    monkeypatch.setattr(server, 'COMMAND_TIMEOUT', 0.1)
+    session = Session('test', 'CommandEnv', CommandEnv())
+    monkeypatch.setitem(server.sessions, session.id, session)
+    client = server.socketio.test_client(server.app)
+
+    assert client.emit('command', {'aircraft': None, 'command': 'double', 'payload': 21}, callback=True) is False
+    assert not client.emit('joinSession', 'unknown', callback=True)
+    assert client.emit('joinSession', session.id, callback=True)['clients'] == 1
+
+    # The command is applied by the next timestep of the session
+    server.socketio.start_background_task(session.env.step, server.socketio)
+    assert client.emit('command', {'aircraft': None, 'command': 'double', 'payload': 21}, callback=True) == 42
+    server.socketio.start_background_task(session.env.step, server.socketio)
+    assert not client.emit('command', {'aircraft': 'UNKNOWN', 'command': 'heading', 'payload': 90}, callback=True)
+    # No timestep runs, so the command times out
+    assert not client.emit('command', {'aircraft': None, 'command': 'double', 'payload': 1}, callback=True)
+    errors = [packet['args'][0] for packet in client.get_received() if packet['name'] == 'commandResult']
+    assert 'KeyError' in errors[0]['error'] and 'not applied' in errors[1]['error']
+
+    client.emit('leaveSession')
+    assert session.clients == set()
+    client.disconnect()